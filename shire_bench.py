@@ -0,0 +1,300 @@
+"""Benchmarks for the game's hot paths, run against synthetic hobbits with long histories.
+
+    python shire_bench.py                      # run and compare against the saved baseline
+    python shire_bench.py --save-baseline      # run and record the results as the new baseline
+    python shire_bench.py --sizes 10,10000     # skip the slow million-day runs
+    python shire_bench.py --memory-only        # just check the memory budget
+
+Each case is timed for every history size (in days). Results are written as JSON;
+when a baseline exists, every case is compared against it and the run fails if any
+case got slower than the tolerance allows.
+
+The memory check builds a sample of typical profiles (a year of deeds, weekly
+readings, bounty claims) and fails if MEMORY_PROFILES of them would need more than
+MEMORY_BUDGET_MB of Python heap.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+from shire_quest import (
+    DAILY_DEED_POINTS, DAILY_DEEDS_LIST, NULL_SINK, WEEKLY_BOUNTIES, DeedHistory, Game, Player, TerminalRenderer,
+    deed_mask, iso_week
+)
+
+# --- Configuration ---
+DEFAULT_SIZES = (10, 10000, 1000000)
+DEFAULT_BASELINE = 'shire_bench_baseline.json'
+DEFAULT_TOLERANCE = 0.25 # Allowed slowdown before a case counts as a regression
+ACHIEVEMENT_COUNT = 200
+MIN_RUN_SECONDS = 0.2 # Keep repeating a case until it has run at least this long
+HISTORY_START = datetime.date(1000, 1, 1) # Early enough that a million days still fits the calendar
+MEMORY_PROFILES = 50000 # Profiles one server process should be able to hold
+MEMORY_SAMPLE = 500 # Profiles actually built to measure the cost of one
+MEMORY_HISTORY_DAYS = 365
+MEMORY_BUDGET_MB = 512
+
+# --- Synthetic Hobbits ---
+def build_player(days, seed=0):
+    """A hobbit with `days` days of random deeds, many achievements and every kind of favor active."""
+    rng = random.Random(seed)
+    player = Player(f"Bench Hobbit {days}")
+    player.weight = 180.0
+    player.blood_pressure = "130/85 mmHg"
+    player.shire_pennies = days * 60
+    player.hobbit_points = 2500
+    player.achievements = [f"Bench Achievement {i}" for i in range(ACHIEVEMENT_COUNT)]
+
+    history = DeedHistory()
+    history.start = HISTORY_START.toordinal()
+    deed_bits = (1 << len(DAILY_DEED_POINTS)) - 1
+    history.masks = array('Q', (rng.getrandbits(64) & deed_bits for _ in range(days)))
+    player.use_history(history)
+    for offset in range(0, days, 7): # A weigh-in and blood pressure check once a week
+        player.health.add(HISTORY_START.toordinal() + offset, 180.0 + rng.uniform(-5, 5),
+                          rng.randint(110, 150), rng.randint(70, 95))
+
+    today = last_day(days)
+    player.current_favors = {
+        "Da Provider": {"favor_name": "Smoothie Bar Blueprint", "start_date": (today - datetime.timedelta(days=30)).isoformat(), "progress": {}},
+        "Da Struggler": {"dilemma_name": "Stress Snacker", "active": True},
+        "REX": {"impulse_name": "Rebellious Refusal", "active": True}
+    }
+    return player
+
+def build_profile(index, rng, days=MEMORY_HISTORY_DAYS):
+    """A typical hosted hobbit, built through the same calls the game makes: `days` days of
+    deeds, a weigh-in each week, some bounty claims and achievements and one active favor."""
+    player = Player(f"Hobbit {index}")
+    player.eating_habits = "Second breakfast, mostly"
+    history = player.daily_deeds_completed
+    first = datetime.date(2025, 1, 1).toordinal()
+    deed_bits = (1 << len(DAILY_DEED_POINTS)) - 1
+    for offset in range(days):
+        history.merge_mask(first + offset, rng.getrandbits(64) & deed_bits)
+    for offset in range(0, days, 7):
+        player.record_reading(first + offset, 180.0 + rng.uniform(-5, 5), f"{rng.randint(110, 150)}/{rng.randint(70, 95)}")
+        for bounty in WEEKLY_BOUNTIES:
+            if rng.random() < 0.3:
+                player.claim_bounty(iso_week(first + offset), bounty.name)
+                player.add_achievement(bounty.achievement)
+    player.current_favors = {"Da Provider": {"favor_name": "Smoothie Bar Blueprint",
+                                             "start_date": "2025-12-01", "active": True}}
+    today = first + days - 1
+    player.weekly.count(next(iter(DAILY_DEED_POINTS)), today)
+    player.streaks.run_length(deed_mask(next(iter(DAILY_DEED_POINTS))), today)
+    player.health.summary(today)
+    return player
+
+def measure_memory(sample=MEMORY_SAMPLE, days=MEMORY_HISTORY_DAYS):
+    """Python heap bytes per profile, averaged over `sample` profiles built by build_profile."""
+    rng = random.Random(0)
+    build_profile(-1, rng, days) # Registers deeds and achievements in the shared catalogs first
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        profiles = [build_profile(i, rng, days) for i in range(sample)]
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del profiles
+    return used / sample
+
+def last_day(days):
+    return HISTORY_START + datetime.timedelta(days=days - 1)
+
+@contextlib.contextmanager
+def quiet(stdin_text=''):
+    """Stubs out stdin and stdout so interactive paths run unattended."""
+    old_stdin = sys.stdin
+    sys.stdin = io.StringIO(stdin_text)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        sys.stdin = old_stdin
+
+def make_game(player, workdir, events=NULL_SINK):
+    game = Game(save_file=os.path.join(workdir, 'bench.dat'),
+                journal_file=os.path.join(workdir, 'bench.journal'), load=False, events=events)
+    game.use_player(player)
+    game.today = last_day(len(player.daily_deeds_completed.masks)) + datetime.timedelta(days=1)
+    return game
+
+# --- Cases ---
+# Each case is (name, prepare) where prepare(days, workdir) returns a zero-argument callable to time.
+def case_to_dict(days, workdir):
+    player = build_player(days)
+    return player.to_dict
+
+def case_from_dict(days, workdir):
+    data = build_player(days).to_dict()
+    return lambda: Player.from_dict(data)
+
+def case_save_game_journal(days, workdir):
+    game = make_game(build_player(days), workdir)
+    with quiet():
+        game.store.compact(game.player)
+    def run():
+        game.player.add_sp(5) # One small change, as after a typical action
+        game.save_game()
+    return run
+
+def case_save_game_snapshot(days, workdir):
+    game = make_game(build_player(days), workdir)
+    return lambda: game.store.compact(game.player)
+
+def case_load_game(days, workdir):
+    game = make_game(build_player(days), workdir)
+    game.store.compact(game.player)
+    return game.load_game
+
+def case_check_character_scenes(days, workdir):
+    game = make_game(build_player(days), workdir)
+    today = last_day(days)
+    favors = dict(game.player.current_favors)
+    def run():
+        game.check_character_scenes(today)
+        game.player.current_favors = dict(favors) # Put back anything that completed
+    return run
+
+def case_check_shire_status(days, workdir):
+    player = build_player(days)
+    return lambda: player._check_shire_status(player.hobbit_points - 300)
+
+def case_health_summary(days, workdir):
+    player = build_player(days)
+    today = last_day(days)
+    return lambda: player.health.summary(today)
+
+def case_log_daily_deeds(days, workdir):
+    game = make_game(build_player(days), workdir, TerminalRenderer()) # Include rendering, as a player sees it
+    game.store.compact(game.player)
+    script = 'all\ndone\n' * len(DAILY_DEEDS_LIST)
+    def run():
+        sys.stdin = io.StringIO(script)
+        game.today += datetime.timedelta(days=1) # A fresh day each time, so every deed is new
+        game.log_daily_deeds()
+    return run
+
+CASES = [
+    ("Player.to_dict", case_to_dict),
+    ("Player.from_dict", case_from_dict),
+    ("Game.save_game (journal append)", case_save_game_journal),
+    ("Game.save_game (full snapshot)", case_save_game_snapshot),
+    ("Game.load_game", case_load_game),
+    ("Game.check_character_scenes", case_check_character_scenes),
+    ("Player._check_shire_status", case_check_shire_status),
+    ("HealthLog.summary", case_health_summary),
+    ("Game.log_daily_deeds (all deeds)", case_log_daily_deeds),
+]
+
+def time_call(fn):
+    """Seconds per call: the best of several batches, each running for MIN_RUN_SECONDS."""
+    batches = []
+    for _ in range(3):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= MIN_RUN_SECONDS:
+                break
+        batches.append(elapsed / calls)
+        if elapsed > 5 * MIN_RUN_SECONDS: # Slow case; one batch is plenty
+            break
+    return min(batches)
+
+def run_benchmarks(sizes=DEFAULT_SIZES, selected=None):
+    """Returns {case name: {str(days): seconds per call}}."""
+    results = {}
+    for name, prepare in CASES:
+        if selected and not any(s.lower() in name.lower() for s in selected):
+            continue
+        results[name] = {}
+        for days in sizes:
+            with tempfile.TemporaryDirectory() as workdir, quiet():
+                fn = prepare(days, workdir)
+                seconds = time_call(fn)
+            results[name][str(days)] = seconds
+            print(f"{name:<36} {days:>9} days  {format_seconds(seconds):>10}", file=sys.stderr)
+    return results
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Prints each case against the baseline and returns the list of regressions."""
+    regressions = []
+    print(f"\n{'Case':<36} {'Days':>9} {'Baseline':>10} {'Now':>10} {'Change':>8}")
+    for name, by_size in results.items():
+        for days, seconds in by_size.items():
+            before = baseline.get(name, {}).get(days)
+            if before is None:
+                print(f"{name:<36} {days:>9} {'-':>10} {format_seconds(seconds):>10} {'new':>8}")
+                continue
+            change = seconds / before - 1
+            flag = " <-- slower" if change > tolerance else ""
+            print(f"{name:<36} {days:>9} {format_seconds(before):>10} {format_seconds(seconds):>10} {change:>+8.0%}{flag}")
+            if flag:
+                regressions.append((name, days, change))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Shire's Health Quest hot paths.")
+    parser.add_argument("--sizes", default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated history lengths in days.")
+    parser.add_argument("--case", action='append', help="Only run cases whose name contains this text.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action='store_true', help="Record this run as the new baseline.")
+    parser.add_argument("--output", help="Also write this run's results to this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--memory-only", action='store_true', help="Skip the timings; only check the memory budget.")
+    args = parser.parse_args()
+
+    per_profile = measure_memory()
+    projected_mb = per_profile * MEMORY_PROFILES / 2**20
+    print(f"Memory: {per_profile:,.0f} bytes per profile with {MEMORY_HISTORY_DAYS} days of history; "
+          f"{MEMORY_PROFILES:,} profiles need {projected_mb:,.0f} MB (budget {MEMORY_BUDGET_MB} MB).")
+    if projected_mb > MEMORY_BUDGET_MB:
+        print("Over the memory budget.")
+        sys.exit(1)
+    if args.memory_only:
+        sys.exit(0)
+
+    bench_results = run_benchmarks([int(s) for s in args.sizes.split(',')], args.case)
+    report = {
+        "python": sys.version.split()[0],
+        "recorded": datetime.datetime.now().isoformat(timespec='seconds'),
+        "results": bench_results,
+        "memory": {"bytes_per_profile": per_profile, "profiles": MEMORY_PROFILES, "projected_mb": projected_mb}
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline saved to {args.baseline}.")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            found = compare(bench_results, json.load(f)["results"], args.tolerance)
+        if found:
+            print(f"\n{len(found)} case(s) slower than the baseline by more than {args.tolerance:.0%}.")
+            sys.exit(1)
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
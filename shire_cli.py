@@ -0,0 +1,184 @@
+"""Command-line subcommands for logging from scripts: cron jobs, phone shortcuts, home automation.
+
+Each command reads the save without the interactive setup (archived days and health
+readings stay unread unless the command needs them), does one thing, appends it to the
+save journal and exits; status only reads. Days default, as when the interactive game
+starts, to the later of the real date and the day `advance` last moved the game to;
+--date picks another. Deed, character and offer names ignore case, and a unique
+beginning is enough. With no command the interactive game runs.
+
+    python shire_cli.py start Sam --weight 180 --blood-pressure 130/85
+    python shire_cli.py log water fruit "vegetable patch"
+    python shire_cli.py log --date 2025-01-30 "a stroll"
+    python shire_cli.py reading --weight 178.5
+    python shire_cli.py accept-favor "da provider" smoothie
+    python shire_cli.py advance
+    python shire_cli.py status --json
+
+`python shire_quest.py <command>` works too, but starts slower: Python caches the
+compiled code of imported modules, not of the script it's asked to run.
+"""
+import argparse
+import atexit
+import datetime
+import json
+import os
+import sys
+
+from shire_quest import (
+    DAILY_DEED_POINTS, JOURNAL_FILE, NULL_SINK, SAVE_FILE, Game, ManualClock, Narration, profile_from_environment
+)
+
+class CommandError(Exception):
+    """A command that can't be carried out; reported on stderr with exit status 1."""
+
+def match_name(text, names, noun):
+    """The one name in `names` that `text` is (ignoring case) or starts with."""
+    wanted = text.strip().lower()
+    exact = [name for name in names if name.lower() == wanted]
+    if exact:
+        return exact[0]
+    matches = [name for name in names if name.lower().startswith(wanted)]
+    if len(matches) == 1:
+        return matches[0]
+    choices = matches or names
+    raise CommandError(f"{'Ambiguous' if matches else 'Unknown'} {noun} {text!r}; choose from: {', '.join(choices)}")
+
+def parse_day(text):
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError("dates must look like 2025-01-31")
+
+def command_game(args, new=False, read_only=False):
+    """A Game on the save named in `args` with today set and its player loaded (or, with
+    new=True, a fresh player for a save that doesn't exist yet). With read_only=True the
+    load writes nothing, not even the migration of an old JSON save."""
+    game = Game(save_file=args.save_file, journal_file=args.journal_file, load=False,
+                events=NULL_SINK if args.quiet else None, clock=ManualClock(args.date) if args.date else None)
+    player = game.store.load(migrate=not read_only)
+    if new and player is not None:
+        raise CommandError(f"{args.save_file} already holds a quest.")
+    if not new and player is None:
+        raise CommandError(f"No save at {args.save_file}. Begin with: {os.path.basename(sys.argv[0])} start NAME")
+    game.use_player(player or game.player)
+    return game
+
+# --- Commands ---
+# Each returns the Game whose changes should be saved, or None when nothing changed.
+def command_start(args):
+    game = command_game(args, new=True)
+    game.player.name = args.name
+    try:
+        game.record_reading(args.weight, args.blood_pressure)
+    except ValueError as exc:
+        raise CommandError(str(exc))
+    game.player.eating_habits = args.eating_habits or ""
+    game.events.emit(Narration(f"{args.name}'s Shire adventure begins!"))
+    return game
+
+def command_log(args):
+    game = command_game(args)
+    deeds = [match_name(text, list(DAILY_DEED_POINTS), "deed") for text in args.deeds]
+    if not game.record_deeds(deeds):
+        game.events.emit(Narration("Those deeds were already logged."))
+    return game
+
+def command_reading(args):
+    if args.weight is None and not args.blood_pressure:
+        raise CommandError("Give --weight, --blood-pressure or both.")
+    game = command_game(args)
+    try:
+        game.record_reading(args.weight, args.blood_pressure)
+    except ValueError as exc:
+        raise CommandError(str(exc))
+    game.events.emit(Narration("Reading recorded."))
+    return game
+
+def command_accept_favor(args):
+    game = command_game(args)
+    char_name = match_name(args.character, list(game.characters), "character")
+    char = game.characters[char_name]
+    offer_name = match_name(args.offer, list(char.offers), char.offer_noun)
+    if not game.accept_offer(char_name, offer_name):
+        raise CommandError(f"You already have an active {char.offer_noun} with {char_name}.")
+    return game
+
+def command_advance(args):
+    game = command_game(args)
+    game.advance_day()
+    game.events.emit(Narration(f"\nIt's now {game.shire_calendar.get_shire_date(game.today)}."))
+    return game
+
+def command_status(args):
+    game = command_game(args, read_only=True)
+    if args.json:
+        print(json.dumps(game.status(), indent=2))
+    else:
+        game.display_status()
+    return None
+
+COMMANDS = {
+    'start': command_start,
+    'log': command_log,
+    'reading': command_reading,
+    'accept-favor': command_accept_favor,
+    'advance': command_advance,
+    'status': command_status
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Shire's Health Quest. Run without a command to play interactively.")
+    parser.add_argument("--save-file", default=SAVE_FILE)
+    parser.add_argument("--journal-file", default=JOURNAL_FILE)
+    parser.add_argument("--date", type=parse_day, help="the day to act on (default: today)")
+    parser.add_argument("--quiet", action="store_true", help="don't print what happened")
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    start = commands.add_parser('start', help="begin a new quest without the setup questions")
+    start.add_argument('name')
+    start.add_argument('--weight', type=float)
+    start.add_argument('--blood-pressure')
+    start.add_argument('--eating-habits')
+    log = commands.add_parser('log', help="log deeds done on a day")
+    log.add_argument('deeds', nargs='+')
+    reading = commands.add_parser('reading', help="record a weight and/or blood pressure reading")
+    reading.add_argument('--weight', type=float)
+    reading.add_argument('--blood-pressure')
+    accept = commands.add_parser('accept-favor', help="take up a character's favor, dilemma or impulse")
+    accept.add_argument('character')
+    accept.add_argument('offer')
+    commands.add_parser('advance', help="end the day: check character scenes and move to the next one")
+    status = commands.add_parser('status', help="show the hobbit's status")
+    status.add_argument('--json', action='store_true')
+    for command in commands.choices.values(): # --date and --quiet may also follow the command
+        command.add_argument("--date", type=parse_day, default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+        command.add_argument("--quiet", action="store_true", default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+    return parser
+
+def run_command(args):
+    """Runs one command and saves what it changed. Returns the exit status."""
+    try:
+        game = COMMANDS[args.command](args)
+    except CommandError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if game is not None:
+        game.save_game()
+        game.flush_saves()
+    return 0
+
+def main(argv=None):
+    profile_from_environment()
+    args = build_parser().parse_args(argv)
+    if args.command:
+        return run_command(args)
+    game = Game(save_file=args.save_file, journal_file=args.journal_file, background_save=True,
+                clock=ManualClock(args.date) if args.date else None)
+    atexit.register(game.flush_saves) # Also covers leaving with Ctrl+C
+    game.run_daily_cycle()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
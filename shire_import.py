@@ -0,0 +1,206 @@
+"""Bulk import of deed history from CSV or JSONL exports.
+
+Rows stream through a generator pipeline (read -> validate -> batch -> apply), so
+memory stays flat however large the export is. Each batch is merged straight into
+the deed history with one SP award per batch, and weight and blood pressure readings
+(the first of each per day) are added to the health log a batch at a time; weekly
+bounties, streaks, achievements and character scenes are checked once at the end,
+and the save is rewritten once as a fresh snapshot.
+
+CSV files need a header row; JSONL files hold one object per line. Recognised
+fields are date (YYYY-MM-DD), deed, and optionally weight and blood_pressure (or bp).
+
+    python shire_import.py deeds_export.csv
+"""
+import argparse
+import csv
+import datetime
+import itertools
+import json
+import os
+
+from shire_quest import (
+    ACHIEVEMENTS, DAILY_DEED_POINTS, DAILY_DEEDS_LIST, JOURNAL_FILE, SAVE_FILE, Game, claim_bounties, deed_id,
+    parse_blood_pressure
+)
+
+# --- Configuration ---
+BATCH_SIZE = 50000
+MAX_ERRORS_KEPT = 20 # Problem rows reported back in detail; the rest are only counted
+
+class ImportRowError(ValueError):
+    """A row that can't be imported, with the line it came from."""
+    def __init__(self, line, message):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+# --- Pipeline Stages ---
+def read_rows(path):
+    """Yields (line_number, row dict) from a CSV or JSONL file, chosen by extension."""
+    if path.lower().endswith(('.jsonl', '.ndjson', '.json')):
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError:
+                        yield line_number, None
+    else:
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, {k.strip().lower(): v for k, v in row.items() if k}
+
+class ImportErrors:
+    """Counts rejected rows, keeping the first few for the report."""
+    def __init__(self):
+        self.count = 0
+        self.kept = []
+
+    def reject(self, line, message):
+        self.count += 1
+        if len(self.kept) < MAX_ERRORS_KEPT:
+            self.kept.append(ImportRowError(line, message))
+
+def validate(rows, errors):
+    """Turns raw rows into (ordinal, deed_bit, weight, (systolic, diastolic) or None) tuples.
+
+    Rows naming a deed outside DAILY_DEEDS_LIST, or with a bad date, weight or blood
+    pressure, are skipped and recorded in `errors` (an ImportErrors).
+    """
+    deeds = {}
+    for category_deeds in DAILY_DEEDS_LIST.values():
+        for deed_name in category_deeds:
+            deeds[deed_name] = deeds[deed_name.lower()] = 1 << deed_id(deed_name)
+    ordinals = {} # Each date string is parsed once, however many rows share it
+
+    for line, row in rows:
+        if not isinstance(row, dict):
+            errors.reject(line, "not a valid row")
+            continue
+        day = str(row.get('date') or '').strip()
+        ordinal = ordinals.get(day)
+        if ordinal is None:
+            try:
+                ordinal = ordinals[day] = datetime.date.fromisoformat(day).toordinal()
+            except ValueError:
+                errors.reject(line, f"bad date {day!r}")
+                continue
+        deed_name = str(row.get('deed') or '').strip()
+        bit = deeds.get(deed_name) or deeds.get(deed_name.lower()) if deed_name else 0
+        if deed_name and not bit:
+            errors.reject(line, f"unknown deed {deed_name!r}")
+            continue
+        weight = row.get('weight')
+        try:
+            weight = float(weight) if weight not in (None, '') else None
+        except (TypeError, ValueError):
+            errors.reject(line, f"bad weight {weight!r}")
+            continue
+        blood_pressure = row.get('blood_pressure') or row.get('bp') or None
+        if blood_pressure:
+            try:
+                blood_pressure = parse_blood_pressure(blood_pressure)
+            except ValueError:
+                errors.reject(line, f"bad blood pressure {blood_pressure!r}")
+                continue
+        yield ordinal, bit, weight, blood_pressure
+
+def batched(items, size=BATCH_SIZE):
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+# --- Import ---
+def import_history(game, path, batch_size=BATCH_SIZE, today=None):
+    """Imports a deed export into `game.player` and saves it. Returns a summary dict."""
+    player = game.player
+    history = player.daily_deeds_completed
+    bit_points = {1 << deed_id(name): points for name, points in DAILY_DEED_POINTS.items()}
+    errors = ImportErrors()
+    summary = {'rows': 0, 'deeds_added': 0, 'sp_awarded': 0, 'days': 0, 'readings': 0, 'skipped': 0}
+    health = player.health
+    read = set() # (ordinal, 'weight' or 'bp') already taken from this export
+    days_added = set() # Ordinals that gained a deed
+
+    for batch in batched(validate(read_rows(path), errors), batch_size):
+        day_masks = {}
+        weights, systolic, diastolic = [], [], []
+        for ordinal, bit, weight, blood_pressure in batch:
+            if bit:
+                day_masks[ordinal] = day_masks.get(ordinal, 0) | bit
+            # Exports often repeat the day's readings on every deed row, so each kind is taken
+            # once per day; readings already in the log (e.g. from importing the same export
+            # twice) are skipped
+            if weight is not None and (ordinal, 'weight') not in read:
+                read.add((ordinal, 'weight'))
+                if not health.weight.has(ordinal, weight):
+                    weights.append((ordinal, weight))
+            if blood_pressure and (ordinal, 'bp') not in read:
+                read.add((ordinal, 'bp'))
+                if not (health.systolic.has(ordinal, blood_pressure[0]) and
+                        health.diastolic.has(ordinal, blood_pressure[1])):
+                    systolic.append((ordinal, blood_pressure[0]))
+                    diastolic.append((ordinal, blood_pressure[1]))
+        health.weight.extend(weights)
+        health.systolic.extend(systolic)
+        health.diastolic.extend(diastolic)
+        summary['readings'] += len(weights) + len(systolic)
+        earned = 0
+        for ordinal, mask in day_masks.items():
+            new_bits = history.merge_mask(ordinal, mask)
+            if new_bits:
+                days_added.add(ordinal)
+            while new_bits:
+                bit = new_bits & -new_bits
+                earned += bit_points.get(bit, 0)
+                summary['deeds_added'] += 1
+                new_bits ^= bit
+        if earned:
+            player.add_sp(earned)
+        summary['rows'] += len(batch)
+        summary['sp_awarded'] += earned
+
+    player.refresh_latest_reading()
+
+    player.streaks.rebuild()
+    player.weekly.clear()
+    player.totals.clear()
+    # Bounties are claimed as each day's deeds would have been logged, in date order so the
+    # weekly tally only slides forward
+    summary['bounties'] = sum(len(claim_bounties(player, ordinal)) for ordinal in sorted(days_added))
+    summary['achievements'] = ACHIEVEMENTS.review(player)
+    summary['scenes'] = game.check_character_scenes(today)
+    game.store.compact(player) # The imported days aren't in the journal, so write them out in full
+    game.events.flush()
+
+    summary['days'] = len(days_added)
+    summary['skipped'] = errors.count
+    summary['errors'] = [str(e) for e in errors.kept]
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import deed history from a CSV or JSONL export.")
+    parser.add_argument("path")
+    parser.add_argument("--save-file", default=SAVE_FILE)
+    parser.add_argument("--journal-file", default=JOURNAL_FILE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    legacy_file = os.path.splitext(args.save_file)[0] + '.json' # Migrated when the game loads it
+    if not (os.path.exists(args.save_file) or os.path.exists(legacy_file)):
+        parser.exit(1, f"No save at {args.save_file}. Start a game first so there's a hobbit to import into.\n")
+    import_game = Game(save_file=args.save_file, journal_file=args.journal_file)
+    result = import_history(import_game, args.path, args.batch_size)
+    print(f"\nImported {result['rows']} rows: {result['deeds_added']} new deeds over {result['days']} days, "
+          f"{result['sp_awarded']} SP awarded, {result['bounties']} weekly bounties claimed, "
+          f"{result['readings']} health readings.")
+    if result['achievements']:
+        print(f"Achievements unlocked: {', '.join(result['achievements'])}")
+    if result['skipped']:
+        print(f"Skipped {result['skipped']} rows:")
+        for message in result['errors']:
+            print(f"  {message}")
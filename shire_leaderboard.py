@@ -0,0 +1,358 @@
+"""Rankings across every hobbit sharing one installation.
+
+Each board keeps its players in rank order in an indexable skip list, so changing a
+score, finding a player's rank, reading the top k and listing the players around
+someone all take O(log n) (plus the k entries read), with no sorting and no save files
+loaded. Boards are fed by the game's events: give each player a sink from
+Leaderboard.sink and SP, HP and deed events update the boards as they happen.
+
+Boards:
+    hobbit_points   total HP
+    shire_pennies   total SP
+    streak          days in a row with at least one deed, for streaks still going
+                    (the last deed was logged yesterday or later)
+    weekly_sp       SP earned this ISO week for deeds logged this week; the board starts
+                    empty each new week
+
+The leaderboard can be saved to a JSON file and loaded back, so a service restart
+doesn't need to read every hobbit's save to rebuild it.
+"""
+import datetime
+import json
+import math
+import random
+import threading
+
+from shire_quest import SYSTEM_CLOCK, DeedLogged, HPGained, SPGained, iso_week, write_atomically
+
+# --- Configuration ---
+BOARDS = ('hobbit_points', 'shire_pennies', 'streak', 'weekly_sp')
+SKIP_LIST_LEVELS = 24 # Enough for about 16 million players per board
+
+# --- Ranked Scores ---
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, levels):
+        self.key = key
+        self.next = [None] * levels
+        self.width = [1] * levels # Level-0 steps to the node `next` points at (or past the last node)
+
+class RankedScores:
+    """Players' scores in rank order (highest first, ties by name) in an indexable skip list.
+
+    Every node's links carry how many places they skip, so a walk from the top level
+    down both finds a key and counts the places before it: set, remove, rank and at are
+    all expected O(log n).
+    """
+    def __init__(self, seed=0):
+        self.scores = {} # name -> score
+        self.head = _Node(None, SKIP_LIST_LEVELS)
+        self.rng = random.Random(seed) # Node heights; seeded so runs are repeatable
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __contains__(self, name):
+        return name in self.scores
+
+    def _insert(self, key):
+        chain = [None] * SKIP_LIST_LEVELS
+        steps_at_level = [0] * SKIP_LIST_LEVELS
+        node = self.head
+        for level in reversed(range(SKIP_LIST_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        levels = min(SKIP_LIST_LEVELS, 1 - int(math.log2(1.0 - self.rng.random())))
+        new = _Node(key, levels)
+        steps = 0
+        for level in range(levels):
+            before = chain[level]
+            new.next[level] = before.next[level]
+            before.next[level] = new
+            new.width[level] = before.width[level] - steps
+            before.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, SKIP_LIST_LEVELS):
+            chain[level].width[level] += 1
+
+    def _remove(self, key):
+        chain = [None] * SKIP_LIST_LEVELS
+        node = self.head
+        for level in reversed(range(SKIP_LIST_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        target = chain[0].next[0]
+        for level in range(len(target.next)):
+            before = chain[level]
+            before.width[level] += target.width[level] - 1
+            before.next[level] = target.next[level]
+        for level in range(len(target.next), SKIP_LIST_LEVELS):
+            chain[level].width[level] -= 1
+
+    def set(self, name, score):
+        old = self.scores.get(name)
+        if old == score:
+            return
+        if old is not None:
+            self._remove((-old, name))
+        self.scores[name] = score
+        self._insert((-score, name))
+
+    def remove(self, name):
+        score = self.scores.pop(name, None)
+        if score is not None:
+            self._remove((-score, name))
+
+    def get(self, name, default=None):
+        return self.scores.get(name, default)
+
+    def rank(self, name):
+        """1-based rank of a player, or None if they aren't on the board."""
+        score = self.scores.get(name)
+        if score is None:
+            return None
+        key = (-score, name)
+        position = 0
+        node = self.head
+        for level in reversed(range(SKIP_LIST_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position + 1
+
+    def _node_at(self, index):
+        remaining = index + 1
+        node = self.head
+        for level in reversed(range(SKIP_LIST_LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def at(self, index):
+        """(name, score) of the player at a 0-based position."""
+        if not 0 <= index < len(self.scores):
+            raise IndexError(index)
+        key = self._node_at(index).key
+        return key[1], -key[0]
+
+    def entries(self, first, count):
+        """Up to `count` (rank, name, score) entries starting at 0-based position `first`."""
+        if first >= len(self.scores) or count <= 0:
+            return []
+        node = self._node_at(first)
+        found = []
+        while node is not None and len(found) < count:
+            found.append((first + len(found) + 1, node.key[1], -node.key[0]))
+            node = node.next[0]
+        return found
+
+    def clear(self):
+        self.scores = {}
+        self.head = _Node(None, SKIP_LIST_LEVELS)
+
+# --- Leaderboard ---
+class Leaderboard:
+    """Every board, kept current from game events, with weekly and streak rollover.
+
+    The weekly board empties itself the first time it's used in a new ISO week, and
+    streaks that weren't continued yesterday or today drop off the streak board the
+    first time it's used on a new day. Safe to use from several threads.
+    """
+    def __init__(self, clock=SYSTEM_CLOCK):
+        self.clock = clock # Decides the current week and day; the real date by default
+        self.boards = {board: RankedScores(seed) for seed, board in enumerate(BOARDS)}
+        self.streak_ends = {} # name -> ordinal of the latest day in their streak
+        today = clock.today()
+        self.week = iso_week(today)
+        self.day = today.toordinal()
+        self.changes = 0 # Bumped on every update, e.g. to tell whether it needs saving
+        self.lock = threading.RLock()
+
+    def sink(self, player):
+        """An event sink that feeds `player`'s SP, HP and deeds into the boards."""
+        return LeaderboardSink(self, player)
+
+    def _roll(self):
+        today = self.clock.today()
+        if today.toordinal() == self.day:
+            return
+        self.day = today.toordinal()
+        week = iso_week(today)
+        if week != self.week:
+            self.week = week
+            self.boards['weekly_sp'].clear()
+        for name, end in list(self.streak_ends.items()):
+            if end < self.day - 1:
+                self._end_streak(name)
+
+    def _end_streak(self, name):
+        del self.streak_ends[name]
+        self.boards['streak'].remove(name)
+
+    # --- Updates ---
+    def set_score(self, board, name, score):
+        with self.lock:
+            self._roll()
+            self.boards[board].set(name, score)
+            self.changes += 1
+
+    def add_weekly_sp(self, name, amount, day=None):
+        """Adds SP earned on `day` (a date; default: today) to the weekly board. SP earned
+        in any other ISO week, e.g. for a back-filled deed, isn't counted."""
+        with self.lock:
+            self._roll()
+            if day is not None and iso_week(day) != self.week:
+                return
+            weekly = self.boards['weekly_sp']
+            weekly.set(name, weekly.get(name, 0) + amount)
+            self.changes += 1
+
+    def deed_logged(self, player, day):
+        """Extends or recounts the player's streak after a deed logged on `day` (a date)."""
+        ordinal = day.toordinal()
+        with self.lock:
+            self._roll()
+            end = self.streak_ends.get(player.name)
+            if end is not None and ordinal == end:
+                return
+            if end is not None and ordinal == end + 1:
+                self._set_streak(player.name, self.boards['streak'].get(player.name, 0) + 1, ordinal)
+            else: # A first deed, a new streak or a back-filled day; count from the history
+                self._set_streak(player.name, *current_streak(player.daily_deeds_completed))
+
+    def _set_streak(self, name, length, end):
+        if not length or end < self.day - 1:
+            if name in self.streak_ends:
+                self._end_streak(name)
+            return
+        self.streak_ends[name] = end
+        self.boards['streak'].set(name, length)
+        self.changes += 1
+
+    def track(self, player):
+        """Puts a player's current totals and streak on the boards, e.g. when their save is loaded."""
+        with self.lock:
+            self._roll()
+            self.boards['hobbit_points'].set(player.name, player.hobbit_points)
+            self.boards['shire_pennies'].set(player.name, player.shire_pennies)
+            self._set_streak(player.name, *current_streak(player.daily_deeds_completed))
+            self.changes += 1
+
+    def forget(self, name):
+        with self.lock:
+            for board in self.boards.values():
+                board.remove(name)
+            self.streak_ends.pop(name, None)
+            self.changes += 1
+
+    # --- Queries ---
+    def _board(self, board):
+        if board not in self.boards:
+            raise KeyError(f"No leaderboard called {board}; choose from: {', '.join(BOARDS)}")
+        self._roll()
+        return self.boards[board]
+
+    def top(self, board, k=10):
+        """[(rank, name, score)] for the best `k` players."""
+        with self.lock:
+            return self._board(board).entries(0, k)
+
+    def rank(self, board, name):
+        """(rank, score) of a player, or None if they aren't on the board."""
+        with self.lock:
+            scores = self._board(board)
+            rank = scores.rank(name)
+            return None if rank is None else (rank, scores.get(name))
+
+    def around(self, board, name, radius=2):
+        """[(rank, name, score)] for the player and up to `radius` players either side."""
+        with self.lock:
+            scores = self._board(board)
+            rank = scores.rank(name)
+            if rank is None:
+                return []
+            first = max(0, rank - 1 - radius)
+            return scores.entries(first, rank - first + radius)
+
+    def size(self, board):
+        with self.lock:
+            return len(self._board(board))
+
+    # --- Saving ---
+    def to_dict(self):
+        with self.lock:
+            self._roll()
+            return {
+                'week': self.week,
+                'day': datetime.date.fromordinal(self.day).isoformat(),
+                'boards': {board: scores.scores for board, scores in self.boards.items()},
+                'streak_ends': {name: datetime.date.fromordinal(end).isoformat()
+                                for name, end in self.streak_ends.items()}
+            }
+
+    @classmethod
+    def from_dict(cls, data, clock=SYSTEM_CLOCK):
+        leaderboard = cls(clock)
+        leaderboard.week = data.get('week', leaderboard.week)
+        leaderboard.day = datetime.date.fromisoformat(data['day']).toordinal() if 'day' in data else leaderboard.day
+        for board, scores in data.get('boards', {}).items():
+            if board in leaderboard.boards:
+                for name, score in scores.items():
+                    leaderboard.boards[board].set(name, score)
+        leaderboard.streak_ends = {name: datetime.date.fromisoformat(end).toordinal()
+                                   for name, end in data.get('streak_ends', {}).items()}
+        return leaderboard
+
+    def save(self, path):
+        write_atomically(path, json.dumps(self.to_dict()).encode())
+
+    @classmethod
+    def load(cls, path, clock=SYSTEM_CLOCK):
+        """The leaderboard saved at `path`, or an empty one if there's no file yet."""
+        try:
+            with open(path, encoding='utf-8') as f:
+                return cls.from_dict(json.load(f), clock)
+        except FileNotFoundError:
+            return cls(clock)
+
+def current_streak(history):
+    """(length, last day's ordinal) of the run of days with any deed that ends on the
+    latest logged day; (0, 0) for an empty history."""
+    if history.start is None:
+        history.load_archive()
+    if history.start is None:
+        return 0, 0
+    end = history.start + len(history.masks) - 1
+    while end >= history.start and not history.mask_at(end): # Archived days are only read if reached
+        end -= 1
+    day = end
+    while history.mask_at(day):
+        day -= 1
+    return end - day, end
+
+class LeaderboardSink:
+    """Event sink that passes one player's SP, HP and deed events on to a Leaderboard."""
+    def __init__(self, leaderboard, player):
+        self.leaderboard = leaderboard
+        self.player = player
+        self.deed_day = None # Day of the deed just logged; its SP is credited to that day's week
+
+    def emit(self, event):
+        kind = type(event)
+        if kind is SPGained:
+            self.leaderboard.set_score('shire_pennies', self.player.name, event.total)
+            self.leaderboard.add_weekly_sp(self.player.name, event.amount, self.deed_day)
+            self.deed_day = None
+        elif kind is HPGained:
+            self.leaderboard.set_score('hobbit_points', self.player.name, event.total)
+        elif kind is DeedLogged:
+            self.deed_day = datetime.date.fromisoformat(event.day)
+            self.leaderboard.deed_logged(self.player, self.deed_day)
+
+    def flush(self):
+        pass
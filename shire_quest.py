@@ -1,34 +1,1409 @@
+import atexit
+import bisect
+import calendar
+import collections
 import datetime
+import functools
+import hashlib
+import io
 import json
+import marshal
+import mmap
 import os
 import random
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from dataclasses import asdict, astuple, dataclass, replace
+from types import MappingProxyType
 
 # --- Configuration ---
-SAVE_FILE = 'shire_health_quest_save.json'
+SAVE_FILE = 'shire_health_quest_save.dat'
+LEGACY_SAVE_FILE = 'shire_health_quest_save.json' # JSON snapshots from before the binary format
+JOURNAL_FILE = 'shire_health_quest_save.journal'
+JOURNAL_COMPACT_EVERY = 500 # Journal records allowed to pile up before they're folded into a fresh snapshot
+SNAPSHOT_RECENT_DAYS = 90 # Days of deed history decoded at startup; older days are read on first use
+SNAPSHOT_MAP_BYTES = 1 << 20 # Health logs this big are memory-mapped from the snapshot instead of read into memory
+SAVE_DEBOUNCE_SECONDS = 0.05 # Background saves wait this long for more changes before writing
+REPLAY_CHECKPOINT_DAYS = 30 # Replay keeps a copy of the player this often, so a seek replays at most this many days
+PROFILE_ENV = 'SHIRE_PROFILE' # "text" or "json" prints hot-path timings on exit; anything else is a file to write them to
+PROFILE_SAMPLES = 10000 # Call durations kept per method for percentiles
+
+# --- Content Packs ---
+# Deeds, Shire Status levels, weekly bounties, character offers and milestone achievements
+# come from a JSON data pack. A pack is validated and compiled once into flat tables of
+# builtins, which are cached under __pycache__ next to the pack (keyed by the pack's
+# hash) so later runs skip both steps. Every game in the process shares the one CONTENT.
+CONTENT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'shire_content.json')
+CONTENT_ENV = 'SHIRE_CONTENT' # Path of a data pack to use instead of CONTENT_FILE
+CONTENT_FORMAT = 1 # Bumped whenever the compiled layout changes, so older caches are ignored
+
+class ContentError(ValueError):
+    """A data pack that's malformed or refers to things it doesn't define."""
+
+@dataclass(frozen=True)
+class ContentPack:
+    """A compiled data pack. Deed IDs are positions in deed_names (and their history bits);
+    status_thresholds is sorted, with status_names alongside, for bisection."""
+    digest: str
+    deed_names: tuple
+    deed_points: tuple # SP per deed, by deed ID
+    categories: tuple # (category, deed IDs) pairs, in menu order
+    status_thresholds: tuple
+    status_names: tuple
+    bounties: tuple # Bounty fields, as tuples
+    offers: tuple # (character, QuestRule keyword dicts) pairs
+    achievements: tuple # Achievement keyword dicts
+
+    def status(self, hp):
+        """Name of the Shire Status `hp` Hobbit-Points have earned, or "Unknown"."""
+        index = bisect.bisect_right(self.status_thresholds, hp) - 1
+        return self.status_names[index] if index >= 0 else "Unknown"
+
+    def statuses_reached(self, old_hp, new_hp):
+        """Statuses whose threshold lies above `old_hp` and no higher than `new_hp`."""
+        return self.status_names[bisect.bisect_right(self.status_thresholds, old_hp):
+                                 bisect.bisect_right(self.status_thresholds, new_hp)]
+
+def _expect(value, kind, where):
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        noun = {int: "a whole number", str: "text", list: "a list", dict: "an object", bool: "true or false"}[kind]
+        raise ContentError(f"{where} should be {noun}, not {value!r}.")
+    if kind is str and not value.strip():
+        raise ContentError(f"{where} is empty.")
+    if kind is int and value < 0:
+        raise ContentError(f"{where} can't be negative.")
+    return value
+
+def _fields(entry, where, required, optional):
+    """Checks a pack entry's fields against {field: type} specs; returns {field: value}.
+    A `tuple` spec is a list of names, returned as a tuple."""
+    _expect(entry, dict, where)
+    unknown = set(entry) - set(required) - set(optional)
+    if unknown:
+        raise ContentError(f"{where} has unknown fields: {', '.join(sorted(unknown))}.")
+    fields = {}
+    for name, kind in {**required, **optional}.items():
+        if name not in entry:
+            if name in required:
+                raise ContentError(f"{where} is missing '{name}'.")
+            continue
+        value = entry[name]
+        if kind is tuple: # A list of names
+            value = tuple(_expect(item, str, f"{where}: each of '{name}'") for item in _expect(value, list, f"{where}: '{name}'"))
+        elif not (value is None and name == 'window'):
+            _expect(value, kind, f"{where}: '{name}'")
+        fields[name] = value
+    return fields
+
+def _unique(names, noun):
+    seen = set()
+    for name in names:
+        if name in seen:
+            raise ContentError(f"The {noun} '{name}' is defined twice.")
+        seen.add(name)
+    return seen
+
+def compile_content(data, digest=''):
+    """Validates a parsed data pack and compiles it into a ContentPack. Raises ContentError."""
+    pack = _fields(data, "The data pack", {'deeds': dict, 'status_levels': dict},
+                   {'bounties': list, 'offers': dict, 'achievements': list})
+    deed_names, deed_points, categories = [], [], []
+    for category, deeds in pack['deeds'].items():
+        ids = []
+        for name, points in _expect(deeds, dict, f"Deed category '{category}'").items():
+            ids.append(len(deed_names))
+            deed_names.append(_expect(name, str, f"A deed name in '{category}'"))
+            deed_points.append(_expect(points, int, f"Points for '{name}'"))
+        categories.append((category, tuple(ids)))
+    _unique(deed_names, "deed")
+    if len(deed_names) > MAX_DEEDS:
+        raise ContentError(f"The data pack has {len(deed_names)} deeds; at most {MAX_DEEDS} can be tracked.")
+
+    levels = sorted((_expect(hp, int, f"Hobbit-Points for '{name}'"), name) for name, hp in pack['status_levels'].items())
+    if not levels:
+        raise ContentError("The data pack has no Shire Status levels.")
+    _unique([hp for hp, _ in levels], "Shire Status threshold")
+
+    offers, offer_deeds = [], set()
+    for character, rules in pack.get('offers', {}).items():
+        compiled = []
+        for rule in _expect(rules, list, f"Offers for '{character}'"):
+            where = f"An offer of {character}'s"
+            fields = _fields(rule, where, {'name': str, 'description': str, 'hp_reward': int, 'achievement': str},
+                             {'required_deeds': tuple, 'any_deeds': tuple, 'days': int, 'window': int, 'consecutive': bool})
+            if not (fields.get('required_deeds') or fields.get('any_deeds')):
+                raise ContentError(f"{character}'s offer '{fields['name']}' needs required_deeds or any_deeds.")
+            if fields.get('days', 1) < 1:
+                raise ContentError(f"{character}'s offer '{fields['name']}' must last at least one day.")
+            offer_deeds.update(fields.get('required_deeds', ()) + fields.get('any_deeds', ()))
+            compiled.append(fields)
+        _unique([rule['name'] for rule in compiled], f"offer of {character}'s")
+        offers.append((character, tuple(compiled)))
+    offer_names = _unique([rule['name'] for _, rules in offers for rule in rules], "offer")
+    known_deeds = set(deed_names) | offer_deeds # Characters may check for unscored deeds
+
+    bounties = []
+    for bounty in pack.get('bounties', ()):
+        fields = _fields(bounty, "A bounty", {'name': str, 'description': str, 'hp_reward': int, 'achievement': str,
+                                              'targets': dict}, {})
+        targets = tuple(fields['targets'].items())
+        for deed_name, days in targets:
+            if deed_name not in known_deeds:
+                raise ContentError(f"The bounty '{fields['name']}' needs an unknown deed, '{deed_name}'.")
+            if not 1 <= _expect(days, int, f"Days of '{deed_name}' for '{fields['name']}'") <= 7:
+                raise ContentError(f"The bounty '{fields['name']}' needs '{deed_name}' on 1 to 7 days.")
+        if not targets:
+            raise ContentError(f"The bounty '{fields['name']}' has no targets.")
+        bounties.append((fields['name'], fields['description'], fields['hp_reward'], fields['achievement'], targets))
+    bounty_names = _unique([bounty[0] for bounty in bounties], "bounty")
+
+    achievements = []
+    for achievement in pack.get('achievements', ()):
+        fields = _fields(achievement, "An achievement", {'name': str, 'description': str},
+                         {'deeds': tuple, 'deed_days': int, 'streak': tuple, 'streak_days': int, 'hp': int,
+                          'favors': tuple, 'bounties': tuple})
+        for deed_name in fields.get('deeds', ()) + fields.get('streak', ()):
+            if deed_name not in known_deeds:
+                raise ContentError(f"The achievement '{fields['name']}' needs an unknown deed, '{deed_name}'.")
+        for kind, names, known in (('offer', 'favors', offer_names), ('bounty', 'bounties', bounty_names)):
+            for name in fields.get(names, ()):
+                if name not in known:
+                    raise ContentError(f"The achievement '{fields['name']}' needs an unknown {kind}, '{name}'.")
+        achievements.append(fields)
+    _unique([achievement['name'] for achievement in achievements], "achievement")
+
+    return ContentPack(digest, tuple(deed_names), tuple(deed_points), tuple(categories),
+                       tuple(hp for hp, _ in levels), tuple(name for _, name in levels),
+                       tuple(bounties), tuple(offers), tuple(achievements))
+
+def load_content(path=CONTENT_FILE):
+    """The compiled data pack at `path`, from the cache when the pack hasn't changed.
+    Raises ContentError for a pack that doesn't validate."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    folder, filename = os.path.split(os.path.abspath(path))
+    cache_file = os.path.join(folder, '__pycache__', f"{os.path.splitext(filename)[0]}.{sys.implementation.cache_tag}."
+                                                     f"{digest[:16]}.content")
+    try:
+        with open(cache_file, 'rb') as f:
+            fields = marshal.loads(f.read())
+        if fields[0] == CONTENT_FORMAT and fields[1] == digest:
+            return ContentPack(*fields[1:])
+    except (OSError, EOFError, ValueError, TypeError, IndexError):
+        pass # No cache yet, or one from another build; compile afresh
+    try:
+        data = json.loads(raw)
+    except ValueError as exc:
+        raise ContentError(f"{path} isn't valid JSON: {exc}")
+    content = compile_content(data, digest)
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'wb') as f:
+            marshal.dump((CONTENT_FORMAT,) + astuple(content), f)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        pass # A read-only install just compiles the pack on every start
+    return content
+
+# --- Daily Deeds ---
+MAX_DEEDS = 64 # One bit per deed in an unsigned 64-bit day mask
+CONTENT = load_content(os.environ.get(CONTENT_ENV) or CONTENT_FILE)
+
+# Read-only views of the pack, by name
+DAILY_DEEDS_LIST = MappingProxyType({category: tuple(CONTENT.deed_names[i] for i in ids)
+                                     for category, ids in CONTENT.categories})
+DAILY_DEED_POINTS = MappingProxyType(dict(zip(CONTENT.deed_names, CONTENT.deed_points)))
+SHIRE_STATUS_LEVELS = MappingProxyType(dict(zip(CONTENT.status_thresholds, CONTENT.status_names))) # HP needed -> status
+
+# Every deed gets a bit in the per-day history masks. The scored deeds come first;
+# anything else a character checks for (e.g. avoiding snacks) is added on first use.
+DEED_NAMES = list(CONTENT.deed_names)
+DEED_IDS = {name: i for i, name in enumerate(DEED_NAMES)}
+
+def deed_id(deed_name):
+    """Returns the bit index for a deed, registering it if it hasn't been seen before."""
+    index = DEED_IDS.get(deed_name)
+    if index is None:
+        if len(DEED_NAMES) >= MAX_DEEDS:
+            raise ValueError(f"Too many distinct deeds to track (limit {MAX_DEEDS}).")
+        index = len(DEED_NAMES)
+        DEED_NAMES.append(deed_name)
+        DEED_IDS[deed_name] = index
+    return index
+
+def deed_mask(*deed_names):
+    """Combines deeds into a single bitmask, e.g. deed_mask("Fruit Orchard Harvest", "Vegetable Patch Platter")."""
+    mask = 0
+    for deed_name in deed_names:
+        mask |= 1 << deed_id(deed_name)
+    return mask
+
+# Day masks are stored in the narrowest unsigned array type that holds every registered
+# deed's bit, and widened if a deed with a higher bit is logged later.
+MASK_TYPECODES = sorted({array(code).itemsize: code for code in 'QLIHB'}.items()) # (bytes, typecode), narrowest first
+
+def mask_typecode(bits):
+    """Array typecode of the narrowest unsigned integer with at least `bits` bits."""
+    for size, code in MASK_TYPECODES:
+        if bits <= 8 * size:
+            return code
+    raise ValueError(f"Masks wider than {8 * MASK_TYPECODES[-1][0]} bits aren't supported.")
+
+# Achievement names live once in this shared catalog; each player keeps only the IDs it has.
+ACHIEVEMENT_NAMES = []
+ACHIEVEMENT_IDS = {}
+
+def achievement_id(name):
+    """Returns the catalog ID for an achievement, registering it if it hasn't been seen before."""
+    index = ACHIEVEMENT_IDS.get(name)
+    if index is None:
+        index = len(ACHIEVEMENT_NAMES)
+        name = sys.intern(name)
+        ACHIEVEMENT_NAMES.append(name)
+        ACHIEVEMENT_IDS[name] = index
+    return index
 
 # --- Shire Calendar Class ---
+SHIRE_CACHE_SIZE = 4096 # Single-day conversions remembered by ShireCalendar.get_shire_date
+
 class ShireCalendar:
-    """Manages the Shire Reckoning calendar."""
+    """Converts Gregorian dates to Shire Reckoning.
+
+    The Shire year has twelve 30-day months with the Yule days around the new year and
+    the Lithe days at midsummer, plus Overlithe after Mid-year's Day in leap years:
+
+        2 Yule, Afteryule .. Forelithe, 1 Lithe, Mid-year's Day, (Overlithe), 2 Lithe,
+        Afterlithe .. Foreyule, 1 Yule
+
+    Every year starts on a Sterday, and Mid-year's Day and Overlithe belong to no
+    weekday, so a day's name never changes from year to year. The year begins on
+    Gregorian 22 December, which puts Mid-year's Day on the summer solstice and makes
+    Shire leap years line up with Gregorian ones.
+
+    Each year layout is built once as a table of labels; converting a range of days is
+    a slice of that table, and single days go through a bounded cache.
+    """
     SHIRE_MONTHS = [
         "Afteryule", "Solmath", "Rethe", "Astron", "Thrimidge", "Forelithe",
-        "Lithe", "Overlithe", "Afterlithe", "Halimath", "Winterfilth", "Blotmath", "Foreyule"
-    ]
+        "Afterlithe", "Wedmath", "Halimath", "Winterfilth", "Blotmath", "Foreyule"
+    ] # The Lithe days fall between Forelithe and Afterlithe
     SHIRE_DAYS = [
-        "Sunday", "Monday", "Trewsday", "Wedsday", "Thursday", "Freesday", "Saturday"
-    ] # Note: Shire calendar days are slightly different, but we'll map to Gregorian for simplicity here
-
-    def get_shire_date(self, gregorian_date):
-        """Converts a Gregorian date to a simplified Shire date."""
-        # This is a very simplified mapping. A full Shire calendar conversion is complex.
-        # We'll just map the month and day of the week, and use the Gregorian day number.
-        month_index = (gregorian_date.month - 1) % len(self.SHIRE_MONTHS)
-        shire_month = self.SHIRE_MONTHS[month_index]
-        shire_day_of_week = self.SHIRE_DAYS[gregorian_date.weekday()]
-        return f"{gregorian_date.day} {shire_month}, {shire_day_of_week}"
+        "Sterday", "Sunday", "Monday", "Trewsday", "Hevensday", "Mersday", "Highday"
+    ]
+    MONTH_LENGTH = 30
+    YEAR_START = (12, 22) # Gregorian month and day of 2 Yule
+
+    @staticmethod
+    def _year_start(gregorian_date):
+        """Ordinal of 2 Yule for the Shire year containing gregorian_date."""
+        month, day = ShireCalendar.YEAR_START
+        year = gregorian_date.year + ((gregorian_date.month, gregorian_date.day) >= (month, day))
+        return datetime.date(year - 1, month, day).toordinal(), year
+
+    @staticmethod
+    @functools.lru_cache(maxsize=2)
+    def year_days(leap):
+        """(day, month, weekday) for every day of a Shire year, in order. Special days have
+        a name instead of a month day ("Mid-year's Day", "2 Yule") and month None."""
+        days = [("2 Yule", None)]
+        for month in ShireCalendar.SHIRE_MONTHS[:6]:
+            days += [(str(d), month) for d in range(1, ShireCalendar.MONTH_LENGTH + 1)]
+        days += [("1 Lithe", None), ("Mid-year's Day", None)]
+        if leap:
+            days.append(("Overlithe", None))
+        days.append(("2 Lithe", None))
+        for month in ShireCalendar.SHIRE_MONTHS[6:]:
+            days += [(str(d), month) for d in range(1, ShireCalendar.MONTH_LENGTH + 1)]
+        days.append(("1 Yule", None))
+
+        table = []
+        weekday = 0
+        for day, month in days:
+            if day in ("Mid-year's Day", "Overlithe"):
+                table.append((day, month, None))
+                continue
+            table.append((day, month, ShireCalendar.SHIRE_DAYS[weekday]))
+            weekday = (weekday + 1) % 7
+        return tuple(table)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=2)
+    def year_labels(leap):
+        """The display string for every day of a Shire year, in order."""
+        labels = []
+        for day, month, weekday in ShireCalendar.year_days(leap):
+            label = f"{day} {month}" if month else day
+            labels.append(f"{label}, {weekday}" if weekday else label)
+        return tuple(labels)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=SHIRE_CACHE_SIZE)
+    def get_shire_date(gregorian_date):
+        """Converts a Gregorian date to a Shire date, e.g. "14 Winterfilth, Highday"."""
+        first, year = ShireCalendar._year_start(gregorian_date)
+        return ShireCalendar.year_labels(calendar.isleap(year))[gregorian_date.toordinal() - first]
+
+    @staticmethod
+    def get_shire_dates(start, end):
+        """Shire dates for every day from start to end (inclusive), built a year at a time."""
+        labels = []
+        ordinal, last = start.toordinal(), end.toordinal()
+        while ordinal <= last:
+            first, year = ShireCalendar._year_start(datetime.date.fromordinal(ordinal))
+            year_labels = ShireCalendar.year_labels(calendar.isleap(year))
+            stop = min(last - first + 1, len(year_labels))
+            labels.extend(year_labels[ordinal - first:stop])
+            ordinal = first + stop
+        return labels
+
+# --- Clock ---
+class SystemClock:
+    """Today is the real date."""
+    def today(self):
+        return datetime.date.today()
+
+class ManualClock:
+    """Today is whatever the game says it is: it starts on a given date (default: the real
+    date) and only moves when advanced or set, e.g. by the Advance to Next Day option."""
+    def __init__(self, start=None):
+        self.day = start or datetime.date.today()
+
+    def today(self):
+        return self.day
+
+    def set(self, day):
+        self.day = datetime.date.fromordinal(_to_ordinal(day))
+
+    def advance(self, days=1):
+        self.day += datetime.timedelta(days=days)
+
+SYSTEM_CLOCK = SystemClock()
+
+# --- Deed History ---
+def _to_ordinal(day):
+    if type(day) is int: # Already an ordinal
+        return day
+    if isinstance(day, str):
+        day = datetime.date.fromisoformat(day)
+    if not isinstance(day, datetime.date):
+        raise TypeError(f"A day must be a date, an ISO date string or an ordinal, not {type(day).__name__}.")
+    return day.toordinal()
+
+def _iso_day(day):
+    return datetime.date.fromordinal(_to_ordinal(day)).isoformat()
+
+def journal_day(value):
+    """The ordinal of a day as written in a journal record: an ordinal, or in journals from
+    older versions the day as it was passed in (an ISO date string or a stringified ordinal)."""
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return _to_ordinal(value)
+
+class DeedHistory:
+    """Compact record of which deeds were done on which day.
+
+    Each day is one bitmask (see deed_id) in an array indexed by the day's offset from
+    the earliest logged day, so a day costs a few bytes instead of a dict of deed names.
+    Days accept datetime.date objects, ISO date strings or date ordinals.
+
+    A history loaded from a binary snapshot may hold only its recent days at first;
+    `archive` then returns (start, masks) for the older ones, and is called the first
+    time anything looks before `start`.
+    """
+    __slots__ = ('start', 'masks', 'archive')
+
+    def __init__(self):
+        self.start = None # Ordinal of the day stored at offset 0
+        self.masks = array(mask_typecode(len(DEED_NAMES)))
+        self.archive = None # Loads the days before `start`, when they haven't been read yet
+
+    def __len__(self):
+        """Number of days with at least one deed logged."""
+        self.load_archive()
+        return sum(1 for m in self.masks if m)
+
+    def load_archive(self):
+        """Reads the archived older days in front of the recent ones, if still pending."""
+        if self.archive is None:
+            return
+        loader, self.archive = self.archive, None
+        start, masks = loader()
+        if not masks:
+            return
+        if self.start is None:
+            self.start, self.masks = start, masks
+            return
+        if masks.itemsize < self.masks.itemsize: # Both arrays need the wider of the two types
+            masks = array(self.masks.typecode, masks)
+        gap = self.start - (start + len(masks))
+        masks.frombytes(bytes(masks.itemsize * gap))
+        masks.extend(array(masks.typecode, self.masks) if self.masks.itemsize < masks.itemsize else self.masks)
+        self.start, self.masks = start, masks
+
+    def _fit(self, mask):
+        """Widens the mask array if `mask` has a bit it can't hold."""
+        if mask >> (8 * self.masks.itemsize):
+            self.masks = array(mask_typecode(mask.bit_length()), self.masks)
+
+    def _ensure_day(self, ordinal):
+        if self.archive is not None and (self.start is None or ordinal < self.start):
+            self.load_archive()
+        if self.start is None:
+            self.start = ordinal
+        if ordinal < self.start:
+            self.masks[0:0] = array(self.masks.typecode, bytes(self.masks.itemsize * (self.start - ordinal)))
+            self.start = ordinal
+        offset = ordinal - self.start
+        if offset >= len(self.masks):
+            self.masks.frombytes(bytes(self.masks.itemsize * (offset + 1 - len(self.masks))))
+        return offset
+
+    def add(self, day, deed_name):
+        """Marks a deed as done on a day. Returns False if it was already marked."""
+        bit = 1 << deed_id(deed_name)
+        offset = self._ensure_day(_to_ordinal(day))
+        if self.masks[offset] & bit:
+            return False
+        self._fit(bit)
+        self.masks[offset] |= bit
+        return True
+
+    def merge_mask(self, day, mask):
+        """Marks every deed in `mask` as done on a day; returns the bits that weren't set before."""
+        offset = self._ensure_day(_to_ordinal(day))
+        new_bits = mask & ~self.masks[offset]
+        self._fit(mask)
+        self.masks[offset] |= mask
+        return new_bits
+
+    def mask(self, day):
+        """The bitmask of deeds done on a day (0 if none were logged)."""
+        return self.mask_at(_to_ordinal(day))
+
+    def mask_at(self, ordinal):
+        """Same as mask() for a day already given as an ordinal."""
+        if self.start is None:
+            return 0
+        offset = ordinal - self.start
+        if 0 <= offset < len(self.masks):
+            return self.masks[offset]
+        if offset < 0 and self.archive is not None:
+            self.load_archive()
+            return self.mask_at(ordinal)
+        return 0
+
+    def has(self, day, deed_name):
+        return bool(self.mask(day) & (1 << deed_id(deed_name)))
+
+    def deeds_on(self, day):
+        """Names of the deeds done on a day, in catalog order."""
+        m = self.mask(day)
+        return [name for i, name in enumerate(DEED_NAMES) if m >> i & 1]
+
+    def days_matching(self, required_mask, start=None, end=None):
+        """Dates between start and end (inclusive) on which every deed in required_mask was done.
+
+        e.g. days_matching(deed_mask("Fruit Orchard Harvest", "Vegetable Patch Platter"))
+        """
+        if start is None or self.start is None or _to_ordinal(start) < self.start:
+            self.load_archive()
+        if self.start is None:
+            return []
+        lo = 0 if start is None else max(0, _to_ordinal(start) - self.start)
+        hi = len(self.masks) if end is None else max(0, min(len(self.masks), _to_ordinal(end) - self.start + 1))
+        return [datetime.date.fromordinal(self.start + lo + i)
+                for i, m in enumerate(self.masks[lo:hi]) if m & required_mask == required_mask]
+
+    def clear(self):
+        self.start = None
+        self.masks = array(mask_typecode(len(DEED_NAMES)))
+        self.archive = None
+
+    def to_dict(self):
+        """Legacy save format: {iso_date: {deed_name: True}} for every day with deeds."""
+        self.load_archive()
+        data = {}
+        for offset, m in enumerate(self.masks):
+            if m:
+                day = datetime.date.fromordinal(self.start + offset).isoformat()
+                data[day] = {name: True for i, name in enumerate(DEED_NAMES) if m >> i & 1}
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        history = cls()
+        for day in sorted(data):
+            for deed_name, done in data[day].items():
+                if done:
+                    history.add(day, deed_name)
+        return history
+
+# --- Streak Index ---
+class StreakIndex:
+    """Keeps the latest run of consecutive days for each tracked deed combination.
+
+    A combination is a deed mask (see deed_mask); a day counts toward its run when every
+    deed in the mask was done. Runs are extended as deeds are logged, so asking how long
+    a streak is costs the same for a 2-day favor as for a 100-day one. Archived days are
+    only read when a run reaches them or a question is about them: a run known to have
+    ended before the loaded days is left as ARCHIVED_RUN until it's needed.
+    """
+    __slots__ = ('history', 'runs')
+    ARCHIVED_RUN = 'archived' # In runs: the latest run ended somewhere in the unread archive
+
+    def __init__(self, history):
+        self.history = history
+        self.runs = {} # mask -> [first_ordinal, last_ordinal] of the latest run, None or ARCHIVED_RUN
+
+    def _satisfied(self, ordinal, mask):
+        return self.history.mask_at(ordinal) & mask == mask
+
+    def _scan(self, mask, last=None):
+        """Finds the run ending at or before `last` (default: the newest logged day) the slow way.
+        Returns ARCHIVED_RUN if no loaded day has the deeds but archived days are still unread."""
+        history = self.history
+        if history.start is None:
+            history.load_archive()
+        if history.start is None:
+            return None
+        offset = len(history.masks) - 1 if last is None else min(last - history.start, len(history.masks) - 1)
+        while offset >= 0 and history.masks[offset] & mask != mask:
+            offset -= 1
+        if offset < 0:
+            return self.ARCHIVED_RUN if history.archive is not None else None
+        end = offset
+        while offset > 0 and history.masks[offset - 1] & mask == mask:
+            offset -= 1
+        if offset == 0 and history.archive is not None: # The run may go on into archived days
+            history.load_archive()
+            return self._scan(mask, last)
+        return [history.start + offset, history.start + end]
+
+    def _archived_run(self, mask, last=None):
+        """Reads the archive to find a run that _scan left as ARCHIVED_RUN."""
+        self.history.load_archive()
+        run = self._scan(mask, last)
+        if last is None:
+            self.runs[mask] = run
+        return run
+
+    def track(self, mask):
+        if mask not in self.runs:
+            self.runs[mask] = self._scan(mask)
+
+    def update(self, day, bit=None):
+        """Called after a deed is logged on `day` so every tracked run stays current. Given
+        the deed's mask `bit`, only runs that include it are looked at. Returns
+        {mask: previous length} for the latest runs that grew (their length before was
+        0 if a new run started)."""
+        ordinal = _to_ordinal(day)
+        day_mask = None
+        grown = {}
+        for mask, run in self.runs.items():
+            if bit is not None and not mask & bit:
+                continue
+            if day_mask is None:
+                day_mask = self.history.mask_at(ordinal)
+            if day_mask & mask != mask:
+                continue
+            if run is self.ARCHIVED_RUN:
+                if self.history.archive is None or ordinal <= self.history.start: # Could join the old run
+                    run = self._archived_run(mask)
+                else:
+                    run = None
+            if run is None or ordinal > run[1] + 1:
+                self.runs[mask] = [ordinal, ordinal]
+                grown[mask] = 0
+            elif ordinal == run[1] + 1:
+                grown[mask] = run[1] - run[0] + 1
+                run[1] = ordinal
+            elif ordinal == run[0] - 1: # Back-filled the day before the run; it may join older days
+                grown[mask] = run[1] - run[0] + 1
+                run[0] = ordinal
+                while self._satisfied(run[0] - 1, mask):
+                    run[0] -= 1
+        return grown
+
+    def clear(self):
+        self.runs = {mask: None for mask in self.runs}
+
+    def rebuild(self):
+        """Rescans every tracked run, e.g. after deeds were written straight into the history."""
+        self.runs = {mask: self._scan(mask) for mask in self.runs}
+
+    def run_length(self, mask, today, since=None):
+        """Consecutive days up to and including `today` on which every deed in `mask` was done,
+        not counting days before `since`."""
+        self.track(mask)
+        today = _to_ordinal(today)
+        run = self.runs[mask]
+        if run is self.ARCHIVED_RUN:
+            if self.history.archive is not None and today >= self.history.start:
+                return 0 # The latest run ended before every loaded day
+            run = self._archived_run(mask)
+        if run is None or run[1] < today:
+            return 0
+        if run[1] > today: # Days after `today` were logged; fall back to a scan
+            run = self._scan(mask, today)
+            if run is self.ARCHIVED_RUN:
+                if today >= self.history.start:
+                    return 0
+                run = self._archived_run(mask, today)
+            if run is None or run[1] != today:
+                return 0
+        first = run[0] if since is None else max(run[0], _to_ordinal(since))
+        return max(0, today - first + 1)
+
+    def latest_length(self, mask):
+        """Length of the latest run for `mask`, whenever it ended (0 if there's none)."""
+        self.track(mask)
+        run = self.runs[mask]
+        if run is self.ARCHIVED_RUN:
+            run = self._archived_run(mask)
+        return run[1] - run[0] + 1 if run else 0
+
+# --- Deed Totals ---
+def count_deed_days(masks):
+    """array of how many of the day `masks` each deed was done on, indexed by deed_id."""
+    counts = array('I', bytes(4 * MAX_DEEDS))
+    for m, days in collections.Counter(masks).items():
+        while m:
+            bit = m & -m
+            counts[bit.bit_length() - 1] += days
+            m ^= bit
+    return counts
+
+class DeedTotals:
+    """How many days each deed has been done on, over the whole history.
+
+    Counted from the history the first time a total is asked for (each distinct day mask
+    is only broken into bits once), then kept current as deeds are logged. While a
+    snapshot's archived days are unread, their totals come from the snapshot instead.
+    """
+    __slots__ = ('history', 'counts', 'archived')
+
+    def __init__(self, history):
+        self.history = history
+        self.counts = None # array of per-deed totals, indexed by deed_id, once counted
+        self.archived = None # {deed name: days} over the history's unread archive, if known
+
+    def record(self, bit):
+        """Called after a new deed (its mask bit) is logged on a day."""
+        if self.counts is not None:
+            self.counts[bit.bit_length() - 1] += 1
+
+    def count(self, deed_name):
+        if self.counts is None:
+            history = self.history
+            if self.archived is None:
+                history.load_archive()
+            self.counts = count_deed_days(history.masks)
+            if history.archive is not None: # Still unread; its totals came with the snapshot
+                for name, days in self.archived.items():
+                    self.counts[deed_id(name)] += days
+        return self.counts[deed_id(deed_name)]
+
+    def clear(self):
+        """Forgets the totals; they're recounted from the history on next use."""
+        self.counts = None
+
+# --- Weekly Bounties ---
+@dataclass(frozen=True)
+class Bounty:
+    """A weekly goal: each deed in `targets` done on at least the given number of the last 7 days."""
+    name: str
+    description: str
+    hp_reward: int
+    achievement: str
+    targets: tuple # (deed_name, days) pairs
+
+WEEKLY_BOUNTIES = tuple(Bounty(*fields) for fields in CONTENT.bounties)
+BOUNTY_WINDOW_DAYS = 7
+ISO_WEEK_CACHE_SIZE = 4096 # Days whose ISO week iso_week remembers (one lookup per day logged)
+
+@functools.lru_cache(maxsize=ISO_WEEK_CACHE_SIZE)
+def iso_week(day):
+    """The ISO week a day falls in, e.g. '2025-W05'. Bounties are claimed at most once per week."""
+    year, week, _ = datetime.date.fromordinal(_to_ordinal(day)).isocalendar()
+    return sys.intern(f"{year}-W{week:02d}") # Shared by every player's bounty_claims
+
+class WeeklyTally:
+    """Per-deed counts of the days each deed was done in a rolling window of recent days.
+
+    The window slides day by day as later days are asked about, adding the day that
+    enters and dropping the one that leaves, so a count costs the same with years of
+    history as with one week. Deeds logged inside the window are counted as they come in.
+    """
+    __slots__ = ('history', 'days', 'end', 'counts')
+
+    def __init__(self, history, days=BOUNTY_WINDOW_DAYS):
+        self.history = history
+        self.days = days
+        self.end = None # Ordinal of the newest day in the window
+        self.counts = array('H', bytes(2 * MAX_DEEDS))
+
+    def _count_mask(self, mask, step):
+        while mask:
+            bit = mask & -mask
+            self.counts[bit.bit_length() - 1] += step
+            mask ^= bit
+
+    def _slide(self, end):
+        if self.end is None or end < self.end or end - self.end >= self.days:
+            self.counts = array('H', bytes(2 * MAX_DEEDS))
+            for ordinal in range(end - self.days + 1, end + 1):
+                self._count_mask(self.history.mask_at(ordinal), 1)
+        else:
+            for ordinal in range(self.end + 1, end + 1):
+                self._count_mask(self.history.mask_at(ordinal), 1)
+                self._count_mask(self.history.mask_at(ordinal - self.days), -1)
+        self.end = end
+
+    def record(self, ordinal, bit):
+        """Called after a new deed (its mask bit) is logged on a day."""
+        if self.end is not None and self.end - self.days < ordinal <= self.end:
+            self._count_mask(bit, 1)
+
+    def count(self, deed_name, today):
+        """Days in the window ending `today` on which the deed was done."""
+        return self.counts_on(today)[deed_id(deed_name)]
+
+    def counts_on(self, today):
+        """Every deed's count (indexed by deed_id) in the window ending `today`."""
+        self._slide(_to_ordinal(today))
+        return self.counts
+
+    def clear(self):
+        """Forgets the window; it's recounted from the history on next use."""
+        self.end = None
+
+def claim_bounties(player, day, bounties=WEEKLY_BOUNTIES):
+    """Awards every bounty met over the 7 days up to `day` that the player hasn't
+    claimed yet in that ISO week. Returns the names of the bounties claimed."""
+    week = iso_week(day)
+    claimed = player.bounty_claims.get(week, ())
+    counts = player.weekly.counts_on(day) # Slid once for every bounty's targets
+    newly_claimed = []
+    for bounty in bounties:
+        if bounty.name in claimed:
+            continue
+        if all(counts[deed_id(deed_name)] >= days for deed_name, days in bounty.targets):
+            player.claim_bounty(week, bounty.name)
+            if player.events is not NULL_SINK:
+                player.events.emit(Narration(f"\n📜 Weekly Bounty claimed: {bounty.name}!"))
+            player.add_hp(bounty.hp_reward)
+            ACHIEVEMENTS.bounty_claimed(player, bounty)
+            newly_claimed.append(bounty.name)
+    return newly_claimed
+
+# --- Achievements ---
+@dataclass(frozen=True)
+class Achievement:
+    """An achievement and the facts it depends on; it unlocks once all of them hold.
+
+    Each deed in `deeds` must have been done on at least `deed_days` days; the deeds in
+    `streak` must have been done together on `streak_days` days in a row; `hp` is a
+    Hobbit-Points total to reach; `favors` and `bounties` name character offers that must
+    have been completed and weekly bounties that must have been claimed (in any week).
+    """
+    name: str
+    description: str
+    deeds: tuple = ()
+    deed_days: int = 1
+    streak: tuple = ()
+    streak_days: int = 0
+    hp: int = 0
+    favors: tuple = ()
+    bounties: tuple = ()
+
+class Ladder:
+    """Achievements sorted by a threshold, to find the ones a rising value has reached."""
+    __slots__ = ('thresholds', 'achievements')
+
+    def __init__(self):
+        self.thresholds = []
+        self.achievements = []
+
+    def add(self, threshold, achievement):
+        index = bisect.bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(index, threshold)
+        self.achievements.insert(index, achievement)
+
+    def reached(self, low, high):
+        """Achievements with a threshold above `low` and no higher than `high`."""
+        return self.achievements[bisect.bisect_right(self.thresholds, low):bisect.bisect_right(self.thresholds, high)]
+
+class AchievementCatalog:
+    """Every achievement the game can grant, indexed by the facts each one depends on.
+
+    When something changes (a deed logged, HP gained, an offer completed, a bounty
+    claimed) only the achievements that depend on it are checked, so a change costs the
+    same with hundreds of achievements as with ten. Deed totals rise a day at a time, so
+    a deed reaching n days only looks at achievements asking for exactly n; HP and streak
+    thresholds are kept sorted and found by bisection.
+
+    An achievement whose only requirement is a single offer or bounty records that it was
+    done; other achievements needing that offer or bounty check for it.
+    """
+    def __init__(self, achievements=(), bounties=()):
+        self.achievements = {} # name -> Achievement, in the order added
+        self.deed_totals = {} # (deed name, days) -> achievements needing that deed on that many days
+        self.counted_deeds = set() # Deeds some achievement needs a total of
+        self.indexed_deeds = set() # Deeds any achievement depends on; logging others needs no check
+        self.streaks = {} # deed name -> {streak mask: Ladder by streak_days}
+        self.streak_masks = {} # achievement name -> its streak's deed mask
+        self.hp = Ladder()
+        self.favors = {} # offer name -> achievements needing it
+        self.bounties = {} # bounty name -> achievements needing it
+        self.marks = {} # ('favor' or 'bounty', name) -> the achievement recording it was done
+        for achievement in achievements:
+            self.add(achievement)
+        for bounty in bounties:
+            self.add_bounty(bounty)
+
+    def add(self, achievement):
+        """Registers an achievement; adding the same one again does nothing."""
+        existing = self.achievements.get(achievement.name)
+        if existing is not None:
+            if existing != achievement:
+                raise ValueError(f"The achievement '{achievement.name}' is already defined differently.")
+            return
+        if not (achievement.deeds or achievement.streak or achievement.hp or achievement.favors or achievement.bounties):
+            raise ValueError(f"The achievement '{achievement.name}' doesn't depend on anything.")
+        achievement_id(achievement.name)
+        self.achievements[achievement.name] = achievement
+        for deed_name in achievement.deeds:
+            deed_id(deed_name)
+            self.counted_deeds.add(deed_name)
+            self.indexed_deeds.add(deed_name)
+            self.deed_totals.setdefault((deed_name, achievement.deed_days), []).append(achievement)
+        if achievement.streak:
+            mask = self.streak_masks[achievement.name] = deed_mask(*achievement.streak)
+            for deed_name in achievement.streak:
+                self.indexed_deeds.add(deed_name)
+                self.streaks.setdefault(deed_name, {}).setdefault(mask, Ladder()).add(achievement.streak_days, achievement)
+        if achievement.hp:
+            self.hp.add(achievement.hp, achievement)
+        facts = [('favor', name) for name in achievement.favors] + [('bounty', name) for name in achievement.bounties]
+        is_mark = len(facts) == 1 and not (achievement.deeds or achievement.streak or achievement.hp)
+        for kind, name in facts:
+            dependents = (self.favors if kind == 'favor' else self.bounties).setdefault(name, [])
+            if is_mark: # Unlocked ahead of the achievements that build on it
+                dependents.insert(0, achievement)
+                self.marks.setdefault((kind, name), achievement.name)
+            else:
+                dependents.append(achievement)
+
+    def add_offer(self, rule):
+        """Registers the achievement a character's QuestRule grants."""
+        self.add(Achievement(rule.achievement, rule.description, favors=(rule.name,)))
+
+    def add_bounty(self, bounty):
+        """Registers the achievement a weekly Bounty grants."""
+        self.add(Achievement(bounty.achievement, bounty.description, bounties=(bounty.name,)))
+
+    # --- Facts ---
+    def deed_logged(self, player, deed_name, grown=None):
+        """Called after a new deed is logged. `grown` is what StreakIndex.update returned for
+        it, so only the streak thresholds a run just passed are checked; without it every
+        threshold the latest runs have reached is. Returns the names of the achievements unlocked."""
+        candidates = []
+        streaks = self.streaks.get(deed_name)
+        if streaks:
+            runs = player.streaks.runs
+            for mask, ladder in streaks.items():
+                if grown is None or mask not in runs: # Not tracked until now: check every threshold
+                    candidates.extend(ladder.reached(0, player.streaks.latest_length(mask)))
+                elif mask in grown:
+                    candidates.extend(ladder.reached(grown[mask], player.streaks.latest_length(mask)))
+        if deed_name in self.counted_deeds:
+            candidates.extend(self.deed_totals.get((deed_name, player.totals.count(deed_name)), ()))
+        return self._check(player, candidates)
+
+    def hp_gained(self, player, old_hp):
+        """Called after the player's HP rose from `old_hp`."""
+        return self._check(player, self.hp.reached(old_hp, player.hobbit_points))
+
+    def favor_completed(self, player, rule):
+        """Called when the player completes a character's offer."""
+        if rule.achievement not in self.achievements:
+            self.add_offer(rule)
+        return self._check(player, self.favors.get(rule.name, ()), ('favor', rule.name))
+
+    def bounty_claimed(self, player, bounty):
+        """Called when the player claims a weekly bounty."""
+        if bounty.achievement not in self.achievements:
+            self.add_bounty(bounty)
+        return self._check(player, self.bounties.get(bounty.name, ()), ('bounty', bounty.name))
+
+    def review(self, player):
+        """Checks every achievement the player hasn't unlocked, e.g. after deeds were written
+        straight into the history or achievements were added to the catalog."""
+        return self._check(player, self.achievements.values())
+
+    # --- Checks ---
+    def _check(self, player, candidates, done=None):
+        unlocked = []
+        for achievement in candidates:
+            if not player.has_achievement(achievement.name) and self._met(player, achievement, done):
+                player.add_achievement(achievement.name)
+                unlocked.append(achievement.name)
+        return unlocked
+
+    def _met(self, player, achievement, done):
+        if player.hobbit_points < achievement.hp:
+            return False
+        if achievement.deeds and any(player.totals.count(deed_name) < achievement.deed_days
+                                     for deed_name in achievement.deeds):
+            return False
+        if achievement.streak and \
+                player.streaks.latest_length(self.streak_masks[achievement.name]) < achievement.streak_days:
+            return False
+        return (all(self._done(player, ('favor', name), done) for name in achievement.favors) and
+                all(self._done(player, ('bounty', name), done) for name in achievement.bounties))
+
+    def _done(self, player, fact, done):
+        if fact == done:
+            return True
+        mark = self.marks.get(fact)
+        if mark is not None and player.has_achievement(mark):
+            return True
+        if fact[0] == 'bounty':
+            return any(fact[1] in names for names in player.bounty_claims.values())
+        return False
+
+# Milestones on top of the bounty and favor achievements (the offers' achievements are
+# registered once their QuestRules are built)
+MILESTONE_ACHIEVEMENTS = tuple(Achievement(**fields) for fields in CONTENT.achievements)
+ACHIEVEMENTS = AchievementCatalog(MILESTONE_ACHIEVEMENTS, WEEKLY_BOUNTIES)
+
+# --- Health Readings ---
+BLOOD_PRESSURE_PATTERN = re.compile(r'^\s*(\d{2,3})\s*/\s*(\d{2,3})\s*(?:mm\s*hg)?\s*$', re.IGNORECASE)
+COLUMNS_MAGIC = b'SHT2' # Header of binary time-series columns
+DIRECT_SUM_READINGS = 64 # TimeSeries ranges this short are summed directly rather than from running totals
+COLUMNS_HEADERS = { # magic, origin day, reading count; padded to 16 bytes so the float columns stay 8-byte aligned
+    COLUMNS_MAGIC: struct.Struct('<4siI4x'),
+    b'SHTS': struct.Struct('<4siI') # Unpadded columns from older snapshots, still read
+}
+
+def parse_blood_pressure(text):
+    """'120/80 mmHg' -> (120, 80). Raises ValueError for anything else."""
+    match = BLOOD_PRESSURE_PATTERN.match(str(text))
+    if not match:
+        raise ValueError(f"Blood pressure should look like 120/80, not {text!r}.")
+    return int(match.group(1)), int(match.group(2))
+
+class TimeSeries:
+    """Dated readings of one measure (weight, systolic pressure, ...) in array columns, oldest first.
+
+    Running totals of the value, the day, the day squared and day × value are kept
+    alongside, so the mean or least-squares trend over any date range comes from two
+    binary searches and a subtraction, however many readings are stored. Ranges of up to
+    DIRECT_SUM_READINGS readings are summed directly instead, and the totals are only
+    built the first time a longer range is asked about, so most series cost just their
+    two columns.
+    """
+    __slots__ = ('days', 'values', 'origin', 'totals')
+
+    def __init__(self):
+        self.days = array('i') # Day ordinals, never decreasing
+        self.values = array('d')
+        self.origin = None # Day the running totals measure time from
+        self.totals = None # Σv, Σt, Σt², Σtv over readings [0, i), once built
+
+    def __len__(self):
+        return len(self.days)
+
+    def _thaw(self):
+        """Copies columns read straight out of a snapshot (see map_columns) into arrays before they're changed."""
+        if not isinstance(self.days, array):
+            self.days = array('i', self.days)
+            self.values = array('d', self.values)
+            self.totals = [array('d', column) for column in self.totals]
+
+    def _running_totals(self):
+        if self.totals is None:
+            self.totals = [array('d', [0.0]) for _ in range(4)]
+            for ordinal, value in zip(self.days, self.values):
+                self._add_to_totals(ordinal, value)
+        return self.totals
+
+    def _push(self, ordinal, value):
+        self.days.append(ordinal)
+        self.values.append(value)
+        if self.totals is not None:
+            self._add_to_totals(ordinal, value)
+
+    def _add_to_totals(self, ordinal, value):
+        t = ordinal - self.origin
+        sum_v, sum_t, sum_tt, sum_tv = self.totals
+        sum_v.append(sum_v[-1] + value)
+        sum_t.append(sum_t[-1] + t)
+        sum_tt.append(sum_tt[-1] + t * t)
+        sum_tv.append(sum_tv[-1] + t * value)
+
+    def _rebuild(self, readings):
+        self.days, self.values = array('i'), array('d')
+        self.totals = None
+        self.origin = readings[0][0] if readings else None
+        for ordinal, value in readings:
+            self._push(ordinal, value)
+
+    def append(self, day, value):
+        self.extend(((day, value),))
+
+    def extend(self, readings):
+        """Adds (day, value) readings. In-order readings are appended; anything older than
+        the newest stored reading re-sorts the columns once for the whole batch."""
+        readings = [(_to_ordinal(day), float(value)) for day, value in readings]
+        if not readings:
+            return
+        self._thaw()
+        if self.origin is None:
+            self.origin = readings[0][0]
+        last = self.days[-1] if self.days else readings[0][0]
+        if all(a[0] <= b[0] for a, b in zip(readings, readings[1:])) and readings[0][0] >= last:
+            for ordinal, value in readings:
+                self._push(ordinal, value)
+        else:
+            merged = list(zip(self.days, self.values)) + readings
+            merged.sort(key=lambda reading: reading[0])
+            self._rebuild(merged)
+
+    def _span(self, start, end):
+        lo = 0 if start is None else bisect.bisect_left(self.days, _to_ordinal(start))
+        hi = len(self.days) if end is None else bisect.bisect_right(self.days, _to_ordinal(end))
+        return lo, max(lo, hi)
+
+    def _sums(self, lo, hi):
+        if self.totals is None and hi - lo <= DIRECT_SUM_READINGS:
+            sum_v = sum_t = sum_tt = sum_tv = 0.0
+            for ordinal, value in zip(self.days[lo:hi], self.values[lo:hi]):
+                t = ordinal - self.origin
+                sum_v += value
+                sum_t += t
+                sum_tt += t * t
+                sum_tv += t * value
+            return [sum_v, sum_t, sum_tt, sum_tv]
+        return [column[hi] - column[lo] for column in self._running_totals()]
+
+    def has(self, day, value):
+        """True if exactly this reading is already stored for the day."""
+        lo, hi = self._span(day, day)
+        return any(self.values[i] == value for i in range(lo, hi))
+
+    def latest(self):
+        """(date, value) of the newest reading, or None."""
+        if not self.days:
+            return None
+        return datetime.date.fromordinal(self.days[-1]), self.values[-1]
+
+    def mean(self, start=None, end=None):
+        """Average of the readings from start to end inclusive (None if there are none)."""
+        lo, hi = self._span(start, end)
+        if hi == lo:
+            return None
+        return self._sums(lo, hi)[0] / (hi - lo)
+
+    def rolling_mean(self, today, days=7):
+        """Average over the `days` days up to and including today."""
+        today = _to_ordinal(today)
+        return self.mean(today - days + 1, today)
+
+    def trend(self, start=None, end=None):
+        """Least-squares change per day over the range (None with fewer than two distinct days)."""
+        lo, hi = self._span(start, end)
+        n = hi - lo
+        if n < 2:
+            return None
+        sum_v, sum_t, sum_tt, sum_tv = self._sums(lo, hi)
+        spread = n * sum_tt - sum_t * sum_t
+        if spread <= 0:
+            return None
+        return (n * sum_tv - sum_t * sum_v) / spread
+
+    def resample(self, period='week', start=None, end=None):
+        """[(period start date, mean, readings)] for each week (ISO, from Monday) or month
+        between start and end that has readings. Costs one lookup per period."""
+        if not self.days:
+            return []
+        first = datetime.date.fromordinal(self.days[0] if start is None else max(self.days[0], _to_ordinal(start)))
+        last = datetime.date.fromordinal(self.days[-1] if end is None else min(self.days[-1], _to_ordinal(end)))
+        if period == 'week':
+            bucket = first - datetime.timedelta(days=first.weekday())
+            next_bucket = lambda day: day + datetime.timedelta(days=7)
+        elif period == 'month':
+            bucket = first.replace(day=1)
+            next_bucket = lambda day: (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+        else:
+            raise ValueError("period must be 'week' or 'month'")
+        rows = []
+        while bucket <= last:
+            following = next_bucket(bucket)
+            lo, hi = self._span(max(bucket, first), min(following - datetime.timedelta(days=1), last))
+            if hi > lo:
+                rows.append((bucket, self._sums(lo, hi)[0] / (hi - lo), hi - lo))
+            bucket = following
+        return rows
+
+    def to_dict(self):
+        return {
+            'days': [datetime.date.fromordinal(o).isoformat() for o in self.days],
+            'values': list(self.values)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        series = cls()
+        series.extend(zip(data.get('days', []), data.get('values', [])))
+        return series
+
+    def write_columns(self, f):
+        """Writes the columns and running totals in the binary layout map_columns reads.
+        Written from an 8-byte boundary, every float column starts on one too."""
+        f.write(COLUMNS_HEADERS[COLUMNS_MAGIC].pack(COLUMNS_MAGIC, self.origin or 0, len(self.days)))
+        days = array('i', self.days)
+        if len(days) % 2: # Pad the day column to a multiple of 8 bytes
+            days.append(0)
+        f.write(days.tobytes())
+        f.write(array('d', self.values).tobytes())
+        for column in self._running_totals():
+            f.write(array('d', column).tobytes())
+
+    @classmethod
+    def map_columns(cls, buffer, offset=0):
+        """Reads a series written by write_columns straight out of `buffer` (e.g. an mmap)
+        without copying it. Returns (series, offset just past it)."""
+        header = COLUMNS_HEADERS.get(bytes(buffer[offset:offset + 4]))
+        if header is None:
+            raise ValueError("Not Shire time-series columns.")
+        _, origin, count = header.unpack_from(buffer, offset)
+        view = memoryview(buffer)
+        offset += header.size
+        series = cls()
+        series.origin = origin if count else None
+        series.days = view[offset:offset + 4 * count].cast('i')
+        offset += 4 * (count + count % 2)
+        series.values = view[offset:offset + 8 * count].cast('d')
+        offset += 8 * count
+        series.totals = []
+        for _ in range(4):
+            series.totals.append(view[offset:offset + 8 * (count + 1)].cast('d'))
+            offset += 8 * (count + 1)
+        return series, offset
+
+class HealthLog:
+    """Weight and blood pressure readings over time, one TimeSeries per measure."""
+    MEASURES = ('weight', 'systolic', 'diastolic')
+    __slots__ = MEASURES
+
+    def __init__(self):
+        self.weight = TimeSeries()
+        self.systolic = TimeSeries()
+        self.diastolic = TimeSeries()
+
+    def add(self, day, weight=None, systolic=None, diastolic=None):
+        if weight is not None:
+            self.weight.append(day, weight)
+        if systolic is not None and diastolic is not None:
+            self.systolic.append(day, systolic)
+            self.diastolic.append(day, diastolic)
+
+    def summary(self, today, days=30):
+        """Latest reading, 7-day and `days`-day averages and the weekly trend of each measure."""
+        start = _to_ordinal(today) - days + 1
+        report = {}
+        for measure in self.MEASURES:
+            series = getattr(self, measure)
+            trend = series.trend(start, today)
+            report[measure] = {
+                'latest': series.latest(),
+                'average_7_days': series.rolling_mean(today, 7),
+                f'average_{days}_days': series.rolling_mean(today, days),
+                'trend_per_week': trend * 7 if trend is not None else None
+            }
+        return report
+
+    def to_dict(self):
+        return {measure: getattr(self, measure).to_dict() for measure in self.MEASURES}
+
+    @classmethod
+    def from_dict(cls, data):
+        log = cls()
+        for measure in cls.MEASURES:
+            setattr(log, measure, TimeSeries.from_dict(data.get(measure, {})))
+        return log
+
+    def write_columns(self, f):
+        for measure in self.MEASURES:
+            getattr(self, measure).write_columns(f)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """A log whose series read straight out of `buffer`, as written by write_columns."""
+        log = cls()
+        offset = 0
+        for measure in cls.MEASURES:
+            series, offset = TimeSeries.map_columns(buffer, offset)
+            setattr(log, measure, series)
+        return log
+
+# --- Game Events ---
+# The game reports what happens as events sent to a sink instead of printing, so the
+# same logic can drive the terminal, run silently in bulk, or feed an audit log.
+@dataclass(frozen=True)
+class SPGained:
+    amount: int
+    total: int
+
+@dataclass(frozen=True)
+class HPGained:
+    amount: int
+    total: int
+    status: str # Shire Status after the gain
+
+@dataclass(frozen=True)
+class StatusAdvanced:
+    status: str
+
+@dataclass(frozen=True)
+class AchievementUnlocked:
+    name: str
+
+@dataclass(frozen=True)
+class DeedLogged:
+    day: str # ISO date the deed was logged for
+    deed: str
+
+@dataclass(frozen=True)
+class SceneTriggered:
+    character: str
+    title: str
+    text: tuple # Paragraphs of the scene
+
+@dataclass(frozen=True)
+class Narration:
+    text: str # Anything else the game tells the player (offers, rewards, the new day)
+
+class NullSink:
+    """Discards every event; for simulations, benchmarks and other bulk work."""
+    def emit(self, event):
+        pass
+
+    def flush(self):
+        pass
+
+NULL_SINK = NullSink()
+
+class TerminalRenderer:
+    """Collects events and writes them in one go when flushed, once per player action.
+    Runs of SP or HP gains are folded into a single line."""
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+    def flush(self):
+        if not self.events:
+            return
+        merged = []
+        for event in self.events:
+            if type(event) is DeedLogged: # The deed's SP line already says it; only other sinks track these
+                continue
+            last = merged[-1] if merged else None
+            if type(event) in (SPGained, HPGained) and type(last) is type(event):
+                merged[-1] = replace(event, amount=last.amount + event.amount)
+            else:
+                merged.append(event)
+        self.events = []
+
+        lines = []
+        status = None # Set while a run of HP changes is being written
+        for event in merged:
+            kind = type(event)
+            if status is not None and kind not in (HPGained, StatusAdvanced):
+                lines.append(f"Current Shire Status: {status}")
+                status = None
+            if kind is SPGained:
+                lines.append(f"💰 You gained {event.amount} Shire Pennies! Total: {event.total} SP")
+            elif kind is HPGained:
+                lines.append(f"✨ You gained {event.amount} Hobbit-Points! Total: {event.total} HP")
+                status = event.status
+            elif kind is StatusAdvanced:
+                lines.append(f"\n🌟 Congratulations! You've advanced to Shire Status: {event.status}!")
+                status = event.status
+            elif kind is AchievementUnlocked:
+                lines.append(f"\n🏆 Achievement Unlocked: {event.name}!")
+            elif kind is SceneTriggered:
+                lines.append(f"\n--- {event.character}'s Scene: {event.title} ---")
+                lines.extend(event.text)
+            else:
+                lines.append(event.text)
+        if status is not None:
+            lines.append(f"Current Shire Status: {status}")
+        (self.stream or sys.stdout).write('\n'.join(lines) + '\n')
+
+class JsonlSink:
+    """Appends every event as a JSON line (with a timestamp) to an audit file."""
+    def __init__(self, path):
+        self.path = path
+        self.lines = []
+
+    def emit(self, event):
+        record = {'event': type(event).__name__, 'at': datetime.datetime.now().isoformat(timespec='seconds')}
+        record.update(asdict(event))
+        self.lines.append(json.dumps(record, ensure_ascii=False))
+
+    def flush(self):
+        if self.lines:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(self.lines) + '\n')
+            self.lines = []
+
+class MultiSink:
+    """Sends every event to several sinks, e.g. the terminal and an audit log."""
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def emit(self, event):
+        for sink in self.sinks:
+            sink.emit(event)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
 
 # --- Player Class ---
+CLAIM_SETS = {} # Every distinct tuple of claimed bounty names, shared by all players and weeks
+
+def _claim_set(names):
+    names = tuple(sys.intern(name) for name in names)
+    return CLAIM_SETS.setdefault(names, names)
+
 class Player:
-    """Represents the player's health stats and gamified progress."""
+    """Represents the player's health stats and gamified progress.
+
+    Kept small so one process can hold many players: attributes are slotted, achievements
+    are IDs into the shared ACHIEVEMENT_NAMES catalog, and each week's bounty claims are
+    a tuple shared with every other player who claimed the same ones.
+
+    Achievements are granted by the ACHIEVEMENTS catalog as the facts they depend on
+    change. The unlocked IDs are also kept in a set, so checking for one is O(1).
+    """
+    __slots__ = (
+        'name', 'weight', 'blood_pressure', 'eating_habits', 'shire_pennies', 'hobbit_points', 'game_day',
+        'achievement_ids', 'unlock_days', 'unlocked', 'daily_deeds_completed', 'streaks', 'weekly',
+        'totals', 'current_favors', '_bounty_claims', '_health', '_health_loader', 'journal', 'events', 'clock'
+    )
+
     def __init__(self, name="Adventurer"):
         self.name = name
         self.weight = 0.0
@@ -36,40 +1411,203 @@ class Player:
         self.eating_habits = ""
         self.shire_pennies = 0
         self.hobbit_points = 0
-        self.achievements = []
-        self.daily_deeds_completed = {} # Tracks today's deeds
+        self.game_day = 0 # Ordinal of the day Advance to Next Day last moved the game to (0: never)
+        self.set_unlocks(()) # achievement_ids, unlock_days and unlocked
+        self.use_history(DeedHistory()) # Tracks deeds done per day
         self.current_favors = {} # Tracks progress for character favors/challenges
+        self._bounty_claims = {} # ISO week -> names of the weekly bounties claimed that week
+        self._health = HealthLog() # Weight and blood pressure over time; weight/blood_pressure hold the latest
+        self._health_loader = None # Decodes the health log from a binary snapshot on first use
+        self.journal = None # Pending journal records; the Game hooks this up when saving is journaled
+        self.events = NULL_SINK # Where game events go; the Game hooks up its renderer
+        self.clock = SYSTEM_CLOCK # Dates achievement unlocks; the Game shares its own clock
+
+    @property
+    def health(self):
+        if self._health_loader is not None:
+            loader, self._health_loader = self._health_loader, None
+            self._health = loader()
+        return self._health
+
+    @health.setter
+    def health(self, log):
+        self._health = log
+        self._health_loader = None
+
+    @property
+    def achievements(self):
+        """Names of the achievements unlocked, in order (use add_achievement to add one)."""
+        return tuple(ACHIEVEMENT_NAMES[i] for i in self.achievement_ids)
+
+    @achievements.setter
+    def achievements(self, names):
+        self.set_unlocks((name, None) for name in names)
+
+    def set_unlocks(self, records):
+        """Replaces the unlocked achievements with (name, day unlocked or None) records, in unlock order."""
+        self.achievement_ids = array('I') # Into ACHIEVEMENT_NAMES, in unlock order
+        self.unlock_days = array('i') # Ordinal of the day each one was unlocked (0 if not known)
+        self.unlocked = set()
+        for name, day in records:
+            self._unlock(achievement_id(name), day)
+
+    def unlock_records(self):
+        """(name, date unlocked or None) for each achievement, in unlock order."""
+        return [(ACHIEVEMENT_NAMES[index], datetime.date.fromordinal(day) if day else None)
+                for index, day in zip(self.achievement_ids, self.unlock_days)]
+
+    def has_achievement(self, achievement_name):
+        index = ACHIEVEMENT_IDS.get(achievement_name)
+        return index is not None and index in self.unlocked
+
+    def _unlock(self, index, day):
+        if index in self.unlocked:
+            return False
+        self.unlocked.add(index)
+        self.achievement_ids.append(index)
+        self.unlock_days.append(_to_ordinal(day) if day else 0)
+        return True
+
+    @property
+    def bounty_claims(self):
+        """{ISO week: names of the bounties claimed that week} (use claim_bounty to add one)."""
+        return self._bounty_claims
+
+    @bounty_claims.setter
+    def bounty_claims(self, claims):
+        self._bounty_claims = {sys.intern(week): _claim_set(names) for week, names in claims.items()}
+
+    def use_history(self, history):
+        """Makes `history` the player's deed history, with fresh indexes over it."""
+        self.daily_deeds_completed = history
+        self.streaks = StreakIndex(history)
+        self.weekly = WeeklyTally(history)
+        self.totals = DeedTotals(history)
+
+    def _record(self, *record):
+        if self.journal is not None:
+            self.journal.append(list(record))
+
+    def set_game_day(self, day):
+        """Remembers the day the game has advanced to, so the next session can pick it up."""
+        self.game_day = _to_ordinal(day)
+        self._record('day', self.game_day)
 
     def add_sp(self, amount):
         self.shire_pennies += amount
-        print(f"💰 You gained {amount} Shire Pennies! Total: {self.shire_pennies} SP")
+        self._record('sp', amount)
+        self.events.emit(SPGained(amount, self.shire_pennies))
 
     def add_hp(self, amount):
         old_hp = self.hobbit_points
         self.hobbit_points += amount
-        print(f"✨ You gained {amount} Hobbit-Points! Total: {self.hobbit_points} HP")
+        self._record('hp', amount)
+        self.events.emit(HPGained(amount, self.hobbit_points, self.shire_status()))
         self._check_shire_status(old_hp)
+        if amount > 0:
+            ACHIEVEMENTS.hp_gained(self, old_hp)
+
+    def add_achievement(self, achievement_name, day=None):
+        """Unlocks an achievement on a day (default: the clock's today). Returns False if it already was."""
+        ordinal = _to_ordinal(day or self.clock.today())
+        if not self._unlock(achievement_id(achievement_name), ordinal):
+            return False
+        self._record('ach', achievement_name, datetime.date.fromordinal(ordinal).isoformat())
+        self.events.emit(AchievementUnlocked(achievement_name))
+        return True
+
+    def log_deed(self, day, deed_name):
+        """Marks a deed as done on the given day (a date, ISO string or ordinal). Returns False if it was already logged."""
+        ordinal = _to_ordinal(day)
+        bit = 1 << deed_id(deed_name)
+        if not self.daily_deeds_completed.merge_mask(ordinal, bit):
+            return False
+        grown = self.streaks.update(ordinal, bit)
+        self.weekly.record(ordinal, bit)
+        self.totals.record(bit)
+        if self.journal is not None:
+            self._record('deed', ordinal, deed_name)
+        if self.events is not NULL_SINK:
+            self.events.emit(DeedLogged(datetime.date.fromordinal(ordinal).isoformat(), deed_name))
+        if deed_name in ACHIEVEMENTS.indexed_deeds:
+            ACHIEVEMENTS.deed_logged(self, deed_name, grown)
+        return True
 
-    def add_achievement(self, achievement_name):
-        if achievement_name not in self.achievements:
-            self.achievements.append(achievement_name)
-            print(f"\n🏆 Achievement Unlocked: {achievement_name}!")
+    def set_favor(self, char_name, favor_data):
+        self.current_favors[char_name] = favor_data
+        self._record('favor', char_name, favor_data)
+
+    def clear_favor(self, char_name):
+        if self.current_favors.pop(char_name, None) is not None:
+            self._record('unfavor', char_name)
+
+    def record_reading(self, day, weight=None, blood_pressure=None):
+        """Adds a weight and/or blood pressure reading (e.g. '120/80 mmHg') taken on a day.
+        Raises ValueError if the blood pressure can't be read."""
+        if weight is None and not blood_pressure:
+            return
+        systolic = diastolic = None
+        if blood_pressure:
+            systolic, diastolic = parse_blood_pressure(blood_pressure)
+        if weight is not None:
+            weight = float(weight)
+        ordinal = _to_ordinal(day)
+        self._add_reading(ordinal, weight, systolic, diastolic)
+        self._record('reading', ordinal, weight, systolic, diastolic)
+
+    def refresh_latest_reading(self):
+        """Sets weight and blood_pressure from the newest readings in the health log."""
+        if self.health.weight.latest():
+            self.weight = self.health.weight.latest()[1]
+        if self.health.systolic.latest():
+            self.blood_pressure = f"{self.health.systolic.latest()[1]:g}/{self.health.diastolic.latest()[1]:g} mmHg"
+
+    def _add_reading(self, ordinal, weight, systolic, diastolic):
+        self.health.add(ordinal, weight, systolic, diastolic)
+        self.refresh_latest_reading()
+
+    def claim_bounty(self, week, bounty_name):
+        week = sys.intern(week)
+        self._bounty_claims[week] = _claim_set(self._bounty_claims.get(week, ()) + (bounty_name,))
+        self._record('bounty', week, bounty_name)
+
+    def apply_record(self, record):
+        """Replays one journal record quietly (no prints, no re-journaling)."""
+        op = record[0]
+        if op == 'sp':
+            self.shire_pennies += record[1]
+        elif op == 'hp':
+            self.hobbit_points += record[1]
+        elif op == 'ach':
+            self._unlock(achievement_id(record[1]), record[2] if len(record) > 2 else None)
+        elif op == 'deed':
+            ordinal = journal_day(record[1])
+            bit = 1 << deed_id(record[2])
+            if self.daily_deeds_completed.merge_mask(ordinal, bit):
+                self.streaks.update(ordinal, bit)
+                self.weekly.record(ordinal, bit)
+                self.totals.record(bit)
+        elif op == 'favor':
+            self.current_favors[record[1]] = record[2]
+        elif op == 'unfavor':
+            self.current_favors.pop(record[1], None)
+        elif op == 'reading':
+            self._add_reading(journal_day(record[1]), *record[2:5])
+        elif op == 'bounty':
+            week = sys.intern(record[1])
+            self._bounty_claims[week] = _claim_set(self._bounty_claims.get(week, ()) + (record[2],))
+        elif op == 'day':
+            self.game_day = journal_day(record[1])
+        # 'reset' records come from older versions, which wiped the deed history on every
+        # day advance; they're skipped so the days logged before them are kept
+
+    def shire_status(self):
+        """Name of the Shire Status the player's current HP has earned."""
+        return CONTENT.status(self.hobbit_points)
 
     def _check_shire_status(self, old_hp):
-        levels = {
-            0: "Apprentice Gardener",
-            251: "Green-hand Farmer",
-            501: "Stout-hearted Traveller",
-            1001: "Master of the Market",
-            2001: "Elder of the Shire"
-        }
-        current_status = "Unknown"
-        for threshold, status in sorted(levels.items()):
-            if self.hobbit_points >= threshold:
-                current_status = status
-            if old_hp < threshold <= self.hobbit_points:
-                print(f"\n🌟 Congratulations! You've advanced to Shire Status: {status}!")
-        print(f"Current Shire Status: {current_status}")
+        for status in CONTENT.statuses_reached(old_hp, self.hobbit_points):
+            self.events.emit(StatusAdvanced(status))
 
     def to_dict(self):
         return {
@@ -79,9 +1617,13 @@ class Player:
             'eating_habits': self.eating_habits,
             'shire_pennies': self.shire_pennies,
             'hobbit_points': self.hobbit_points,
-            'achievements': self.achievements,
-            'daily_deeds_completed': self.daily_deeds_completed,
-            'current_favors': self.current_favors
+            'game_day': datetime.date.fromordinal(self.game_day).isoformat() if self.game_day else None,
+            'achievements': list(self.achievements),
+            'achievement_days': {name: day.isoformat() for name, day in self.unlock_records() if day},
+            'daily_deeds_completed': self.daily_deeds_completed.to_dict(),
+            'current_favors': self.current_favors,
+            'bounty_claims': {week: list(names) for week, names in self._bounty_claims.items()},
+            'health_log': self.health.to_dict()
         }
 
     @classmethod
@@ -92,309 +1634,754 @@ class Player:
         player.eating_habits = data.get('eating_habits', "")
         player.shire_pennies = data.get('shire_pennies', 0)
         player.hobbit_points = data.get('hobbit_points', 0)
-        player.achievements = data.get('achievements', [])
-        player.daily_deeds_completed = data.get('daily_deeds_completed', {})
+        player.game_day = _to_ordinal(data['game_day']) if data.get('game_day') else 0
+        days = data.get('achievement_days', {})
+        player.set_unlocks((name, days.get(name)) for name in data.get('achievements', []))
+        player.use_history(DeedHistory.from_dict(data.get('daily_deeds_completed', {})))
         player.current_favors = data.get('current_favors', {})
+        player.bounty_claims = data.get('bounty_claims', {})
+        player.health = HealthLog.from_dict(data.get('health_log', {}))
+        return player
+
+# --- Binary Snapshot ---
+# A snapshot is a header, a table of named sections and the sections themselves:
+#   profile   JSON: name, stats, game day, bounty claims, the deed names behind each mask bit and
+#             how many archived days each deed was done on (so totals don't need the archive)
+#   favors    JSON: active character offers
+#   achieve   JSON: [name, ISO day unlocked or null] for each achievement, in unlock order
+#             (plain names in version 1 snapshots)
+#   recent    deed masks for the last SNAPSHOT_RECENT_DAYS days (decoded at startup)
+#   archive   deed masks for every older day (decoded the first time they're needed)
+#   health    HealthLog columns (read the first time readings are used; memory-mapped when large)
+# Every section starts on an 8-byte boundary, so mapped float columns are aligned.
+SNAPSHOT_MAGIC = b'SHIRESAV'
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct('<8sHHI') # magic, version, section count, journal generation
+SNAPSHOT_SECTION = struct.Struct('<8sQQ') # name, offset, length
+DAYS_HEADER = struct.Struct('<iI') # first day ordinal, day count
+
+def is_binary_snapshot(path):
+    with open(path, 'rb') as f:
+        return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+def _encode_days(start, masks):
+    masks = array('Q', masks)
+    if sys.byteorder == 'big':
+        masks.byteswap()
+    return DAYS_HEADER.pack(start or 0, len(masks)) + masks.tobytes()
+
+def _decode_days(data, bit_map):
+    start, count = DAYS_HEADER.unpack_from(data)
+    masks = array('Q')
+    masks.frombytes(data[DAYS_HEADER.size:DAYS_HEADER.size + 8 * count])
+    if sys.byteorder == 'big':
+        masks.byteswap()
+    if bit_map is not None: # Saved under a different deed order; move each bit to its current place
+        for i, m in enumerate(masks):
+            moved = 0
+            while m:
+                bit = m & -m
+                moved |= bit_map[bit.bit_length() - 1]
+                m ^= bit
+            masks[i] = moved
+    return start, array(mask_typecode(len(DEED_NAMES)), masks) # Every saved deed is registered by now
+
+def encode_snapshot(player, generation):
+    """The player as binary snapshot bytes, with every lazily loaded part read in first."""
+    history = player.daily_deeds_completed
+    history.load_archive()
+    cut = 0
+    if history.start is not None:
+        last_day = history.start + len(history.masks) - 1
+        cut = max(0, last_day - SNAPSHOT_RECENT_DAYS + 1 - history.start)
+    health = io.BytesIO()
+    player.health.write_columns(health)
+    profile = {
+        'name': player.name,
+        'weight': player.weight,
+        'blood_pressure': player.blood_pressure,
+        'eating_habits': player.eating_habits,
+        'shire_pennies': player.shire_pennies,
+        'hobbit_points': player.hobbit_points,
+        'game_day': player.game_day,
+        'bounty_claims': player.bounty_claims,
+        'deed_names': DEED_NAMES,
+        'archive_deed_days': {DEED_NAMES[i]: days for i, days in enumerate(count_deed_days(history.masks[:cut])) if days}
+    }
+    sections = [
+        (b'profile', json.dumps(profile).encode()),
+        (b'favors', json.dumps(player.current_favors).encode()),
+        (b'achieve', json.dumps([[name, day and day.isoformat()] for name, day in player.unlock_records()]).encode()),
+        (b'recent', _encode_days(history.start and history.start + cut, history.masks[cut:])),
+        (b'archive', _encode_days(history.start, history.masks[:cut])),
+        (b'health', health.getvalue())
+    ]
+    offset = SNAPSHOT_HEADER.size + SNAPSHOT_SECTION.size * len(sections)
+    table = []
+    for name, data in sections:
+        table.append(SNAPSHOT_SECTION.pack(name, offset, len(data)))
+        offset += len(data) + -len(data) % 8
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(sections), generation)
+    return b''.join([header] + table + [data + bytes(-len(data) % 8) for _, data in sections])
+
+class SnapshotReader:
+    """Reads individual sections of a binary snapshot file on request."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, count, self.generation = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} isn't a binary Shire save.")
+            if version > SNAPSHOT_VERSION:
+                raise ValueError(f"{path} was saved by a newer version of the game (format {version}).")
+            table = f.read(SNAPSHOT_SECTION.size * count)
+        self.sections = {}
+        for name, offset, length in SNAPSHOT_SECTION.iter_unpack(table):
+            self.sections[name.rstrip(b'\0').decode()] = (offset, length)
+
+    def read(self, name):
+        if name not in self.sections:
+            return b''
+        offset, length = self.sections[name]
+        with open(self.path, 'rb') as f:
+            header = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+            if header[3] != self.generation:
+                raise RuntimeError(f"{self.path} was rewritten while parts of it were still unread.")
+            f.seek(offset)
+            return f.read(length)
+
+    def map(self, name):
+        """A section as a read-only view of the memory-mapped file, whose pages are only read
+        as they're used. The mapping lasts as long as the view."""
+        offset, length = self.sections[name]
+        with open(self.path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if SNAPSHOT_HEADER.unpack_from(mapped)[3] != self.generation:
+            mapped.close()
+            raise RuntimeError(f"{self.path} was rewritten while parts of it were still unread.")
+        return memoryview(mapped)[offset:offset + length]
+
+def decode_snapshot(path):
+    """Loads a binary snapshot, decoding only the profile, favors, achievements and recent
+    days; archived days and the health log are read (or mapped) when first used. Returns
+    (player, generation)."""
+    reader = SnapshotReader(path)
+    profile = json.loads(reader.read('profile'))
+    saved_names = profile.get('deed_names', [])
+    bit_map = None
+    if saved_names != DEED_NAMES[:len(saved_names)]:
+        bit_map = [1 << deed_id(name) for name in saved_names]
+
+    player = Player(profile['name'])
+    player.weight = profile.get('weight', 0.0)
+    player.blood_pressure = profile.get('blood_pressure', "0/0")
+    player.eating_habits = profile.get('eating_habits', "")
+    player.shire_pennies = profile.get('shire_pennies', 0)
+    player.hobbit_points = profile.get('hobbit_points', 0)
+    player.game_day = profile.get('game_day', 0)
+    player.bounty_claims = profile.get('bounty_claims', {})
+    player.current_favors = json.loads(reader.read('favors') or b'{}')
+    player.set_unlocks((entry, None) if isinstance(entry, str) else entry
+                       for entry in json.loads(reader.read('achieve') or b'[]'))
+
+    history = DeedHistory()
+    start, masks = _decode_days(reader.read('recent'), bit_map)
+    if masks:
+        history.start, history.masks = start, masks
+    if reader.sections.get('archive', (0, 0))[1] > DAYS_HEADER.size:
+        history.archive = lambda: _decode_days(reader.read('archive'), bit_map)
+    player.use_history(history)
+    if history.archive is not None:
+        player.totals.archived = profile.get('archive_deed_days') # Not in snapshots from older versions
+    health_size = reader.sections.get('health', (0, 0))[1]
+    if health_size >= SNAPSHOT_MAP_BYTES and os.name == 'posix': # Windows can't replace a mapped file when saving
+        player._health_loader = lambda: HealthLog.from_buffer(reader.map('health'))
+    elif health_size:
+        player._health_loader = lambda: HealthLog.from_buffer(reader.read('health'))
+    return player, reader.generation
+
+# --- Save Journal ---
+def write_atomically(path, data):
+    """Replaces `path` with `data` via a synced temp file, so a crash leaves the old file or the new one."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+class SaveJournal:
+    """Append-only log of player changes layered on top of a periodic full snapshot.
+
+    Each save appends only the records made since the last save, so its cost doesn't
+    depend on how much history the player has. Once enough records pile up they are
+    folded into a fresh snapshot. Snapshot and journal share a generation number so a
+    crash between writing the snapshot and resetting the journal can't replay records twice.
+
+    Snapshots are written in the binary format (see encode_snapshot). JSON snapshots are
+    still read, and a JSON save found at `legacy_file` is migrated the first time it loads
+    (unless the load is read-only: load(migrate=False) reads it where it is).
+
+    With background=True, save() and compact() only prepare what to write and hand it to
+    a writer thread. Writes queued while another is in flight are coalesced: journal
+    appends are joined, and a newer snapshot replaces everything queued before it.
+    flush() waits for the writer to catch up.
+    """
+    def __init__(self, snapshot_file=SAVE_FILE, journal_file=JOURNAL_FILE, compact_every=JOURNAL_COMPACT_EVERY,
+                 legacy_file=None, background=False):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file
+        self.compact_every = compact_every
+        self.legacy_file = legacy_file
+        self.pending = [] # Records not yet written; shared with Player.journal
+        self.generation = 0
+        self.records_on_disk = 0 # Journal records since the last snapshot, including queued ones
+        self.has_snapshot = False
+        self.journal_current = False # Whether the journal's header matches this generation
+        self.background = background
+        self.queue = [] # Writes waiting for the writer thread: (op, payload)
+        self.writing = False
+        self.flushing = 0 # Callers waiting in flush(); the writer skips its debounce for them
+        self.write_error = None
+        self.ready = threading.Condition()
+        self.writer = None
+
+    def load(self, migrate=True):
+        """Rebuilds the player from snapshot plus journal tail, or returns None if there's no save.
+        With migrate=False nothing is written, not even a legacy save's migration."""
+        self.flush()
+        if not os.path.exists(self.snapshot_file):
+            if self.legacy_file and os.path.exists(self.legacy_file):
+                return self._migrate() if migrate else self._read_legacy()
+            return None
+        return self._read(self.snapshot_file)
+
+    def _read(self, snapshot_file):
+        """Reads the snapshot at `snapshot_file` and replays the journal on top of it."""
+        if is_binary_snapshot(snapshot_file):
+            player, self.generation = decode_snapshot(snapshot_file)
+        else:
+            with open(snapshot_file, 'r') as f:
+                data = json.load(f)
+            player = Player.from_dict(data)
+            self.generation = data.get('journal_generation', 0)
+        self.has_snapshot = True
+        self.journal_current = False
+        self.records_on_disk = 0
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r') as f:
+                header = f.readline()
+                if header and json.loads(header).get('generation') == self.generation:
+                    self.journal_current = True
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            break # Torn last line from an interrupted append
+                        player.apply_record(record)
+                        self.records_on_disk += 1
         return player
 
+    def save(self, player):
+        if not self.has_snapshot or self.records_on_disk + len(self.pending) > self.compact_every:
+            self.compact(player)
+            return
+        if not self.pending:
+            return
+        if not self.journal_current:
+            self._submit('reset', self.generation)
+            self.journal_current = True
+        self._submit('append', ''.join(json.dumps(r, separators=(',', ':')) + '\n' for r in self.pending))
+        self.records_on_disk += len(self.pending)
+        self.pending.clear()
+
+    def _read_legacy(self):
+        """Loads the JSON save at legacy_file (with its journal)."""
+        return self._read(self.legacy_file)
+
+    def _migrate(self):
+        """Loads the JSON save at legacy_file, rewrites it as a binary snapshot at
+        snapshot_file and keeps the old file as a .bak."""
+        player = self._read_legacy()
+        self.compact(player)
+        self.flush() # The new snapshot must be on disk before the old one is moved aside
+        os.replace(self.legacy_file, self.legacy_file + '.bak')
+        return player
+
+    def compact(self, player):
+        """Writes a full snapshot and starts an empty journal on top of it."""
+        self.generation += 1
+        data = encode_snapshot(player, self.generation) # Reads in anything still lazily loaded first
+        self._submit('snapshot', (data, self.generation))
+        self.has_snapshot = self.journal_current = True
+        self.records_on_disk = 0
+        self.pending.clear()
+
+    # --- Writing ---
+    def _submit(self, op, payload):
+        if not self.background:
+            self._write(op, payload)
+            return
+        with self.ready:
+            self._raise_write_error()
+            if op == 'snapshot':
+                self.queue.clear() # Everything queued so far is part of the new snapshot
+            if op == 'append' and self.queue and self.queue[-1][0] == 'append':
+                self.queue[-1] = (op, self.queue[-1][1] + payload)
+            else:
+                self.queue.append((op, payload))
+            if self.writer is None:
+                self.writer = threading.Thread(target=self._run_writer, name="shire-save-writer", daemon=True)
+                self.writer.start()
+            self.ready.notify_all()
+
+    def _write(self, op, payload):
+        if op == 'snapshot':
+            data, generation = payload
+            write_atomically(self.snapshot_file, data)
+            self._write_journal_header(generation)
+        elif op == 'reset':
+            self._write_journal_header(payload)
+        else:
+            with open(self.journal_file, 'a') as f:
+                f.write(payload)
+
+    def _write_journal_header(self, generation):
+        write_atomically(self.journal_file, (json.dumps({'generation': generation}) + '\n').encode())
+
+    def _run_writer(self):
+        while True:
+            with self.ready:
+                while not self.queue:
+                    self.ready.wait()
+                deadline = time.monotonic() + SAVE_DEBOUNCE_SECONDS # Let a burst of saves settle into one write
+                while not self.flushing and time.monotonic() < deadline:
+                    self.ready.wait(deadline - time.monotonic())
+                batch, self.queue = self.queue, []
+                self.writing = True
+            try:
+                for op, payload in batch:
+                    self._write(op, payload)
+            except Exception as exc: # Reported by the next flush() or save
+                with self.ready:
+                    self.write_error = exc
+            finally:
+                with self.ready:
+                    self.writing = False
+                    self.ready.notify_all()
+
+    def _raise_write_error(self):
+        if self.write_error is not None:
+            error, self.write_error = self.write_error, None
+            raise error
+
+    def flush(self):
+        """Waits until every queued write is on disk, re-raising any error the writer hit."""
+        with self.ready:
+            self.flushing += 1
+            self.ready.notify_all()
+            try:
+                while self.queue or self.writing:
+                    self.ready.wait()
+            finally:
+                self.flushing -= 1
+            self._raise_write_error()
+
+# --- Quest Rules ---
+@dataclass(frozen=True)
+class QuestRule:
+    """A favor, dilemma or impulse, described as data rather than code.
+
+    A day counts toward the quest when every deed in required_deeds was done and, if
+    any_deeds is given, at least one of those as well. The quest is complete once `days`
+    such days fall within the last `window` days (default: `days`) up to and including
+    today, not counting days before it was taken up. With consecutive=True the days must
+    also run unbroken up to today.
+    """
+    name: str
+    description: str
+    hp_reward: int
+    achievement: str
+    required_deeds: tuple = ()
+    any_deeds: tuple = ()
+    days: int = 1
+    window: int = None
+    consecutive: bool = True
+
+    def span(self):
+        """How many days back from today the rule looks."""
+        return self.days if self.consecutive else max(self.days, self.window or self.days)
+
+# Each character's offers, built once from the data pack and shared by every instance
+QUEST_RULES = {character: tuple(QuestRule(**fields) for fields in rules) for character, rules in CONTENT.offers}
+for rules in QUEST_RULES.values():
+    for rule in rules:
+        ACHIEVEMENTS.add_offer(rule)
+
+class QuestEvaluator:
+    """Checks every active quest against a deed history in a single walk back from today.
+
+    Consecutive quests that only require deeds are answered by the player's StreakIndex
+    instead, in O(1) however many days they span. For the rest, each distinct (required
+    deeds, any deeds) pair becomes one predicate bit. A day's deed mask is turned into the
+    set of predicates it satisfies once and remembered, since the same few masks recur day
+    after day, so walking the days costs the same however many quests are active. Each
+    quest then only reads its own answer off the walk.
+    """
+    def __init__(self):
+        self.predicates = {} # (required_mask, any_mask) -> predicate bit index
+        self.compiled = {} # rule -> its predicate's bit
+        self.satisfied = {} # day mask -> bitset of the predicates that day satisfies
+        self.streak_masks = {} # rule -> its required deeds' mask, for rules a StreakIndex can answer
+
+    def predicate(self, rule):
+        """The rule's predicate bit, compiling the rule on first sight."""
+        bit = self.compiled.get(rule)
+        if bit is None:
+            key = (deed_mask(*rule.required_deeds), deed_mask(*rule.any_deeds))
+            if key not in self.predicates:
+                self.predicates[key] = len(self.predicates)
+                self.satisfied.clear() # Remembered day sets don't know about the new predicate
+            bit = self.compiled[rule] = 1 << self.predicates[key]
+        return bit
+
+    def _satisfied_by(self, day_mask):
+        bits = self.satisfied.get(day_mask)
+        if bits is None:
+            bits = 0
+            for (required, any_of), index in self.predicates.items():
+                if day_mask & required == required and (not any_of or day_mask & any_of):
+                    bits |= 1 << index
+            self.satisfied[day_mask] = bits
+        return bits
+
+    def streak_mask(self, rule):
+        """The deed mask whose streak decides the rule, or 0 if a streak can't (the rule
+        isn't consecutive, or also accepts any of several deeds)."""
+        mask = self.streak_masks.get(rule)
+        if mask is None:
+            simple = rule.consecutive and rule.required_deeds and not rule.any_deeds
+            mask = self.streak_masks[rule] = deed_mask(*rule.required_deeds) if simple else 0
+        return mask
+
+    def evaluate(self, history, today, active, streaks=None):
+        """`active` holds (key, rule, since) for each quest in progress, where `since` is the
+        day it was taken up (or None). `streaks` is a StreakIndex over `history`, if there is
+        one to ask. Returns the keys of the completed quests, in order."""
+        today = _to_ordinal(today)
+        completed = []
+        checkpoints = {} # days walked -> [(position, key, predicate bit, rule)] to decide then
+        for position, (key, rule, since) in enumerate(active):
+            mask = streaks is not None and self.streak_mask(rule)
+            if mask:
+                if streaks.run_length(mask, today, since) >= rule.days:
+                    completed.append((position, key))
+                continue
+            span = rule.span()
+            if since is not None:
+                span = min(span, today - _to_ordinal(since) + 1)
+                if rule.consecutive and span < rule.days:
+                    continue # Not enough days since it was taken up
+            if span < 1:
+                continue
+            checkpoints.setdefault(span, []).append((position, key, self.predicate(rule), rule))
+        if not checkpoints:
+            return [key for _, key in sorted(completed)]
+
+        unbroken = -1 # Predicates satisfied on every day walked so far
+        day_sets = {} # Predicate bitset -> number of walked days that had exactly that set
+        for walked in range(1, max(checkpoints) + 1):
+            bits = self._satisfied_by(history.mask_at(today - walked + 1))
+            unbroken &= bits
+            day_sets[bits] = day_sets.get(bits, 0) + 1
+            counts = {} # Predicate bit -> matching days so far, shared by quests with the same predicate
+            for position, key, bit, rule in checkpoints.get(walked, ()):
+                if rule.consecutive:
+                    done = unbroken & bit
+                else:
+                    count = counts.get(bit)
+                    if count is None:
+                        count = counts[bit] = sum(n for day_bits, n in day_sets.items() if day_bits & bit)
+                    done = count >= rule.days
+                if done:
+                    completed.append((position, key))
+        return [key for _, key in sorted(completed)]
+
 # --- Character Classes (NPCs) ---
 class Character:
-    """Base class for D&D module characters."""
-    def __init__(self, name, description):
+    """Base class for D&D module characters.
+
+    A character's offers are QuestRules (the built-in characters take theirs from the data
+    pack's QUEST_RULES); subclasses only supply the rules and the words around them, so
+    taking up, checking and completing an offer works the same for all.
+    """
+    offer_key = "favor_name" # Names the active offer in player.current_favors
+    offer_noun = "favor"
+    offer_title = "Offer"
+    reward_line = "Complete this to earn {hp} HP and the '{achievement}' achievement."
+    accepted_line = ""
+    menu_intro = ""
+    menu_prompt = ""
+    unknown_line = "{name} doesn't offer that {noun}."
+    scene_title = ""
+    scene_text = () # Paragraphs; '{offer}' is replaced with the offer's name
+    reward_text = ""
+
+    def __init__(self, name, description, offers=(), clock=SYSTEM_CLOCK):
         self.name = name
         self.description = description
+        self.offers = {rule.name: rule for rule in offers}
+        self.clock = clock # Dates offers when no day is given; Game shares its own clock
 
     def introduce(self):
         print(f"\n--- {self.name}: {self.description} ---")
 
-class DaProvider(Character):
-    def __init__(self):
-        super().__init__(
-            "Da Provider",
-            "A new villager from Krebsville (Realistic Chicago), offering 'Krebsville Connections' for athleisure and healthy living, but always with a twist."
-        )
-        self.favors_offered = {
-            "Smoothie Bar Blueprint": {
-                "description": "Unlock a secret, power-packed smoothie recipe. Requires completing 'Fruit Orchard Harvest' (2 fruit) and 'Vegetable Patch Platter' (3 veggies) for 3 consecutive days.",
-                "hp_reward": 25,
-                "achievement": "Smoothie Bar Blueprint Unlocked",
-                "check_func": self.check_smoothie_blueprint_favor
-            },
-            "Pop-Up Power-Walk Protocol": {
-                "description": "Get a special 'Krebsville power-walk route'. Requires 'Water from the Well' (8 glasses water) and 'Vegetable Patch Platter' (3 veggies) for 2 consecutive days.",
-                "hp_reward": 30,
-                "achievement": "Pop-Up Power-Walk Protocol Mastered",
-                "check_func": self.check_power_walk_favor
-            }
-        }
-
-    def offer_favor(self, player, favor_name):
-        if favor_name not in self.favors_offered:
-            print(f"{self.name} doesn't offer that favor.")
+    def present_offer(self, player, offer_name, today=None):
+        """Describes an offer and makes it the player's active one with this character."""
+        rule = self.offers.get(offer_name)
+        if rule is None:
+            player.events.emit(Narration(self.unknown_line.format(name=self.name, noun=self.offer_noun)))
             return
+        if player.events is not NULL_SINK: # Skip building the text when no one reads it
+            player.events.emit(Narration(f"\n{self.name}'s {self.offer_title}: {offer_name}"))
+            player.events.emit(Narration(f"  {rule.description}"))
+            player.events.emit(Narration("  " + self.reward_line.format(hp=rule.hp_reward, achievement=rule.achievement)))
+        start_date = (today or self.clock.today()).isoformat()
+        player.set_favor(self.name, {self.offer_key: offer_name, "start_date": start_date, "active": True})
+        player.events.emit(Narration(self.accepted_line))
 
-        favor_details = self.favors_offered[favor_name]
-        print(f"\nDa Provider's Offer: {favor_name}")
-        print(f"  {favor_details['description']}")
-        print(f"  Complete this to earn {favor_details['hp_reward']} HP and the '{favor_details['achievement']}' achievement.")
-
-        player.current_favors['Da Provider'] = {"favor_name": favor_name, "start_date": datetime.date.today().isoformat(), "progress": {}}
-        print("You've accepted Da Provider's favor! Begin tracking your progress.")
-
-    def check_favor_completion(self, player):
-        if 'Da Provider' in player.current_favors:
-            favor_data = player.current_favors['Da Provider']
-            favor_name = favor_data["favor_name"]
-            favor_details = self.favors_offered.get(favor_name)
-            if not favor_details:
-                return False # Favor not found
-
-            if favor_details["check_func"](player, favor_data):
-                print(f"\n--- Da Provider's Scene: Krebsville Connection ---")
-                print("As your adventuring party passes by a bustling crossroads, you spot Da Provider, clad in surprisingly stylish (yet practical) gear, haggling over some exotic herbs with a local farmer. He spots you, offers a quick, knowing nod, and signals you closer.")
-                print(f"\"Aye, a fine day for a bit o' trade, eh?\" he murmurs, his eyes assessing your party. \"Heard you folk are lookin' for ways to keep nimble and fueled on your journey. I got connections back in Krebsville... top-tier stuff. But not for free, mind you. I need to see yer commitment.\"")
-                print(f"\n\"Aye, I see the glow of well-fed folk about ye,\" Da Provider says, a rare smile playing on his lips. He hands you a rolled-up parchment. \"Here's the '{favor_name}' I promised. It'll get ya what you need, quick and potent. Just know, some of those big-city ingredients take a bit more huntin' than your Shire greens.\"")
-                player.add_hp(favor_details["hp_reward"])
-                player.add_achievement(favor_details["achievement"])
-                del player.current_favors['Da Provider'] # Favor completed
-                # In-game D&D reward: Temporary +1 stat bonus to Dex or Con
-                print("\n**In-Game D&D Reward:** Your party gains a new Consumable Item: 'Krebsville Power Smoothie Recipe'. When used, this recipe can grant a temporary +1 bonus to a chosen stat (e.g., Dexterity or Constitution) for the next D&D session, reflecting your improved vitality.")
-                return True
-        return False
+    def active_rule(self, player):
+        """The rule for the player's active offer with this character, or None."""
+        offer_data = player.current_favors.get(self.name)
+        if not offer_data or not offer_data.get("active", True):
+            return None
+        return self.offers.get(offer_data.get(self.offer_key))
 
-    def check_smoothie_blueprint_favor(self, player, favor_data):
-        today = datetime.date.today()
-        start_date = datetime.date.fromisoformat(favor_data['start_date'])
-        
-        # Check consecutive days for fruit and veggie
-        consecutive_days = 0
-        for i in range(3): # Need 3 consecutive days
-            check_date = today - datetime.timedelta(days=i)
-            date_str = check_date.isoformat()
-            if date_str >= start_date.isoformat(): # Only check from start date
-                fruit_done = player.daily_deeds_completed.get(date_str, {}).get("Fruit Orchard Harvest", False)
-                veggie_done = player.daily_deeds_completed.get(date_str, {}).get("Vegetable Patch Platter", False)
-                if fruit_done and veggie_done:
-                    consecutive_days += 1
-                else:
-                    consecutive_days = 0 # Break streak if any day fails
-            else: # If we go before start_date, stop checking
-                break
+    def complete(self, player, rule):
+        """Plays the character's scene and hands out the rule's rewards."""
+        if player.events is not NULL_SINK:
+            player.events.emit(SceneTriggered(self.name, self.scene_title,
+                                              tuple(p.format(offer=rule.name) for p in self.scene_text)))
+        player.add_hp(rule.hp_reward)
+        ACHIEVEMENTS.favor_completed(player, rule)
+        player.clear_favor(self.name)
+        player.events.emit(Narration(self.reward_text))
 
-        return consecutive_days >= 3 # True if 3 consecutive days are met
+def check_quests(player, characters, today=None, evaluator=None):
+    """Completes every active offer the player has fulfilled, checking them all in one pass.
+    Returns the characters whose scenes triggered."""
+    evaluator = evaluator or QuestEvaluator()
+    active = []
+    for char in characters:
+        rule = char.active_rule(player)
+        if rule is not None:
+            active.append((char, rule, player.current_favors[char.name].get("start_date")))
+    if not active:
+        return []
+    rules = {char.name: rule for char, rule, _ in active}
+    completed = evaluator.evaluate(player.daily_deeds_completed, today or active[0][0].clock.today(), active,
+                                   player.streaks)
+    for char in completed:
+        char.complete(player, rules[char.name])
+    return completed
 
-    def check_power_walk_favor(self, player, favor_data):
-        today = datetime.date.today()
-        start_date = datetime.date.fromisoformat(favor_data['start_date'])
-        
-        consecutive_days = 0
-        for i in range(2): # Need 2 consecutive days
-            check_date = today - datetime.timedelta(days=i)
-            date_str = check_date.isoformat()
-            if date_str >= start_date.isoformat():
-                water_done = player.daily_deeds_completed.get(date_str, {}).get("Water from the Well", False)
-                veggie_done = player.daily_deeds_completed.get(date_str, {}).get("Vegetable Patch Platter", False)
-                if water_done and veggie_done:
-                    consecutive_days += 1
-                else:
-                    consecutive_days = 0
-            else:
-                break
-        return consecutive_days >= 2
+class DaProvider(Character):
+    offer_title = "Offer"
+    accepted_line = "You've accepted Da Provider's favor! Begin tracking your progress."
+    menu_intro = "Da Provider has the following favors:"
+    menu_prompt = "Which favor would you like to attempt? (e.g., 'Smoothie Bar Blueprint'): "
+    scene_title = "Krebsville Connection"
+    scene_text = (
+        "As your adventuring party passes by a bustling crossroads, you spot Da Provider, clad in surprisingly stylish (yet practical) gear, haggling over some exotic herbs with a local farmer. He spots you, offers a quick, knowing nod, and signals you closer.",
+        "\"Aye, a fine day for a bit o' trade, eh?\" he murmurs, his eyes assessing your party. \"Heard you folk are lookin' for ways to keep nimble and fueled on your journey. I got connections back in Krebsville... top-tier stuff. But not for free, mind you. I need to see yer commitment.\"",
+        "\n\"Aye, I see the glow of well-fed folk about ye,\" Da Provider says, a rare smile playing on his lips. He hands you a rolled-up parchment. \"Here's the '{offer}' I promised. It'll get ya what you need, quick and potent. Just know, some of those big-city ingredients take a bit more huntin' than your Shire greens.\"",
+    )
+    # In-game D&D reward: Temporary +1 stat bonus to Dex or Con
+    reward_text = "\n**In-Game D&D Reward:** Your party gains a new Consumable Item: 'Krebsville Power Smoothie Recipe'. When used, this recipe can grant a temporary +1 bonus to a chosen stat (e.g., Dexterity or Constitution) for the next D&D session, reflecting your improved vitality."
 
+    def __init__(self):
+        super().__init__(
+            "Da Provider",
+            "A new villager from Krebsville (Realistic Chicago), offering 'Krebsville Connections' for athleisure and healthy living, but always with a twist.",
+            offers=QUEST_RULES.get("Da Provider", ())
+        )
 
 class DaStruggler(Character):
+    offer_key = "dilemma_name"
+    offer_noun = "dilemma"
+    offer_title = "Dilemma"
+    reward_line = "Overcoming this earns {hp} HP and the '{achievement}' achievement."
+    accepted_line = "You've acknowledged Da Struggler's dilemma. Be ready to face it!"
+    menu_intro = "Da Struggler presents the following dilemmas:"
+    menu_prompt = "Which dilemma would you like to acknowledge and face? (e.g., 'Stress Snacker'): "
+    unknown_line = "{name} doesn't present that {noun}."
+    scene_title = "Whispers of Weariness"
+    scene_text = (
+        "As your party prepares for a short rest by a roadside, you hear a weary sigh from a nearby, slightly disheveled figure. It's Da Struggler, slumped against a tree, looking utterly drained. 'Ach, another day, another dozen troubles,' they mutter, pulling out a half-eaten, greasy-looking sausage roll from a crumpled wrapper. 'Just need somethin' to get through it, you know? Never any peace. Never any easy way.' Their words echo a familiar inner sentiment.",
+        "\nYou take a calm breath, unaffected by Da Struggler's indulgence. You might choose to offer them a piece of your own trail mix or simply offer a sympathetic, knowing nod. Da Struggler looks up, surprised by your composure. 'How do you do it?' they ask, genuinely curious. 'You just... find a way, don't you? Maybe there *is* another path.'",
+    )
+    # In-game D&D reward: +1 Inspiration Point
+    reward_text = "\n**In-Game D&D Reward:** Your party gains +1 Inspiration Point, reflecting your internal fortitude influencing the party's morale."
+
     def __init__(self):
         super().__init__(
             "Da Struggler",
-            "Embodies the burdens of everyday life – lack of time, financial constraints, stress, exhaustion – that hinder healthy habits."
+            "Embodies the burdens of everyday life – lack of time, financial constraints, stress, exhaustion – that hinder healthy habits.",
+            # Stress Snacker: a sophisticated mood tracker could tell us the player was stressed;
+            # for now, doing both deeds on the same day counts as facing it and overcoming it.
+            offers=QUEST_RULES.get("Da Struggler", ())
         )
-        self.dilemmas_offered = {
-            "Stress Snacker": {
-                "description": "When feeling stressed, successfully complete 'Peaceful Pipeweed Moment' (10 mins mindfulness) AND avoid any unplanned unhealthy snacks.",
-                "hp_reward": 25,
-                "achievement": "Calm Hearth",
-                "check_func": self.check_stress_snacker
-            },
-            # Add other dilemmas as needed
-        }
-
-    def present_dilemma(self, player, dilemma_name):
-        if dilemma_name not in self.dilemmas_offered:
-            print(f"{self.name} doesn't present that dilemma.")
-            return
-
-        dilemma_details = self.dilemmas_offered[dilemma_name]
-        print(f"\nDa Struggler's Dilemma: {dilemma_name}")
-        print(f"  {dilemma_details['description']}")
-        print(f"  Overcoming this earns {dilemma_details['hp_reward']} HP and the '{dilemma_details['achievement']}' achievement.")
-        player.current_favors['Da Struggler'] = {"dilemma_name": dilemma_name, "active": True}
-        print("You've acknowledged Da Struggler's dilemma. Be ready to face it!")
-
-    def check_dilemma_completion(self, player):
-        if 'Da Struggler' in player.current_favors:
-            dilemma_data = player.current_favors['Da Struggler']
-            dilemma_name = dilemma_data["dilemma_name"]
-            dilemma_details = self.dilemmas_offered.get(dilemma_name)
-            if not dilemma_details or not dilemma_data.get("active"):
-                return False
-
-            if dilemma_details["check_func"](player):
-                print(f"\n--- Da Struggler's Scene: Whispers of Weariness ---")
-                print("As your party prepares for a short rest by a roadside, you hear a weary sigh from a nearby, slightly disheveled figure. It's Da Struggler, slumped against a tree, looking utterly drained. 'Ach, another day, another dozen troubles,' they mutter, pulling out a half-eaten, greasy-looking sausage roll from a crumpled wrapper. 'Just need somethin' to get through it, you know? Never any peace. Never any easy way.' Their words echo a familiar inner sentiment.")
-                print(f"\nYou take a calm breath, unaffected by Da Struggler's indulgence. You might choose to offer them a piece of your own trail mix or simply offer a sympathetic, knowing nod. Da Struggler looks up, surprised by your composure. 'How do you do it?' they ask, genuinely curious. 'You just... find a way, don't you? Maybe there *is* another path.'")
-                player.add_hp(dilemma_details["hp_reward"])
-                player.add_achievement(dilemma_details["achievement"])
-                del player.current_favors['Da Struggler'] # Dilemma overcome
-                # In-game D&D reward: +1 Inspiration Point
-                print("\n**In-Game D&D Reward:** Your party gains +1 Inspiration Point, reflecting your internal fortitude influencing the party's morale.")
-                return True
-        return False
-
-    def check_stress_snacker(self, player):
-        # This is harder to automate perfectly without a sophisticated mood tracker.
-        # For the script, we'll ask the player if they faced and overcame it TODAY.
-        today_str = datetime.date.today().isoformat()
-        if player.daily_deeds_completed.get(today_str, {}).get("Peaceful Pipeweed Moment", False) and \
-           player.daily_deeds_completed.get(today_str, {}).get("Avoid Unplanned Unhealthy Snacks", False):
-            # This is where you might ask the player:
-            # "Did you feel stressed today and still manage to do your Peaceful Pipeweed Moment and avoid unplanned unhealthy snacks? (y/n)"
-            # For automation, we'll assume the deeds being done implies success if the dilemma is active.
-            return True
-        return False
 
 class REX(Character):
+    offer_key = "impulse_name"
+    offer_noun = "impulse"
+    offer_title = "Impulse"
+    reward_line = "Overcoming this earns {hp} HP and the '{achievement}' achievement."
+    accepted_line = "You've acknowledged REX's impulse. Be prepared to stand firm!"
+    menu_intro = "REX presents the following impulses:"
+    menu_prompt = "Which impulse would you like to acknowledge and prepare to overcome? (e.g., 'Rebellious Refusal'): "
+    unknown_line = "{name} doesn't present that {noun}."
+    scene_title = "Sudden Sprint or Steady Strides?"
+    scene_text = (
+        "As your party crosses an open field, a sudden, inexplicable surge of energy hits you. You feel an overwhelming urge to just *run*, to leap, to do something wild and unrestrained. You glance over and see REX, who was previously calm, suddenly darting around, chasing butterflies with a boundless, almost reckless abandon. Their chaotic energy is contagious, whispering to your own impulses: 'Just let go! Go, go, GO!'",
+        "\nYou take a deep breath, acknowledge the surge of energy, but consciously choose to channel it. Perhaps you maintain a steady, powerful pace on your 'Stroll to Bywater' rather than a chaotic sprint, or you put that energy into meticulously preparing your healthy dinner.",
+    )
+    # In-game D&D reward: Advantage on next physical skill check
+    reward_text = "\n**In-Game D&D Reward:** Your character gains Advantage on their next physical (Strength or Dexterity) skill check during the D&D session, reflecting your newfound control over your physical urges."
+
     def __init__(self):
         super().__init__(
             "REX",
-            "The spirit of unfiltered energy and impulse. REX embodies sudden urges – sometimes productive, sometimes disruptive."
+            "The spirit of unfiltered energy and impulse. REX embodies sudden urges – sometimes productive, sometimes disruptive.",
+            # Rebellious Refusal: ideally the player would confirm they pushed through a specific
+            # planned meal or exercise despite the urge; for now, logging either one today counts.
+            offers=QUEST_RULES.get("REX", ())
         )
-        self.impulses_offered = {
-            "Rebellious Refusal": {
-                "description": "Despite a strong urge to skip a planned healthy meal or exercise, successfully complete it.",
-                "hp_reward": 30,
-                "achievement": "Iron Will of the Shire",
-                "check_func": self.check_rebellious_refusal
-            },
-            # Add other impulses as needed
-        }
-
-    def present_impulse(self, player, impulse_name):
-        if impulse_name not in self.impulses_offered:
-            print(f"{self.name} doesn't present that impulse.")
-            return
-        
-        impulse_details = self.impulses_offered[impulse_name]
-        print(f"\nREX's Impulse: {impulse_name}")
-        print(f"  {impulse_details['description']}")
-        print(f"  Overcoming this earns {impulse_details['hp_reward']} HP and the '{impulse_details['achievement']}' achievement.")
-        player.current_favors['REX'] = {"impulse_name": impulse_name, "active": True}
-        print("You've acknowledged REX's impulse. Be prepared to stand firm!")
-
-
-    def check_impulse_completion(self, player):
-        if 'REX' in player.current_favors:
-            impulse_data = player.current_favors['REX']
-            impulse_name = impulse_data["impulse_name"]
-            impulse_details = self.impulses_offered.get(impulse_name)
-            if not impulse_details or not impulse_data.get("active"):
-                return False
-            
-            if impulse_details["check_func"](player):
-                print(f"\n--- REX's Scene: Sudden Sprint or Steady Strides? ---")
-                print("As your party crosses an open field, a sudden, inexplicable surge of energy hits you. You feel an overwhelming urge to just *run*, to leap, to do something wild and unrestrained. You glance over and see REX, who was previously calm, suddenly darting around, chasing butterflies with a boundless, almost reckless abandon. Their chaotic energy is contagious, whispering to your own impulses: 'Just let go! Go, go, GO!'")
-                print(f"\nYou take a deep breath, acknowledge the surge of energy, but consciously choose to channel it. Perhaps you maintain a steady, powerful pace on your 'Stroll to Bywater' rather than a chaotic sprint, or you put that energy into meticulously preparing your healthy dinner.")
-                player.add_hp(impulse_details["hp_reward"])
-                player.add_achievement(impulse_details["achievement"])
-                del player.current_favors['REX'] # Impulse overcome
-                # In-game D&D reward: Advantage on next physical skill check
-                print("\n**In-Game D&D Reward:** Your character gains Advantage on their next physical (Strength or Dexterity) skill check during the D&D session, reflecting your newfound control over your physical urges.")
-                return True
-        return False
-
-    def check_rebellious_refusal(self, player):
-        # This requires the player to confirm they pushed through a specific planned activity.
-        # For script automation, we'll need to ask directly if they faced and overcame it.
-        # Example check:
-        today_str = datetime.date.today().isoformat()
-        # This check is illustrative. In reality, you'd need confirmation from the user
-        # that a *specific* planned meal/exercise was performed *despite* rebellion.
-        # For simplicity, we'll assume if they log their daily deed and this impulse is active,
-        # they faced it.
-        if player.daily_deeds_completed.get(today_str, {}).get("Dinner at the Green Dragon (Healthy Edition)", False) or \
-           player.daily_deeds_completed.get(today_str, {}).get("A Stroll to Bywater", False):
-            # To make this truly robust, you'd need a way for the user to report *when* they felt the impulse
-            # and what they did. For now, assume if the deed is logged, it counts towards overcoming.
-            return True
-        return False
 
 # --- Game Class ---
 class Game:
-    def __init__(self):
+    def __init__(self, journaled=True, save_file=SAVE_FILE, journal_file=JOURNAL_FILE, load=True, store=None, events=None,
+                 background_save=False, clock=None):
         self.player = Player()
+        self.events = events or TerminalRenderer() # Sink for everything the game logic reports
+        # Where saves go: anything with load(), save(player), compact(player), flush() and a
+        # `pending` record list, e.g. shire_sqlite.SQLiteSaveStore. Defaults to the binary
+        # snapshot + journal. Without journaling every save is a full snapshot, like the
+        # original save format. With background_save the writes happen on a writer thread.
+        self.store = store or SaveJournal(save_file, journal_file, JOURNAL_COMPACT_EVERY if journaled else 0,
+                                          legacy_file=os.path.splitext(save_file)[0] + '.json',
+                                          background=background_save)
         self.shire_calendar = ShireCalendar()
         self.characters = {
             "Da Provider": DaProvider(),
             "Da Struggler": DaStruggler(),
             "REX": REX()
         }
-        self.today = datetime.date.today()
-        self.load_game()
-
-        self.daily_deeds_list = {
-            "Food Focus": [
-                "Hobbit's Healthy Breakfast", "Second Breakfast of Sensibility", "No Elevenses Extra",
-                "Lembas-Like Lunch", "Dinner at the Green Dragon (Healthy Edition)", "Water from the Well",
-                "Vegetable Patch Platter", "Fruit Orchard Harvest"
-            ],
-            "Movement & Activity": [
-                "A Stroll to Bywater", "Bag End Bending & Stretching"
-            ],
-            "Blood Pressure Management": [
-                "Peaceful Pipeweed Moment", "Salt-Wise Supper", "Sleep in a Cozy Smial"
-            ]
-        }
-        self.daily_deed_points = {
-            "Hobbit's Healthy Breakfast": 5,
-            "Second Breakfast of Sensibility": 10,
-            "No Elevenses Extra": 5,
-            "Lembas-Like Lunch": 15,
-            "Dinner at the Green Dragon (Healthy Edition)": 20,
-            "Water from the Well": 10,
-            "Vegetable Patch Platter": 10,
-            "Fruit Orchard Harvest": 5,
-            "A Stroll to Bywater": 20,
-            "Bag End Bending & Stretching": 5,
-            "Peaceful Pipeweed Moment": 15,
-            "Salt-Wise Supper": 10,
-            "Sleep in a Cozy Smial": 15
-        }
+        # The game's idea of today, shared with the characters. Advance to Next Day moves it,
+        # and the save remembers where it got to: without a clock of its own the game starts
+        # on the later of the real date and the saved day.
+        self.clock = clock or ManualClock()
+        self.resume_saved_day = clock is None
+        for char in self.characters.values():
+            char.clock = self.clock
+        self.actions = None # ActionLog being recorded, if any (see record_actions)
+        self.quests = QuestEvaluator()
+        self.daily_deeds_list = DAILY_DEEDS_LIST
+        self.daily_deed_points = DAILY_DEED_POINTS
+        if load:
+            self.load_game()
+
+    @property
+    def today(self):
+        return self.clock.today()
+
+    @today.setter
+    def today(self, day):
+        self.clock.set(day)
+
+    def record_actions(self, log=None):
+        """Starts recording every game action into `log` (default: a new ActionLog starting
+        from the player's current state) so the timeline can be replayed. Returns the log."""
+        self.actions = log or ActionLog(self.player.to_dict())
+        return self.actions
+
+    def _record_action(self, action, *args):
+        """Adds an action to the log being recorded, under the game day it was taken on."""
+        if self.actions is not None:
+            self.actions.append(self.today, action, *args)
 
     def save_game(self):
-        with open(SAVE_FILE, 'w') as f:
-            json.dump(self.player.to_dict(), f, indent=4)
-        print("Game saved!")
+        self.store.save(self.player)
+        self.events.emit(Narration("Game saved!"))
+        self.events.flush() # What led up to the save, then the save, in one write
+
+    def flush_saves(self):
+        """Waits until every save so far has reached the disk."""
+        self.store.flush()
+
+    @property
+    def dirty(self):
+        """Whether anything changed since the last save."""
+        return bool(self.store.pending)
 
     def load_game(self):
-        if os.path.exists(SAVE_FILE):
-            with open(SAVE_FILE, 'r') as f:
-                data = json.load(f)
-                self.player = Player.from_dict(data)
-            print("Game loaded!")
+        player = self.store.load()
+        if player is not None:
+            self.use_player(player)
+            self.events.emit(Narration("Game loaded!"))
+            self.events.flush()
         else:
-            print("No save file found. Starting new game.")
+            self.events.emit(Narration("No save file found. Starting new game."))
+            self.events.flush() # Before the setup questions
+            self.use_player(self.player)
             self.setup_new_game()
 
+    def use_player(self, player):
+        """Makes `player` the one this game plays and saves."""
+        self.player = player
+        self.player.journal = self.store.pending
+        self.player.events = self.events
+        self.player.clock = self.clock
+        if self.resume_saved_day and player.game_day > self.today.toordinal():
+            self.today = player.game_day
+
+    def set_events(self, sink):
+        """Sends game events to `sink` from now on."""
+        self.events = self.player.events = sink
+
     def setup_new_game(self):
         print("\n--- Welcome to Your Shire's Health Quest! ---")
         player_name = input("What is your Hobbit's name? (e.g., Bilbo, Frodo): ")
         self.player.name = player_name
-        self.player.weight = float(input("Enter your current weight (lbs): "))
-        self.player.blood_pressure = input("Enter your current blood pressure (e.g., 120/80 mmHg): ")
+        weight = float(input("Enter your current weight (lbs): "))
+        blood_pressure = input("Enter your current blood pressure (e.g., 120/80 mmHg): ")
+        try:
+            self.player.record_reading(self.today, weight, blood_pressure)
+        except ValueError: # Keep what they typed; readings start once it's in the usual form
+            self.player.record_reading(self.today, weight)
+            self.player.blood_pressure = blood_pressure
         self.player.eating_habits = input("Briefly describe your current eating habits: ")
         print("\nYour Shire adventure begins!")
         self.save_game()
 
+    def status(self):
+        """The player's current state as a JSON-ready dict."""
+        player = self.player
+        return {
+            'name': player.name,
+            'today': self.today.isoformat(),
+            'shire_date': self.shire_calendar.get_shire_date(self.today),
+            'weight': player.weight,
+            'blood_pressure': player.blood_pressure,
+            'eating_habits': player.eating_habits,
+            'shire_pennies': player.shire_pennies,
+            'hobbit_points': player.hobbit_points,
+            'shire_status': player.shire_status(),
+            'achievements': list(player.achievements),
+            'deeds_today': player.daily_deeds_completed.deeds_on(self.today),
+            'current_favors': player.current_favors
+        }
+
     def display_status(self):
         print("\n--- Your Shire Status ---")
         print(f"Hobbit Name: {self.player.name}")
@@ -403,29 +2390,25 @@ class Game:
         print(f"Eating Habits: {self.player.eating_habits}")
         print(f"Shire Pennies: {self.player.shire_pennies} SP")
         print(f"Hobbit-Points: {self.player.hobbit_points} HP")
-        self.player._check_shire_status(self.player.hobbit_points) # Re-check and print current status
+        print(f"Current Shire Status: {self.player.shire_status()}")
         print(f"Achievements: {', '.join(self.player.achievements) if self.player.achievements else 'None'}")
         
         if self.player.current_favors:
             print("\n--- Active Quests/Favors ---")
             for char_name, favor_data in self.player.current_favors.items():
-                if char_name == "Da Provider":
-                    print(f"  Da Provider: {favor_data['favor_name']} - Started {favor_data['start_date']}")
-                elif char_name == "Da Struggler":
-                    print(f"  Da Struggler: {favor_data['dilemma_name']} - Active")
-                elif char_name == "REX":
-                    print(f"  REX: {favor_data['impulse_name']} - Active")
+                char = self.characters.get(char_name)
+                offer_name = favor_data.get(char.offer_key) if char else None
+                started = f"Started {favor_data['start_date']}" if favor_data.get('start_date') else "Active"
+                print(f"  {char_name}: {offer_name} - {started}")
 
     def log_daily_deeds(self):
         print(f"\n--- Log Your Daily Deeds for {self.shire_calendar.get_shire_date(self.today)} ---")
         today_str = self.today.isoformat()
-        if today_str not in self.player.daily_deeds_completed:
-            self.player.daily_deeds_completed[today_str] = {}
 
         for category, deeds in self.daily_deeds_list.items():
             print(f"\n** {category} **")
             for i, deed in enumerate(deeds):
-                done = self.player.daily_deeds_completed[today_str].get(deed, False)
+                done = self.player.daily_deeds_completed.has(today_str, deed)
                 status_char = 'X' if done else ' '
                 print(f"{i+1}. [{status_char}] {deed} (+{self.daily_deed_points[deed]} SP)")
 
@@ -447,39 +2430,118 @@ class Game:
                         print("Invalid input. Please enter numbers, 'all', 'done', or 'cancel'.")
                         continue
 
-                for deed_name in selected_deeds:
-                    if not self.player.daily_deeds_completed[today_str].get(deed_name):
-                        self.player.add_sp(self.daily_deed_points[deed_name])
-                        self.player.daily_deeds_completed[today_str][deed_name] = True
+                self.record_deeds(selected_deeds)
+                self.events.flush()
                 
                 # Update display after logging
                 for i, deed in enumerate(deeds):
-                    done = self.player.daily_deeds_completed[today_str].get(deed, False)
+                    done = self.player.daily_deeds_completed.has(today_str, deed)
                     status_char = 'X' if done else ' '
                     print(f"{i+1}. [{status_char}] {deed} (+{self.daily_deed_points[deed]} SP)")
 
         print("\nDaily deeds logged!")
         self.save_game()
 
+    def record_deeds(self, deed_names, day=None):
+        """Logs completed deeds for a day (default: the game's today) and awards their SP.
+        Returns the deeds that weren't already logged."""
+        unknown = [d for d in deed_names if d not in self.daily_deed_points]
+        if unknown:
+            raise ValueError(f"Unknown deeds: {', '.join(unknown)}")
+        day = day or self.today
+        self._record_action('deeds', _iso_day(day), list(deed_names))
+        newly_logged = []
+        for deed_name in deed_names:
+            if self.player.log_deed(day, deed_name):
+                self.player.add_sp(self.daily_deed_points[deed_name])
+                newly_logged.append(deed_name)
+        if newly_logged:
+            self.claim_weekly_bounties(day)
+        return newly_logged
+
+    def record_reading(self, weight=None, blood_pressure=None, day=None):
+        """Records a weight and/or blood pressure reading for a day (default: the game's today).
+        Raises ValueError for a weight or blood pressure that can't be read."""
+        day = day or self.today
+        self.player.record_reading(day, weight, blood_pressure)
+        self._record_action('reading', _iso_day(day), weight, blood_pressure)
+
+    def accept_offer(self, char_name, offer_name, today=None):
+        """Takes up a favor, dilemma or impulse from a character. Returns False if the
+        character already has one active with the player or doesn't offer it."""
+        char = self.characters.get(char_name)
+        if char is None:
+            raise ValueError(f"No one called {char_name} lives in the Shire.")
+        if char_name in self.player.current_favors:
+            return False
+        today = today or self.today
+        self._record_action('offer', _iso_day(today), char_name, offer_name)
+        char.present_offer(self.player, offer_name, today)
+        return char_name in self.player.current_favors
+
+    def advance_day(self):
+        """Ends the game's day and moves to the next one. Character scenes are checked as of
+        the day that's ending, whose deeds were just logged; returns the ones that triggered.
+        Earlier days' deeds stay in the history; the new day simply starts with none logged.
+        The new day is recorded on the player, so it's kept when the caller saves afterwards."""
+        # Check for active favor progress (e.g., consecutive days) before the day is over
+        scenes = self._check_scenes(self.today)
+        self.clock.advance()
+        self.player.set_game_day(self.today)
+        self._record_action('advance')
+        self.events.emit(Narration("\n--- A new day dawns in the Shire! ---"))
+        return scenes
+
+    def claim_weekly_bounties(self, day=None):
+        """Claims the weekly bounties met as of `day` (default: the game's today)."""
+        return claim_bounties(self.player, day or self.today)
+
     def check_weekly_bounties(self):
-        # This would require more complex logic to track weekly progress
-        # For simplicity, let's make it a manual check for now, or add specific tracking for each bounty.
-        print("\n--- Check Weekly Bounties ---")
-        print("This feature requires manual tracking for now. Remember to check if you completed:")
-        print("  - The Farmer's Market Haul (+50 HP)")
-        print("  - Beyond the Borders Journey (+75 HP)")
-        print("  - Master of Provisions (+25 HP)")
-        print("  - The Clear Stream Challenge (+50 HP)")
-        print("  - The Quiet Meadow (+25 HP)")
-        
-        bounty_choice = input("Did you complete any weekly bounties? (e.g., 'Farmer', 'Borders', 'None'): ").lower()
-        if 'farmer' in bounty_choice:
-            self.player.add_hp(50)
-            self.player.add_achievement("The Farmer's Market Haul Completed")
-        if 'borders' in bounty_choice:
-            self.player.add_hp(75)
-            self.player.add_achievement("Beyond the Borders Journey Completed")
-        # Add more checks as needed
+        print("\n--- Weekly Bounties ---")
+        print("Bounties are claimed automatically as you log deeds, once per week each.")
+        claimed = self.player.bounty_claims.get(iso_week(self.today), ())
+        for bounty in WEEKLY_BOUNTIES:
+            mark = 'X' if bounty.name in claimed else ' '
+            print(f"[{mark}] {bounty.name} (+{bounty.hp_reward} HP): {bounty.description}")
+            progress = ", ".join(f"{deed_name} {min(self.player.weekly.count(deed_name, self.today), days)}/{days}"
+                                 for deed_name, days in bounty.targets)
+            print(f"      {progress}")
+
+    def track_health(self):
+        print("\n--- Weight & Blood Pressure ---")
+        while True:
+            weight = input("Today's weight in lbs (Enter to skip): ").strip()
+            blood_pressure = input("Today's blood pressure, e.g. 120/80 (Enter to skip): ").strip()
+            if not weight and not blood_pressure:
+                break
+            try:
+                self.record_reading(float(weight) if weight else None, blood_pressure or None)
+                print("Reading recorded.")
+                break
+            except ValueError as exc:
+                print(f"Couldn't read that: {exc}")
+
+        summary = self.player.health.summary(self.today)
+        units = {'weight': "lbs", 'systolic': "mmHg", 'diastolic': "mmHg"}
+        for measure, info in summary.items():
+            if info['latest'] is None:
+                continue
+            day, value = info['latest']
+            averages = ", ".join(f"{label} avg {info[key]:.1f}" for label, key in
+                                 (("7-day", 'average_7_days'), ("30-day", 'average_30_days'))
+                                 if info[key] is not None)
+            trend = info['trend_per_week']
+            trend_text = f", trend {trend:+.1f} {units[measure]}/week" if trend is not None else ""
+            print(f"{measure.capitalize()}: {value:g} {units[measure]} on {day}" +
+                  (f" ({averages}{trend_text})" if averages else ""))
+
+        weeks = self.player.health.weight.resample('week', self.today - datetime.timedelta(weeks=8), self.today)
+        if weeks:
+            print("\nWeekly average weight:")
+            for week_start, mean, count in weeks:
+                print(f"  Week of {self.shire_calendar.get_shire_date(week_start)}: "
+                      f"{mean:.1f} lbs ({count} reading{'s' if count != 1 else ''})")
+        self.save_game()
 
     def interact_with_characters(self):
         print("\n--- Interact with Shire Residents ---")
@@ -491,58 +2553,33 @@ class Game:
             if choice == 'done':
                 break
             
-            if choice == 'da provider':
-                char = self.characters["Da Provider"]
-                char.introduce()
-                if 'Da Provider' not in self.player.current_favors:
-                    print("Da Provider has the following favors:")
-                    for f_name, f_details in char.favors_offered.items():
-                        print(f"- {f_name}: {f_details['description']}")
-                    favor_choice = input("Which favor would you like to attempt? (e.g., 'Smoothie Bar Blueprint'): ")
-                    char.offer_favor(self.player, favor_choice)
-                else:
-                    print("You already have an active favor with Da Provider.")
-                
-            elif choice == 'da struggler':
-                char = self.characters["Da Struggler"]
-                char.introduce()
-                if 'Da Struggler' not in self.player.current_favors:
-                    print("Da Struggler presents the following dilemmas:")
-                    for d_name, d_details in char.dilemmas_offered.items():
-                        print(f"- {d_name}: {d_details['description']}")
-                    dilemma_choice = input("Which dilemma would you like to acknowledge and face? (e.g., 'Stress Snacker'): ")
-                    char.present_dilemma(self.player, dilemma_choice)
-                else:
-                    print("You already have an active dilemma with Da Struggler.")
-
-            elif choice == 'rex':
-                char = self.characters["REX"]
+            char = next((c for name, c in self.characters.items() if name.lower() == choice), None)
+            if char is not None:
                 char.introduce()
-                if 'REX' not in self.player.current_favors:
-                    print("REX presents the following impulses:")
-                    for i_name, i_details in char.impulses_offered.items():
-                        print(f"- {i_name}: {i_details['description']}")
-                    impulse_choice = input("Which impulse would you like to acknowledge and prepare to overcome? (e.g., 'Rebellious Refusal'): ")
-                    char.present_impulse(self.player, impulse_choice)
+                if char.name not in self.player.current_favors:
+                    print(char.menu_intro)
+                    for offer_name, rule in char.offers.items():
+                        print(f"- {offer_name}: {rule.description}")
+                    offer_choice = input(char.menu_prompt)
+                    self.accept_offer(char.name, offer_choice)
                 else:
-                    print("You already have an active impulse with REX.")
+                    print(f"You already have an active {char.offer_noun} with {char.name}.")
             else:
                 print("Invalid character. Please choose from 'Da Provider', 'Da Struggler', 'REX', or 'done'.")
-            
-            self.save_game()
+
+            if self.dirty:
+                self.save_game()
 
 
-    def check_character_scenes(self):
+    def check_character_scenes(self, today=None):
         # This function is called at the start of each new day to check for scene triggers
-        triggered_scenes = []
-        for char_name, char_obj in self.characters.items():
-            if char_name == "Da Provider" and char_obj.check_favor_completion(self.player):
-                triggered_scenes.append(char_name)
-            elif char_name == "Da Struggler" and char_obj.check_dilemma_completion(self.player):
-                 triggered_scenes.append(char_name)
-            elif char_name == "REX" and char_obj.check_impulse_completion(self.player):
-                 triggered_scenes.append(char_name)
-        return triggered_scenes
+        today = today or self.today
+        self._record_action('scenes', _iso_day(today))
+        return self._check_scenes(today)
+
+    def _check_scenes(self, today=None):
+        completed = check_quests(self.player, self.characters.values(), today or self.today, self.quests)
+        return [char.name for char in completed]
 
 
     def run_daily_cycle(self):
@@ -552,13 +2589,15 @@ class Game:
         self.check_character_scenes()
 
         while True:
+            self.events.flush() # Show everything the last action caused in one write
             print("\n--- Daily Actions ---")
             print("1. Log Daily Deeds")
-            print("2. Check Weekly Bounties (Manual)")
+            print("2. Check Weekly Bounties")
             print("3. Interact with Shire Residents")
             print("4. Display Your Shire Status")
             print("5. Advance to Next Day")
             print("6. Save & Exit")
+            print("7. Track Weight & Blood Pressure")
 
             choice = input("What would you like to do? Enter number: ")
 
@@ -571,21 +2610,272 @@ class Game:
             elif choice == '4':
                 self.display_status()
             elif choice == '5':
-                self.today += datetime.timedelta(days=1)
-                self.player.daily_deeds_completed = {} # Reset daily deeds for new day
-                print("\n--- A new day dawns in the Shire! ---")
-                self.save_game()
-                # Check for active favor progress (e.g., consecutive days)
-                self.check_character_scenes() # Check again for any passive completions
+                self.advance_day()
+                self.save_game() # Also shows the new day's scenes
+                self.flush_saves()
                 print(f"\nIt's now {self.shire_calendar.get_shire_date(self.today)}.")
             elif choice == '6':
                 self.save_game()
+                self.flush_saves()
                 print("Farewell, brave Hobbit! Until next time.")
                 break
+            elif choice == '7':
+                self.track_health()
             else:
-                print("Invalid choice. Please enter a number between 1 and 6.")
+                print("Invalid choice. Please enter a number between 1 and 7.")
+
+# --- Replay ---
+class ActionLog:
+    """Every action taken in a game, in order, with the game day it was taken on, starting
+    from a saved copy of the player (`base`, a Player.to_dict()). See Game.record_actions.
+
+    Actions are (ordinal, action, args). The day an action is about (an ISO date) comes
+    first in its args, and may be earlier than the game day, e.g. for back-filled deeds:
+        'deeds'    day, [deed names]              Game.record_deeds
+        'reading'  day, weight, blood pressure    Game.record_reading
+        'offer'    day, character, offer          Game.accept_offer
+        'scenes'   day                            Game.check_character_scenes
+        'advance'                                 Game.advance_day (into this game day)
+    """
+    def __init__(self, base=None, actions=None):
+        # A detached copy: to_dict() shares lists with the live player, which keeps changing
+        self.base = json.loads(json.dumps(base if base is not None else Player().to_dict()))
+        self.actions = actions if actions is not None else []
+
+    def __len__(self):
+        return len(self.actions)
+
+    def append(self, day, action, *args):
+        ordinal = _to_ordinal(day)
+        if self.actions and ordinal < self.actions[-1][0]:
+            raise ValueError("Actions must be recorded in date order.")
+        self.actions.append((ordinal, action, args))
+
+    def save(self, path):
+        """Writes the log as JSON lines: the base player first, then one action per line."""
+        with open(path, 'w') as f:
+            f.write(json.dumps({'base': self.base}) + '\n')
+            for ordinal, action, args in self.actions:
+                f.write(json.dumps([datetime.date.fromordinal(ordinal).isoformat(), action, *args]) + '\n')
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            log = cls(json.loads(f.readline())['base'])
+            for line in f:
+                day, action, *args = json.loads(line)
+                log.append(day, action, *args)
+        return log
+
+def apply_action(game, ordinal, action, args):
+    """Performs one ActionLog action on `game`, with the game day set to the one it was taken on."""
+    day = datetime.date.fromordinal(ordinal)
+    if action == 'advance':
+        game.today = day - datetime.timedelta(days=1)
+        game.advance_day()
+        return
+    game.today = day
+    target = datetime.date.fromisoformat(args[0]) if args else None
+    if action == 'deeds':
+        game.record_deeds(args[1], target)
+    elif action == 'reading':
+        game.record_reading(args[1], args[2], target)
+    elif action == 'offer':
+        game.accept_offer(args[1], args[2], target)
+    elif action == 'scenes':
+        game.check_character_scenes(target)
+    else:
+        raise ValueError(f"Unknown action {action!r}")
+
+class Replay:
+    """Rebuilds a player as they were at the end of any day covered by an ActionLog.
+
+    Moving forward replays actions from where the last seek stopped. Along the way a copy
+    of the player is kept every `checkpoint_every` days, so going back (or jumping ahead
+    past a checkpoint) restarts from the nearest checkpoint instead of the beginning.
+    Edit a copy of the log's actions and replay it to see how things would have gone.
+    """
+    def __init__(self, log, checkpoint_every=REPLAY_CHECKPOINT_DAYS):
+        self.log = log
+        self.checkpoint_every = checkpoint_every
+        first_day = log.actions[0][0] - 1 if log.actions else 0
+        self.checkpoint_days = [first_day] # Checkpoint i holds the player after every action up to this day
+        self.checkpoints = [(0, json.dumps(log.base))] # (next action index, saved player)
+        self.game = None
+        self.position = 0 # Index of the next action to apply to self.game
+        self.day = first_day # Last day fully applied to self.game
+
+    def _restore(self, index):
+        self.position, saved = self.checkpoints[index]
+        self.day = self.checkpoint_days[index]
+        self.game = Game(load=False, events=NULL_SINK, clock=ManualClock(datetime.date.fromordinal(max(self.day, 1))))
+        self.game.use_player(Player.from_dict(json.loads(saved)))
+
+    def seek(self, day):
+        """Returns a Game whose player reflects every action up to and including `day`.
+        The game belongs to the replay; copy the player (e.g. to_dict) before changing it."""
+        target = _to_ordinal(day)
+        index = bisect.bisect_right(self.checkpoint_days, target) - 1
+        if self.game is None or target < self.day or self.checkpoint_days[index] > self.day:
+            self._restore(max(index, 0))
+        actions = self.log.actions
+        while self.position < len(actions) and actions[self.position][0] <= target:
+            ordinal = actions[self.position][0]
+            if ordinal > self.day: # Finished self.day; keep a copy if the last one is far enough back
+                if self.day - self.checkpoint_days[-1] >= self.checkpoint_every:
+                    self.checkpoint_days.append(self.day)
+                    self.checkpoints.append((self.position, json.dumps(self.game.player.to_dict())))
+                self.day = ordinal
+            apply_action(self.game, *actions[self.position])
+            self.position += 1
+        self.day = max(self.day, target)
+        self.game.today = datetime.date.fromordinal(target)
+        return self.game
+
+# --- Profiling ---
+class CallStats:
+    """Call count, total time and bytes for one instrumented method, plus a fixed-size
+    random sample of call durations for percentiles."""
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.samples = array('d')
+        self.rng = random.Random(0)
+
+    def add(self, seconds, size=0):
+        self.calls += 1
+        self.seconds += seconds
+        self.bytes += size
+        if len(self.samples) < PROFILE_SAMPLES:
+            self.samples.append(seconds)
+        else: # Reservoir sampling keeps every call equally likely to be in the sample
+            slot = self.rng.randrange(self.calls)
+            if slot < PROFILE_SAMPLES:
+                self.samples[slot] = seconds
+
+    def percentile(self, fraction):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'total_seconds': self.seconds,
+            'p50_seconds': self.percentile(0.50),
+            'p99_seconds': self.percentile(0.99),
+            'bytes': self.bytes
+        }
+
+class Profiler:
+    """Opt-in timing of the game's hot paths.
+
+    enable() swaps each target method for a timing wrapper and disable() puts the
+    original back, so while profiling is off the game runs its plain methods.
+    A target is (class, method name, label, size): label(args) names the entry (default
+    "Class.method"), and size(args) gives the bytes a call writes.
+    """
+    def __init__(self):
+        self.stats = {}
+        self.lock = threading.Lock() # Saves may be written from the background writer thread
+        self.originals = [] # (class, method name, original) for everything currently wrapped
+
+    @property
+    def enabled(self):
+        return bool(self.originals)
+
+    def record(self, name, seconds, size=0):
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = CallStats()
+            stats.add(seconds, size)
+
+    def _wrap(self, fn, name, label, size):
+        record = self.record
+        clock = time.perf_counter
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label(args) if label else name, clock() - start, size(args) if size else 0)
+        return timed
+
+    def enable(self, targets=None):
+        if self.enabled:
+            return
+        for owner, attribute, label, size in (targets or HOT_PATHS):
+            original = owner.__dict__[attribute]
+            self.originals.append((owner, attribute, original))
+            setattr(owner, attribute, self._wrap(original, f"{owner.__name__}.{attribute}", label, size))
+
+    def disable(self):
+        for owner, attribute, original in reversed(self.originals):
+            setattr(owner, attribute, original)
+        self.originals = []
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+
+    def report(self):
+        """{entry name: {calls, total_seconds, p50_seconds, p99_seconds, bytes}}, slowest total first."""
+        with self.lock:
+            ranked = sorted(self.stats.items(), key=lambda item: item[1].seconds, reverse=True)
+            return {name: stats.to_dict() for name, stats in ranked}
+
+    def format_table(self):
+        def ms(seconds):
+            return f"{seconds * 1e3:.3f}" if seconds is not None else "-"
+        lines = [f"{'Method':<36} {'Calls':>8} {'Total ms':>10} {'p50 ms':>9} {'p99 ms':>9} {'Bytes':>12}"]
+        for name, row in self.report().items():
+            lines.append(f"{name:<36} {row['calls']:>8} {ms(row['total_seconds']):>10} {ms(row['p50_seconds']):>9} "
+                         f"{ms(row['p99_seconds']):>9} {row['bytes']:>12}")
+        return "\n".join(lines)
+
+    def dump(self, destination):
+        """Writes the report: "text" or "json" to stderr, otherwise to the named file
+        (as JSON if it ends in .json, else as a table)."""
+        as_json = destination == 'json' or destination.endswith('.json')
+        text = json.dumps(self.report(), indent=4) if as_json else self.format_table()
+        if destination in ('text', 'json'):
+            print(text, file=sys.stderr)
+        else:
+            with open(destination, 'w') as f:
+                f.write(text + "\n")
+
+def _write_size(args):
+    _, op, payload = args
+    if op == 'snapshot':
+        return len(payload[0])
+    return len(payload) if op == 'append' else 0
+
+HOT_PATHS = [
+    (SaveJournal, 'load', None, None), # Not Game.load_game or log_daily_deeds, which wait on input()
+    (Game, 'save_game', None, None),
+    (Game, 'record_deeds', None, None),
+    (Game, '_check_scenes', lambda args: "Game.check_character_scenes", None), # Also runs on day advance
+    (QuestEvaluator, 'evaluate', None, None),
+    (AchievementCatalog, 'deed_logged', None, None),
+    (Character, 'complete', lambda args: f"{args[0].name}.complete", None),
+    (Player, '_check_shire_status', None, None),
+    (SaveJournal, '_write', None, _write_size)
+]
+
+PROFILER = Profiler()
+
+def profile_from_environment():
+    """Turns on profiling when SHIRE_PROFILE is set, dumping the report when the program exits."""
+    destination = os.environ.get(PROFILE_ENV, '').strip()
+    if destination and destination != '0':
+        PROFILER.enable()
+        atexit.register(PROFILER.dump, 'text' if destination == '1' else destination)
 
 # --- Main Game Loop ---
 if __name__ == "__main__":
-    game = Game()
-    game.run_daily_cycle()
+    import shire_cli # Subcommands for scripts; also runs the interactive game when given none
+    sys.exit(shire_cli.main())
@@ -0,0 +1,436 @@
+"""Progress reports: SP earned per week and month, how much of each deed category was
+done, longest streaks and the history of character favors, for one hobbit or summed
+over many.
+
+A report reads the deed history in one pass over its day masks, cut into pieces at
+every week and month boundary; each piece is scanned once and weeks and months are
+joined from their pieces. Weeks and months that ended before the report's last day
+can't change, so their totals are remembered, keyed by the days' own masks (a back-filled
+day changes the key, so nothing stale is ever reused). A repeated report only scans the
+current week and month: three years of history take a millisecond or two instead of
+fifteen.
+
+    python shire_report.py                          # the hobbit in the default save
+    python shire_report.py --weeks 12 --months 12
+    python shire_report.py --date 2025-06-30 --json
+    python shire_report.py --data-dir shire_players  # summary over every hobbit the service saved
+    python shire_report.py --db shire_health_quest.db
+"""
+import argparse
+import bisect
+import collections
+import datetime
+import functools
+import json
+import os
+import sys
+import threading
+from array import array
+
+from shire_quest import (
+    ACHIEVEMENTS, CONTENT, DEED_NAMES, JOURNAL_FILE, MAX_DEEDS, QUEST_RULES, SAVE_FILE, DaProvider, DaStruggler, REX,
+    SaveJournal, iso_week
+)
+
+# --- Configuration ---
+REPORT_CACHE_SIZE = 65536 # Finished weeks and months remembered, across all hobbits (under 1 KB each)
+DEFAULT_WEEKS = 8 # Rows shown by the text report; --json includes every period unless told otherwise
+DEFAULT_MONTHS = 6
+TOP_STREAKS = 10 # Hobbits listed by longest streak in a summary
+
+ANY_DEED = MAX_DEEDS # Run key for days with any deed at all; deeds use their bit index
+CATEGORIES = tuple(category for category, _ in CONTENT.categories)
+CATEGORY_SIZES = tuple(len(ids) for _, ids in CONTENT.categories)
+CATEGORY_MASKS = tuple(sum(1 << i for i in ids) for _, ids in CONTENT.categories)
+
+# --- Period Totals ---
+class PeriodStats:
+    """Totals for a run of consecutive days.
+
+    `runs` holds (key, leading, trailing, longest) for each deed done in the period, flat
+    and sorted by key: the deed's bit index (or ANY_DEED), the run of days with it
+    starting on the first day, the run ending on the last day, and the longest run
+    anywhere. That's enough to join adjacent periods exactly, so streaks spanning many
+    weeks come out right without rescanning them. Shared through the cache; never
+    modify one.
+    """
+    __slots__ = ('days', 'sp', 'active_days', 'category_deeds', 'runs')
+
+    def __init__(self, days, sp, active_days, category_deeds, runs):
+        self.days = days
+        self.sp = sp
+        self.active_days = active_days
+        self.category_deeds = category_deeds # Deeds done in each of CATEGORIES
+        self.runs = runs
+
+    def run_map(self):
+        """{key: (leading, trailing, longest)}."""
+        runs = self.runs
+        return {runs[i]: runs[i + 1:i + 4] for i in range(0, len(runs), 4)}
+
+    def join(self, later):
+        """Totals for this period followed directly by `later`."""
+        earlier_runs, later_runs = self.run_map(), later.run_map()
+        runs = []
+        for key in sorted(earlier_runs.keys() | later_runs.keys()):
+            lead, trail, longest = earlier_runs.get(key, (0, 0, 0))
+            later_lead, later_trail, later_longest = later_runs.get(key, (0, 0, 0))
+            runs += (key, lead + later_lead if lead == self.days else lead,
+                     later_trail + trail if later_trail == later.days else later_trail,
+                     max(longest, later_longest, trail + later_lead))
+        return PeriodStats(self.days + later.days, self.sp + later.sp, self.active_days + later.active_days,
+                           tuple(a + b for a, b in zip(self.category_deeds, later.category_deeds)), tuple(runs))
+
+    def category_rates(self):
+        """{category: share of its deeds done over the period's days}."""
+        return {category: round(done / (size * self.days), 3) if self.days else 0.0
+                for category, size, done in zip(CATEGORIES, CATEGORY_SIZES, self.category_deeds)}
+
+@functools.lru_cache(maxsize=REPORT_CACHE_SIZE)
+def mask_totals(mask):
+    """(SP, deeds per category) for one day's mask; the same few masks recur day after day."""
+    sp = sum(CONTENT.deed_points[i] for i in range(len(CONTENT.deed_points)) if mask >> i & 1)
+    return sp, tuple(bin(mask & category).count('1') for category in CATEGORY_MASKS)
+
+def scan(masks):
+    """PeriodStats for an array of consecutive day masks, in one pass."""
+    sp, category_deeds = 0, [0] * len(CATEGORIES)
+    for mask, days in collections.Counter(masks).items():
+        if mask:
+            mask_sp, mask_categories = mask_totals(mask)
+            sp += mask_sp * days
+            for i, done in enumerate(mask_categories):
+                category_deeds[i] += done * days
+    runs, starts = {}, {} # key -> [leading, trailing, longest]; key -> offset its current run began
+    def close(key, start, end):
+        run = runs.setdefault(key, [0, 0, 0])
+        if start == 0:
+            run[0] = end
+        if end == len(masks):
+            run[1] = end - start
+        run[2] = max(run[2], end - start)
+    previous = 0
+    for offset, mask in enumerate(masks):
+        if mask:
+            mask |= 1 << ANY_DEED
+        changed = mask ^ previous
+        while changed: # Only deeds that start or stop a run cost anything
+            bit = changed & -changed
+            changed ^= bit
+            key = bit.bit_length() - 1
+            if mask & bit:
+                starts[key] = offset
+            else:
+                close(key, starts.pop(key), offset)
+        previous = mask
+    for key, start in starts.items():
+        close(key, start, len(masks))
+    return PeriodStats(len(masks), sp, len(masks) - masks.count(0), tuple(category_deeds),
+                       tuple(value for key in sorted(runs) for value in (key, *runs[key])))
+
+class PeriodCache:
+    """Totals of finished weeks and months, keyed by (mask typecode, the days' masks as
+    bytes), so identical periods are shared and a changed day never matches a stale
+    entry. The least recently used entries are dropped once there are `size` of them."""
+    def __init__(self, size=REPORT_CACHE_SIZE):
+        self.size = size
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock() # The service builds reports on worker threads
+
+    def get(self, key):
+        with self.lock:
+            stats = self.entries.get(key)
+            if stats is not None:
+                self.entries.move_to_end(key)
+            return stats
+
+    def put(self, key, stats):
+        with self.lock:
+            self.entries[key] = stats
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+REPORT_CACHE = PeriodCache()
+
+# --- Periods ---
+def _boundaries(first, last):
+    """Ordinals where a week or a month starts, from `first` to the day after `last`."""
+    starts = {first, last + 1}
+    day = first - datetime.date.fromordinal(first).weekday() + 7
+    while day <= last:
+        starts.add(day)
+        day += 7
+    month = datetime.date.fromordinal(first).replace(day=1)
+    while True:
+        month = (month + datetime.timedelta(days=32)).replace(day=1)
+        if month.toordinal() > last:
+            break
+        starts.add(month.toordinal())
+    return sorted(starts)
+
+def _day_bytes(history, first, last):
+    """The masks of every day from `first` to `last` as bytes, with unlogged days as zeros."""
+    masks = history.masks
+    size = masks.itemsize
+    lo, hi = first - history.start, last - history.start + 1
+    data = masks[max(lo, 0):max(hi, 0)].tobytes()
+    return bytes(size * min(max(-lo, 0), hi - lo)) + data + bytes(size * max(hi - max(len(masks), lo, 0), 0))
+
+def history_periods(history, last, first=None, cache=REPORT_CACHE):
+    """([(week, first, last, PeriodStats)], [(month, first, last, PeriodStats)], whole-range
+    PeriodStats) for the days from `first` (default: the first logged day) to `last`,
+    all ordinals. Weeks and months are clipped to the range, and finished ones come from
+    `cache` when their days haven't changed. None when there are no days to report."""
+    history.load_archive()
+    if history.start is None:
+        return None
+    first = history.start if first is None else first
+    if first > last:
+        return None
+    typecode = history.masks.typecode
+    data = _day_bytes(history, first, last)
+    size = history.masks.itemsize
+    bounds = _boundaries(first, last)
+    pieces = {} # Start ordinal -> PeriodStats of the piece up to the next boundary, scanned at most once
+
+    def piece(index):
+        lo, hi = bounds[index], bounds[index + 1]
+        stats = pieces.get(lo)
+        if stats is None:
+            stats = pieces[lo] = scan(array(typecode, data[(lo - first) * size:(hi - first) * size]))
+        return stats
+
+    def period(lo, hi):
+        closed = hi <= last # Finished periods can't change, so they're looked up
+        if closed:
+            key = (typecode, data[(lo - first) * size:(hi - first) * size])
+            stats = cache.get(key)
+            if stats is not None:
+                return stats
+        stats = functools.reduce(PeriodStats.join, map(piece, range(bisect.bisect_left(bounds, lo),
+                                                                     bisect.bisect_left(bounds, hi))))
+        if closed:
+            cache.put(key, stats)
+        return stats
+
+    weeks, months = [], []
+    week_starts = [b for b in bounds[:-1] if b == first or datetime.date.fromordinal(b).weekday() == 0]
+    for lo, hi in zip(week_starts, week_starts[1:] + [last + 1]):
+        weeks.append((iso_week(lo), lo, hi - 1, period(lo, hi)))
+    month_starts = [b for b in bounds[:-1] if b == first or datetime.date.fromordinal(b).day == 1]
+    for lo, hi in zip(month_starts, month_starts[1:] + [last + 1]):
+        months.append((datetime.date.fromordinal(lo).strftime('%Y-%m'), lo, hi - 1, period(lo, hi)))
+    # Everything up to the end of the last finished month is one more cached period
+    finished = [stats for _, _, month_last, stats in months if month_last < last]
+    total = None
+    if finished:
+        key = (typecode, data[:(months[len(finished) - 1][2] + 1 - first) * size])
+        total = cache.get(key)
+        if total is None:
+            total = functools.reduce(PeriodStats.join, finished)
+            cache.put(key, total)
+    for *_, stats in months[len(finished):]:
+        total = stats if total is None else total.join(stats)
+    return weeks, months, total
+
+# --- Favors ---
+OFFER_KEYS = {char.name: char.offer_key for char in (DaProvider(), DaStruggler(), REX())}
+FAVOR_MARKS = {ACHIEVEMENTS.marks[('favor', rule.name)]: (character, rule.name) # Achievement -> (character, offer)
+               for character, rules in QUEST_RULES.items() for rule in rules if ('favor', rule.name) in ACHIEVEMENTS.marks}
+
+def favor_history(player):
+    """{'completed': offers finished (first time each), 'active': offers under way}."""
+    completed = [{'character': FAVOR_MARKS[name][0], 'offer': FAVOR_MARKS[name][1],
+                  'day': day.isoformat() if day else None}
+                 for name, day in player.unlock_records() if name in FAVOR_MARKS]
+    active = [{'character': character, 'offer': data.get(OFFER_KEYS.get(character, 'favor_name')),
+               'since': data.get('start_date')}
+              for character, data in player.current_favors.items() if data.get('active', True)]
+    return {'completed': completed, 'active': active}
+
+# --- Reports ---
+def _iso(ordinal):
+    return datetime.date.fromordinal(ordinal).isoformat()
+
+def _row(key, label, first, last, stats):
+    return {key: label, 'from': _iso(first), 'to': _iso(last), 'sp': stats.sp, 'active_days': stats.active_days,
+            'categories': stats.category_rates()}
+
+def _streak_name(key):
+    return "Any deed" if key == ANY_DEED else DEED_NAMES[key]
+
+def player_report(player, today=None, weeks=None, months=None):
+    """A JSON-ready report on a player's history up to `today` (default: the real date, or
+    the player's game day if the game has advanced past it, as shire_cli.py plays it).
+    `weeks` and `months` limit how many of the latest periods are listed; the totals
+    always cover everything."""
+    last = today.toordinal() if today else max(datetime.date.today().toordinal(), player.game_day)
+    periods = history_periods(player.daily_deeds_completed, last)
+    if periods is None:
+        return {'name': player.name, 'from': None, 'to': _iso(last), 'days': 0, 'sp': 0, 'active_days': 0,
+                'categories': {}, 'streaks': [], 'weeks': [], 'months': [], 'favors': favor_history(player)}
+    week_rows, month_rows, total = periods
+    streaks = sorted(total.run_map().items(), key=lambda item: (item[0] != ANY_DEED, -item[1][2], item[0]))
+    return {
+        'name': player.name,
+        'from': _iso(week_rows[0][1]),
+        'to': _iso(last),
+        'days': total.days,
+        'sp': total.sp,
+        'active_days': total.active_days,
+        'categories': total.category_rates(),
+        'streaks': [{'deed': _streak_name(key), 'longest': longest, 'current': trail}
+                    for key, (_, trail, longest) in streaks],
+        'weeks': [_row('week', *row) for row in week_rows[-weeks if weeks else 0:]],
+        'months': [_row('month', *row) for row in month_rows[-months if months else 0:]],
+        'favors': favor_history(player)
+    }
+
+def summary_report(players, today=None, weeks=None, months=None):
+    """A JSON-ready report summed over many players: SP and active hobbits per week and
+    month, category completion over every hobbit's days, the longest streaks and how
+    often each offer was completed."""
+    last = (today or datetime.date.today()).toordinal()
+    week_totals, month_totals = {}, {}
+    days = sp = 0
+    category_deeds = [0] * len(CATEGORIES)
+    streaks, favors = [], collections.Counter()
+    count = 0
+    for player in players:
+        count += 1
+        favors.update(entry['offer'] for entry in favor_history(player)['completed'])
+        periods = history_periods(player.daily_deeds_completed, last)
+        if periods is None:
+            continue
+        week_rows, month_rows, total = periods
+        for totals, rows in ((week_totals, week_rows), (month_totals, month_rows)):
+            for label, first, _, stats in rows:
+                entry = totals.setdefault(label, [first, 0, 0, 0]) # first day, SP, hobbits active, hobbits
+                entry[1] += stats.sp
+                entry[2] += stats.active_days > 0
+                entry[3] += 1
+        days += total.days
+        sp += total.sp
+        for i, done in enumerate(total.category_deeds):
+            category_deeds[i] += done
+        streaks.append((total.run_map().get(ANY_DEED, (0, 0, 0))[2], player.name))
+
+    def rows(key, totals, limit):
+        ordered = sorted(totals.items(), key=lambda item: item[1][0])
+        return [{key: label, 'sp': entry_sp, 'active_hobbits': active,
+                 'mean_sp': round(entry_sp / active, 1) if active else 0.0}
+                for label, (_, entry_sp, active, _) in ordered[-limit if limit else 0:]]
+    return {
+        'to': _iso(last),
+        'hobbits': count,
+        'sp': sp,
+        'categories': {category: round(done / (size * days), 3) if days else 0.0
+                       for category, size, done in zip(CATEGORIES, CATEGORY_SIZES, category_deeds)},
+        'longest_streaks': [{'name': name, 'days': length}
+                            for length, name in sorted(streaks, key=lambda s: (-s[0], s[1]))[:TOP_STREAKS]],
+        'favors_completed': dict(favors.most_common()),
+        'weeks': rows('week', week_totals, weeks),
+        'months': rows('month', month_totals, months)
+    }
+
+# --- Loading Hobbits ---
+def players_in_directory(data_dir):
+    """Every hobbit saved in a service data directory, loaded one at a time."""
+    for filename in sorted(os.listdir(data_dir)):
+        base, ext = os.path.splitext(filename)
+        if ext == '.dat':
+            path = os.path.join(data_dir, base)
+            player = SaveJournal(path + '.dat', path + '.journal').load(migrate=False)
+            if player is not None:
+                yield player
+
+def players_in_database(path):
+    from shire_sqlite import SQLiteDatabase
+    database = SQLiteDatabase(path)
+    try:
+        for name in database.player_names():
+            player = database.load_player(name)
+            if player is not None:
+                yield player
+    finally:
+        database.close()
+
+# --- Text Output ---
+def _percentages(rates):
+    return ", ".join(f"{category} {rate:.0%}" for category, rate in rates.items())
+
+def print_player_report(report):
+    print(f"--- {report['name']}: {report['from'] or 'no deeds yet'} to {report['to']} ---")
+    print(f"SP earned: {report['sp']} over {report['active_days']} of {report['days']} days")
+    if report['categories']:
+        print(f"Deeds done: {_percentages(report['categories'])}")
+    if report['streaks']:
+        print("Longest streaks: " + "; ".join(f"{s['deed']} {s['longest']}" + (f" (current {s['current']})" if s['current'] else "")
+                                              for s in report['streaks'][:6]))
+    for key, title in (('weeks', "Weeks"), ('months', "Months")):
+        if report[key]:
+            print(f"\n{title}:")
+            for row in report[key]:
+                label = row['week' if key == 'weeks' else 'month']
+                print(f"  {label:<8} {row['sp']:>5} SP  {row['active_days']:>2} active days  {_percentages(row['categories'])}")
+    favors = report['favors']
+    if favors['completed'] or favors['active']:
+        print("\nFavors:")
+        for entry in favors['completed']:
+            print(f"  [X] {entry['offer']} ({entry['character']})" + (f", {entry['day']}" if entry['day'] else ""))
+        for entry in favors['active']:
+            print(f"  [ ] {entry['offer']} ({entry['character']})" + (f", since {entry['since']}" if entry['since'] else ""))
+
+def print_summary_report(report):
+    print(f"--- {report['hobbits']} hobbits, up to {report['to']} ---")
+    print(f"SP earned: {report['sp']}")
+    print(f"Deeds done: {_percentages(report['categories'])}")
+    if report['longest_streaks']:
+        print("Longest streaks: " + ", ".join(f"{s['name']} {s['days']}" for s in report['longest_streaks']))
+    for key, title in (('weeks', "Weeks"), ('months', "Months")):
+        if report[key]:
+            print(f"\n{title}:")
+            for row in report[key]:
+                label = row['week' if key == 'weeks' else 'month']
+                print(f"  {label:<8} {row['sp']:>7} SP  {row['active_hobbits']:>5} active  {row['mean_sp']:>7} SP each")
+    if report['favors_completed']:
+        print("\nFavors completed: " + ", ".join(f"{offer} {n}" for offer, n in report['favors_completed'].items()))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report SP, deed categories, streaks and favors over time.")
+    parser.add_argument("--save-file", default=SAVE_FILE)
+    parser.add_argument("--journal-file", default=JOURNAL_FILE)
+    parser.add_argument("--data-dir", help="summarize every hobbit saved by shire_service.py in this directory")
+    parser.add_argument("--db", help="summarize every hobbit in this SQLite database")
+    parser.add_argument("--date", type=datetime.date.fromisoformat, help="the report's last day (default: today, or a saved game day past it)")
+    parser.add_argument("--weeks", type=int, help=f"latest weeks to list (text default: {DEFAULT_WEEKS})")
+    parser.add_argument("--months", type=int, help=f"latest months to list (text default: {DEFAULT_MONTHS})")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    weeks = args.weeks if args.weeks is not None or args.json else DEFAULT_WEEKS
+    months = args.months if args.months is not None or args.json else DEFAULT_MONTHS
+
+    if args.data_dir or args.db:
+        source = args.db or args.data_dir
+        if not (os.path.isfile(source) if args.db else os.path.isdir(source)):
+            parser.exit(1, f"Nothing saved at {source}.\n")
+        players = players_in_database(args.db) if args.db else players_in_directory(args.data_dir)
+        report, show = summary_report(players, args.date, weeks, months), print_summary_report
+    else:
+        player = SaveJournal(args.save_file, args.journal_file,
+                             legacy_file=os.path.splitext(args.save_file)[0] + '.json').load(migrate=False)
+        if player is None:
+            parser.exit(1, f"No save at {args.save_file}.\n")
+        report, show = player_report(player, args.date, weeks, months), print_player_report
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        show(report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
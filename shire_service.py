@@ -0,0 +1,434 @@
+"""Local HTTP/JSON service that serves many hobbits from one process.
+
+Each hobbit is saved in its own snapshot + journal pair under the data directory, or
+in one shared SQLite database with --db.
+Recently used players stay cached in memory, every player has its own lock so
+requests for different hobbits never wait on each other, and saves run in a
+thread pool so disk I/O never blocks the event loop.
+
+    python shire_service.py --port 8750 --data-dir shire_players
+    python shire_service.py --port 8750 --db shire_health_quest.db
+    SHIRE_PROFILE=profile.json python shire_service.py    # time the hot paths, written out on exit
+
+Every hobbit's SP, HP and deeds also feed the shared leaderboards (see shire_leaderboard),
+which are saved beside the hobbits every LEADERBOARD_SAVE_SECONDS and on shutdown. A
+hobbit appears on the boards once their save has been loaded by the service.
+
+Endpoints (all bodies and responses are JSON):
+    POST /players/<name>                 {"weight": 180, "blood_pressure": "130/85", "eating_habits": "..."}
+    GET  /players/<name>                 current status
+    POST /players/<name>/deeds           {"deeds": ["Water from the Well", ...], "date": "2025-01-31"}
+    POST /players/<name>/favors          {"character": "Da Provider", "offer": "Smoothie Bar Blueprint"}
+    POST /players/<name>/readings        {"weight": 178.5, "blood_pressure": "128/84", "date": "2025-01-31"}
+    POST /players/<name>/advance         move that hobbit's game to the next day
+    GET  /players/<name>/report?weeks=8&months=6   SP per week and month, categories, streaks, favors
+    GET  /leaderboards/<board>?top=10    best players: hobbit_points, shire_pennies, streak or weekly_sp
+    GET  /leaderboards/<board>/<name>?around=2   a hobbit's rank and the players either side
+"""
+import argparse
+import asyncio
+import datetime
+import io
+import json
+import os
+import re
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from shire_leaderboard import Leaderboard
+from shire_quest import Game, MultiSink, TerminalRenderer, profile_from_environment
+from shire_report import player_report
+
+# --- Configuration ---
+DEFAULT_DATA_DIR = 'shire_players'
+DEFAULT_PORT = 8750
+MAX_CACHED_PLAYERS = 10000
+MAX_BODY_BYTES = 1 << 20
+LEADERBOARD_FILE = 'leaderboard.json'
+LEADERBOARD_SAVE_SECONDS = 30
+MAX_LEADERBOARD_ENTRIES = 100
+MAX_REPORT_WEEKS = 520 # Ten years
+MAX_REPORT_MONTHS = 120
+
+PLAYER_NAME = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+ROUTE = re.compile(r'^/players/([^/]+)(?:/(deeds|favors|readings|advance|report))?/?$')
+LEADERBOARD_ROUTE = re.compile(r'^/leaderboards/([a-z_]+)(?:/([^/]+))?/?$')
+
+class ServiceError(Exception):
+    """A request the service refuses; turned into a JSON error response."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# --- Player Sessions ---
+class PlayerSession:
+    """A cached hobbit: their Game (which holds the player and their save journal) and lock."""
+    def __init__(self, game):
+        self.game = game
+        self.lock = asyncio.Lock()
+
+class ShireService:
+    """The game operations behind the HTTP routes, safe to call concurrently."""
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, max_cached=MAX_CACHED_PLAYERS, database=None, leaderboard=None):
+        self.data_dir = data_dir
+        self.database = database # shire_sqlite.SQLiteDatabase to save into instead of per-player files
+        self.leaderboard = leaderboard or Leaderboard()
+        self.max_cached = max_cached
+        self.sessions = OrderedDict() # name -> PlayerSession, least recently used first
+        self.loading = {} # name -> Future for a load already in progress
+        if database is None:
+            os.makedirs(data_dir, exist_ok=True)
+
+    def _new_game(self, name):
+        if self.database is not None:
+            from shire_sqlite import SQLiteSaveStore
+            return Game(load=False, store=SQLiteSaveStore(self.database, name))
+        base = os.path.join(self.data_dir, name)
+        return Game(save_file=base + '.dat', journal_file=base + '.journal', load=False)
+
+    def _evict(self):
+        while len(self.sessions) > self.max_cached:
+            for name, session in self.sessions.items():
+                if not session.lock.locked():
+                    del self.sessions[name] # Every change is saved before its lock is released
+                    break
+            else:
+                return
+
+    def _discard(self, name, session):
+        if self.sessions.get(name) is session:
+            del self.sessions[name]
+        self.leaderboard.forget(name)
+
+    async def _session(self, name, create=False):
+        if not PLAYER_NAME.match(name):
+            raise ServiceError(400, "Hobbit names may only use letters, digits, '-' and '_'.")
+        session = self.sessions.get(name)
+        if session is None and name in self.loading: # Someone else is already reading this save
+            session = await asyncio.shield(self.loading[name])
+        if session is not None:
+            if create:
+                raise ServiceError(409, f"{name} has already started a quest.")
+            self.sessions.move_to_end(name)
+            return session
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.loading[name] = future
+        try:
+            game = self._new_game(name)
+            player = await loop.run_in_executor(None, game.store.load)
+            if player is None and not create:
+                raise ServiceError(404, f"No hobbit named {name} has started a quest.")
+            if player is not None and create:
+                raise ServiceError(409, f"{name} has already started a quest.")
+            if player is not None:
+                game.use_player(player)
+            else:
+                game.player.name = name
+                game.use_player(game.player)
+            self.leaderboard.track(game.player)
+            session = PlayerSession(game)
+            self.sessions[name] = session
+            self._evict()
+            future.set_result(session)
+            return session
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception() # Mark as retrieved in case nobody else was waiting
+            raise
+        finally:
+            del self.loading[name]
+
+    async def _save(self, game):
+        await asyncio.get_running_loop().run_in_executor(None, game.store.save, game.player)
+
+    async def _run(self, name, action, create=False, save=True):
+        """Runs `action(game)` under the player's lock, collecting the messages it produces."""
+        session = await self._session(name, create)
+        async with session.lock:
+            messages = io.StringIO()
+            session.game.set_events(MultiSink(TerminalRenderer(messages), self.leaderboard.sink(session.game.player)))
+            try:
+                result = action(session.game)
+                session.game.events.flush()
+                if save:
+                    await self._save(session.game)
+            except BaseException:
+                if create: # Nothing was saved, so the hobbit must not linger in the cache or on the boards
+                    self._discard(name, session)
+                raise
+        response = session.game.status()
+        response['messages'] = [line for line in messages.getvalue().splitlines() if line.strip()]
+        if result is not None:
+            response['result'] = result
+        return response
+
+    async def create_player(self, name, profile):
+        def setup(game):
+            try:
+                game.record_reading(profile.get('weight'), profile.get('blood_pressure'))
+            except (TypeError, ValueError) as exc:
+                raise ServiceError(400, str(exc))
+            game.player.eating_habits = str(profile.get('eating_habits', game.player.eating_habits))
+        # With no snapshot on disk yet, the first save writes a full one (profile included)
+        return await self._run(name, setup, create=True)
+
+    async def status(self, name):
+        return await self._run(name, lambda game: None, save=False)
+
+    async def log_deeds(self, name, deeds, date=None):
+        if not isinstance(deeds, list) or not all(isinstance(d, str) for d in deeds):
+            raise ServiceError(400, "'deeds' must be a list of deed names.")
+        day = _parse_date(date) if date else None
+        def log(game):
+            try:
+                return game.record_deeds(deeds, day)
+            except ValueError as exc:
+                raise ServiceError(400, str(exc))
+        return await self._run(name, log)
+
+    async def accept_offer(self, name, character, offer):
+        def accept(game):
+            try:
+                accepted = game.accept_offer(character, offer, game.today)
+            except ValueError as exc:
+                raise ServiceError(404, str(exc))
+            if not accepted:
+                raise ServiceError(409, f"{character} can't give you '{offer}' right now.")
+            return accepted
+        return await self._run(name, accept)
+
+    async def record_reading(self, name, weight=None, blood_pressure=None, date=None):
+        if weight is None and not blood_pressure:
+            raise ServiceError(400, "Send a 'weight', a 'blood_pressure' or both.")
+        day = _parse_date(date) if date else None
+        def record(game):
+            try:
+                game.record_reading(weight, blood_pressure, day)
+            except (TypeError, ValueError) as exc:
+                raise ServiceError(400, str(exc))
+            summary = game.player.health.summary(day or game.today)
+            for info in summary.values():
+                if info['latest'] is not None:
+                    info['latest'] = {'date': info['latest'][0].isoformat(), 'value': info['latest'][1]}
+            return summary
+        return await self._run(name, record)
+
+    async def advance_day(self, name):
+        return await self._run(name, lambda game: game.advance_day())
+
+    async def report(self, name, weeks=None, months=None):
+        """The hobbit's progress report up to their game day (see shire_report)."""
+        weeks = None if weeks is None else _parse_count(weeks, 'weeks', MAX_REPORT_WEEKS)
+        months = None if months is None else _parse_count(months, 'months', MAX_REPORT_MONTHS)
+        session = await self._session(name)
+        async with session.lock: # A long history's first report is worked out off the event loop
+            return await asyncio.get_running_loop().run_in_executor(
+                None, player_report, session.game.player, session.game.today, weeks, months)
+
+    def leaderboard_top(self, board, top=10):
+        top = _parse_count(top, 'top', MAX_LEADERBOARD_ENTRIES)
+        return {'board': board, 'players': self.leaderboard.size(board),
+                'top': [_entry(*entry) for entry in self.leaderboard.top(board, top)]}
+
+    def leaderboard_rank(self, board, name, around=2):
+        around = _parse_count(around, 'around', MAX_LEADERBOARD_ENTRIES)
+        rank = self.leaderboard.rank(board, name)
+        if rank is None:
+            raise ServiceError(404, f"{name} isn't on the {board} board.")
+        return {'board': board, 'players': self.leaderboard.size(board), 'rank': rank[0], 'score': rank[1],
+                'around': [_entry(*entry) for entry in self.leaderboard.around(board, name, around)]}
+
+def _entry(rank, name, score):
+    return {'rank': rank, 'name': name, 'score': score}
+
+def _parse_count(value, name, limit):
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        raise ServiceError(400, f"'{name}' must be a whole number.")
+    return max(0, min(count, limit))
+
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ServiceError(400, "Dates must look like 2025-01-31.")
+
+# --- HTTP Layer ---
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+async def dispatch(service, method, path, body):
+    path, _, query = path.partition('?')
+    match = LEADERBOARD_ROUTE.match(path)
+    if match:
+        if method != 'GET':
+            raise ServiceError(405, "Use GET for this path.")
+        board, name = match.groups()
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        try:
+            if name is None:
+                return service.leaderboard_top(board, params.get('top', 10))
+            return service.leaderboard_rank(board, name, params.get('around', 2))
+        except KeyError as exc:
+            raise ServiceError(404, exc.args[0])
+    match = ROUTE.match(path)
+    if not match:
+        raise ServiceError(404, "No such path.")
+    name, action = match.groups()
+    if action is None and method == 'GET':
+        return await service.status(name)
+    if action == 'report':
+        if method != 'GET':
+            raise ServiceError(405, "Use GET for this path.")
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        return await service.report(name, params.get('weeks'), params.get('months'))
+    if method != 'POST':
+        raise ServiceError(405, "Use POST for this path.")
+    if action is None:
+        return await service.create_player(name, body)
+    if action == 'deeds':
+        return await service.log_deeds(name, body.get('deeds'), body.get('date'))
+    if action == 'favors':
+        return await service.accept_offer(name, body.get('character'), body.get('offer'))
+    if action == 'readings':
+        return await service.record_reading(name, body.get('weight'), body.get('blood_pressure'), body.get('date'))
+    return await service.advance_day(name)
+
+async def handle_connection(service, reader, writer):
+    """Serves HTTP/1.1 requests on one connection, keeping it open between requests."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            try:
+                method, path, version = request_line.decode('latin-1').split()
+            except ValueError:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+            status, payload = 200, None
+            length = int(headers.get('content-length', 0) or 0)
+            if length > MAX_BODY_BYTES:
+                status, payload = 413, {'error': "Request body too large."}
+                raw = b''
+            else:
+                raw = await reader.readexactly(length) if length else b''
+            if payload is None:
+                try:
+                    body = json.loads(raw) if raw else {}
+                    if not isinstance(body, dict):
+                        raise ServiceError(400, "The request body must be a JSON object.")
+                    payload = await dispatch(service, method.upper(), path, body)
+                except ServiceError as exc:
+                    status, payload = exc.status, {'error': exc.message}
+                except ValueError:
+                    status, payload = 400, {'error': "The request body isn't valid JSON."}
+                except Exception as exc: # Keep serving other requests
+                    status, payload = 500, {'error': f"{type(exc).__name__}: {exc}"}
+
+            data = json.dumps(payload).encode()
+            keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+            if not keep_alive or length > MAX_BODY_BYTES:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def start_server(service, host='127.0.0.1', port=DEFAULT_PORT):
+    return await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+
+# --- Local Client ---
+class ShireClient:
+    """Minimal keep-alive JSON client for talking to the service, e.g. from tests or scripts."""
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None):
+        """Returns (status, payload)."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b''
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            if key.strip().lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.reader = self.writer = None
+
+async def save_leaderboard_periodically(leaderboard, path, interval=LEADERBOARD_SAVE_SECONDS):
+    """Writes the leaderboard to `path` every `interval` seconds if it changed."""
+    saved = leaderboard.changes
+    while True:
+        await asyncio.sleep(interval)
+        if leaderboard.changes != saved:
+            saved = leaderboard.changes
+            await asyncio.get_running_loop().run_in_executor(None, leaderboard.save, path)
+
+async def serve_forever(data_dir, host, port, db_path=None):
+    database = None
+    if db_path:
+        from shire_sqlite import SQLiteDatabase
+        database = SQLiteDatabase(db_path)
+        leaderboard_file = os.path.splitext(db_path)[0] + '.' + LEADERBOARD_FILE
+    else:
+        os.makedirs(data_dir, exist_ok=True)
+        leaderboard_file = os.path.join(data_dir, LEADERBOARD_FILE)
+    leaderboard = Leaderboard.load(leaderboard_file)
+    server = await start_server(ShireService(data_dir, database=database, leaderboard=leaderboard), host, port)
+    print(f"Shire service listening on http://{host}:{port} (saves in {db_path or data_dir})")
+    saver = asyncio.create_task(save_leaderboard_periodically(leaderboard, leaderboard_file))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        saver.cancel()
+        leaderboard.save(leaderboard_file)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve many hobbits' Shire Health Quests over local HTTP.")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--db", help="Save every hobbit in this SQLite database instead of --data-dir.")
+    args = parser.parse_args()
+    profile_from_environment()
+    try:
+        asyncio.run(serve_forever(args.data_dir, args.host, args.port, args.db))
+    except KeyboardInterrupt:
+        pass
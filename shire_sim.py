@@ -0,0 +1,211 @@
+"""Headless batch simulation of many synthetic hobbits, for balancing deed points,
+Shire Status thresholds, character rewards and weekly bounties without playing through
+the menus.
+
+Run it directly for a quick report:
+    python shire_sim.py --players 10000 --days 365
+
+To try out other numbers, copy shire_content.json, edit it and point SHIRE_CONTENT at it:
+    SHIRE_CONTENT=balance.json python shire_sim.py
+"""
+import argparse
+import datetime
+import json
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+from shire_quest import (
+    CONTENT, DAILY_DEED_POINTS, DaProvider, DaStruggler, QuestEvaluator, REX, Player,
+    check_quests, claim_bounties
+)
+
+# --- Behaviour Policies ---
+class BehaviourPolicy:
+    """How a synthetic hobbit behaves from day to day.
+
+    deed_probability is the starting chance of doing each scored deed on a given day;
+    per_deed overrides it for individual deeds (and can add unscored ones, like avoiding
+    snacks, that characters check for). Adherence decays by adherence_decay per day but
+    never drops below adherence_floor of the starting chance. favor_uptake is the daily
+    chance of taking up an offer from a character who has nothing active with the player.
+    """
+    def __init__(self, deed_probability=0.6, per_deed=None, adherence_decay=0.0,
+                 adherence_floor=0.25, favor_uptake=0.3):
+        self.deed_probability = deed_probability
+        self.per_deed = {"Avoid Unplanned Unhealthy Snacks": 0.5}
+        self.per_deed.update(per_deed or {})
+        self.adherence_decay = adherence_decay
+        self.adherence_floor = adherence_floor
+        self.favor_uptake = favor_uptake
+        self.deeds = list(DAILY_DEED_POINTS) + [d for d in self.per_deed if d not in DAILY_DEED_POINTS]
+
+    def adherence(self, day_index):
+        return max(self.adherence_floor, (1.0 - self.adherence_decay) ** day_index)
+
+    def deeds_for_day(self, rng, day_index):
+        adherence = self.adherence(day_index)
+        return [deed for deed in self.deeds
+                if rng.random() < self.per_deed.get(deed, self.deed_probability) * adherence]
+
+    def wants_favor(self, rng):
+        return rng.random() < self.favor_uptake
+
+# --- Simulation ---
+def simulate_player(policy, days, start_date, seed):
+    """Plays one hobbit through `days` days. Returns (shire_pennies, hobbit_points,
+    {status: first day index reached}, {offer: [accepted, completed]}, {bounty: claims})."""
+    rng = random.Random(seed)
+    player = Player(f"Sim Hobbit {seed}") # Players report to the null sink unless a Game hooks them up
+    characters = (DaProvider(), DaStruggler(), REX())
+    quests = QuestEvaluator()
+    thresholds = tuple(zip(CONTENT.status_thresholds, CONTENT.status_names))
+    status_days = {thresholds[0][1]: 0}
+    favors = {}
+    bounties = {}
+
+    for day_index in range(days):
+        today = start_date + datetime.timedelta(days=day_index)
+        ordinal = today.toordinal() # The deed path takes ordinals as they are
+
+        for character in characters:
+            if character.name not in player.current_favors and policy.wants_favor(rng):
+                offer_name = rng.choice(list(character.offers))
+                character.present_offer(player, offer_name, today)
+                favors.setdefault(offer_name, [0, 0])[0] += 1
+
+        earned = 0
+        for deed_name in policy.deeds_for_day(rng, day_index):
+            if player.log_deed(ordinal, deed_name):
+                earned += DAILY_DEED_POINTS.get(deed_name, 0)
+        if earned:
+            player.add_sp(earned)
+            for bounty_name in claim_bounties(player, ordinal):
+                bounties[bounty_name] = bounties.get(bounty_name, 0) + 1
+
+        active = {c.name: player.current_favors[c.name][c.offer_key] for c in characters if c.name in player.current_favors}
+        for character in check_quests(player, characters, ordinal, quests):
+            favors[active[character.name]][1] += 1
+
+        for threshold, status in thresholds:
+            if status not in status_days and player.hobbit_points >= threshold:
+                status_days[status] = day_index
+
+    return player.shire_pennies, player.hobbit_points, status_days, favors, bounties
+
+def _simulate_batch(args):
+    policy, days, start_date, seeds = args
+    results = []
+    for seed in seeds:
+        results.append(simulate_player(policy, days, start_date, seed))
+    return results
+
+def _percentiles(values):
+    if not values:
+        return None
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {
+        "min": values[0], "p10": pick(0.10), "p50": pick(0.50), "p90": pick(0.90),
+        "max": values[-1], "mean": round(statistics.fmean(values), 2)
+    }
+
+def simulate(players=1000, days=365, policy=None, start_date=None, seed=0, workers=None, batch_size=250):
+    """Simulates `players` hobbits for `days` days each, spread over a process pool.
+
+    Returns aggregate statistics: SP and HP distributions, how many players reached each
+    Shire Status and how quickly, and accept/complete counts for every character offer.
+    Pass workers=1 to run everything in this process.
+    """
+    policy = policy or BehaviourPolicy()
+    start_date = start_date or datetime.date.today()
+    seeds = range(seed, seed + players)
+    batches = [(policy, days, start_date, seeds[i:i + batch_size]) for i in range(0, players, batch_size)]
+
+    if workers == 1:
+        results = map(_simulate_batch, batches)
+        return _aggregate(results, players, days)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _aggregate(pool.map(_simulate_batch, batches), players, days)
+
+def _aggregate(batch_results, players, days):
+    sp_values, hp_values = [], []
+    status_days = {status: [] for status in CONTENT.status_names}
+    favors = {}
+    bounties = {}
+    for batch in batch_results:
+        for sp, hp, reached, player_favors, player_bounties in batch:
+            sp_values.append(sp)
+            hp_values.append(hp)
+            for status, day_index in reached.items():
+                status_days[status].append(day_index)
+            for offer_name, (accepted, completed) in player_favors.items():
+                totals = favors.setdefault(offer_name, [0, 0])
+                totals[0] += accepted
+                totals[1] += completed
+            for bounty_name, claims in player_bounties.items():
+                bounties[bounty_name] = bounties.get(bounty_name, 0) + claims
+
+    return {
+        "players": players,
+        "days": days,
+        "shire_pennies": _percentiles(sp_values),
+        "hobbit_points": _percentiles(hp_values),
+        "shire_status": {
+            status: {
+                "reached": len(reached),
+                "reached_rate": round(len(reached) / players, 4) if players else 0.0,
+                "days_to_reach": _percentiles(reached)
+            } for status, reached in status_days.items()
+        },
+        "favors": {
+            offer_name: {
+                "accepted": accepted,
+                "completed": completed,
+                "completion_rate": round(completed / accepted, 4) if accepted else 0.0
+            } for offer_name, (accepted, completed) in sorted(favors.items())
+        },
+        "bounties": {
+            bounty_name: {
+                "claims": claims,
+                "claims_per_player_week": round(claims / (players * days / 7), 4) if players and days else 0.0
+            } for bounty_name, claims in sorted(bounties.items())
+        }
+    }
+
+def print_report(report):
+    print(f"\n--- Simulated {report['players']} hobbits over {report['days']} days ---")
+    for label, key in (("Shire Pennies", "shire_pennies"), ("Hobbit-Points", "hobbit_points")):
+        dist = report[key]
+        print(f"{label}: mean {dist['mean']}, p10 {dist['p10']}, median {dist['p50']}, p90 {dist['p90']}")
+    print("\n** Shire Status **")
+    for status, info in report["shire_status"].items():
+        timing = info["days_to_reach"]
+        when = f"median day {timing['p50']}" if timing else "never reached"
+        print(f"  {status}: {info['reached_rate']:.1%} of hobbits, {when}")
+    print("\n** Character Offers **")
+    for offer_name, info in report["favors"].items():
+        print(f"  {offer_name}: {info['completed']}/{info['accepted']} completed ({info['completion_rate']:.1%})")
+    print("\n** Weekly Bounties **")
+    for bounty_name, info in report["bounties"].items():
+        print(f"  {bounty_name}: claimed in {info['claims_per_player_week']:.1%} of hobbit-weeks")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate many hobbits to balance the Shire's Health Quest.")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--deed-probability", type=float, default=0.6)
+    parser.add_argument("--adherence-decay", type=float, default=0.0)
+    parser.add_argument("--favor-uptake", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the raw report as JSON.")
+    args = parser.parse_args()
+
+    sim_policy = BehaviourPolicy(args.deed_probability, adherence_decay=args.adherence_decay,
+                                 favor_uptake=args.favor_uptake)
+    sim_report = simulate(args.players, args.days, sim_policy, seed=args.seed, workers=args.workers)
+    if args.json:
+        print(json.dumps(sim_report, indent=4))
+    else:
+        print_report(sim_report)
@@ -0,0 +1,293 @@
+"""Optional SQLite save backend: many hobbits in one database, saved a few rows at a time.
+
+Players, per-day deeds, active favors, achievements, weekly bounty claims and health
+readings live in normalized tables, so queries such as "the last 30 days of deeds"
+read only the rows they need. Every Game.save_game turns the player's pending journal
+records into one transaction.
+
+    game = Game(store=SQLiteSaveStore(SQLiteDatabase('shire.db'), 'Bilbo'))
+
+Move an existing save (binary or JSON) into a database with:
+    python shire_sqlite.py shire_health_quest_save.dat --db shire.db
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import queue
+import sqlite3
+
+from shire_quest import DeedHistory, Player, SaveJournal, journal_day
+
+# --- Configuration ---
+DEFAULT_DATABASE = 'shire_health_quest.db'
+POOL_SIZE = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    weight REAL NOT NULL DEFAULT 0.0,
+    blood_pressure TEXT NOT NULL DEFAULT '0/0',
+    eating_habits TEXT NOT NULL DEFAULT '',
+    shire_pennies INTEGER NOT NULL DEFAULT 0,
+    hobbit_points INTEGER NOT NULL DEFAULT 0,
+    game_day TEXT
+);
+CREATE TABLE IF NOT EXISTS deeds (
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    day TEXT NOT NULL,
+    deed TEXT NOT NULL,
+    PRIMARY KEY (player_id, day, deed)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS favors (
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    character TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (player_id, character)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS achievements (
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    seq INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    day TEXT,
+    PRIMARY KEY (player_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bounty_claims (
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    week TEXT NOT NULL,
+    bounty TEXT NOT NULL,
+    PRIMARY KEY (player_id, week, bounty)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS readings (
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    day TEXT NOT NULL,
+    weight REAL,
+    systolic INTEGER,
+    diastolic INTEGER
+);
+CREATE INDEX IF NOT EXISTS readings_by_day ON readings (player_id, day);
+"""
+# The deeds primary key doubles as the (player, date) index for range queries.
+
+# --- Connection Pool ---
+class SQLiteDatabase:
+    """A small pool of connections to one database file, shareable across threads."""
+    def __init__(self, path=DEFAULT_DATABASE, pool_size=POOL_SIZE):
+        self.path = path
+        self.pool = queue.Queue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self.pool.put(conn)
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+            if 'day' not in {row[1] for row in conn.execute("PRAGMA table_info(achievements)")}:
+                conn.execute("ALTER TABLE achievements ADD COLUMN day TEXT") # Databases from before unlock days
+            if 'game_day' not in {row[1] for row in conn.execute("PRAGMA table_info(players)")}:
+                conn.execute("ALTER TABLE players ADD COLUMN game_day TEXT") # Databases from before saved game days
+
+    @contextlib.contextmanager
+    def connection(self):
+        conn = self.pool.get()
+        try:
+            yield conn
+        finally:
+            self.pool.put(conn)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """A pooled connection inside BEGIN ... COMMIT (rolled back on error)."""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        while not self.pool.empty():
+            self.pool.get().close()
+
+    # --- Queries ---
+    def player_id(self, conn, name):
+        row = conn.execute("SELECT id FROM players WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def player_names(self):
+        with self.connection() as conn:
+            return [row[0] for row in conn.execute("SELECT name FROM players ORDER BY name")]
+
+    def deeds_between(self, name, start, end):
+        """{iso_date: [deed, ...]} for days from start to end inclusive, read straight off the index."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT d.day, d.deed FROM deeds d JOIN players p ON p.id = d.player_id "
+                "WHERE p.name = ? AND d.day BETWEEN ? AND ? ORDER BY d.day",
+                (name, str(start), str(end)))
+            days = {}
+            for day, deed in rows:
+                days.setdefault(day, []).append(deed)
+            return days
+
+    def recent_deeds(self, name, days=30, today=None):
+        today = today or datetime.date.today()
+        return self.deeds_between(name, today - datetime.timedelta(days=days - 1), today)
+
+    def load_player(self, name, since=None):
+        """Builds a Player from the database, or returns None. With `since`, only deeds from that
+        date on are read, which is all the favor and streak checks need for a quick session."""
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT id, name, weight, blood_pressure, eating_habits, shire_pennies, hobbit_points, game_day "
+                "FROM players WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return None
+            player_id = row[0]
+            player = Player(row[1])
+            (player.weight, player.blood_pressure, player.eating_habits,
+             player.shire_pennies, player.hobbit_points) = row[2:7]
+            player.game_day = journal_day(row[7]) if row[7] else 0
+            player.set_unlocks(conn.execute(
+                "SELECT name, day FROM achievements WHERE player_id = ? ORDER BY seq", (player_id,)).fetchall())
+            player.current_favors = {r[0]: json.loads(r[1]) for r in conn.execute(
+                "SELECT character, data FROM favors WHERE player_id = ?", (player_id,))}
+            for week, bounty in conn.execute(
+                    "SELECT week, bounty FROM bounty_claims WHERE player_id = ? ORDER BY week", (player_id,)):
+                player.claim_bounty(week, bounty)
+            history = DeedHistory()
+            rows = conn.execute(
+                "SELECT day, deed FROM deeds WHERE player_id = ? AND day >= ? ORDER BY day",
+                (player_id, str(since) if since else ''))
+            for day, deed in rows:
+                history.add(day, deed)
+            player.use_history(history)
+            readings = conn.execute(
+                "SELECT day, weight, systolic, diastolic FROM readings WHERE player_id = ? ORDER BY day, rowid",
+                (player_id,)).fetchall()
+            player.health.weight.extend((day, weight) for day, weight, _, _ in readings if weight is not None)
+            player.health.systolic.extend((day, sys) for day, _, sys, _ in readings if sys is not None)
+            player.health.diastolic.extend((day, dia) for day, _, _, dia in readings if dia is not None)
+            player.refresh_latest_reading()
+            return player
+
+    def write_player(self, conn, player, since=None):
+        """Replaces everything stored for `player` with its current state. With `since`, the
+        player was loaded with only the deeds from that date on (see load_player), so older
+        deed rows are kept and any older days the player holds are merged into them."""
+        conn.execute(
+            "INSERT INTO players (name, weight, blood_pressure, eating_habits, shire_pennies, hobbit_points, game_day) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(name) DO UPDATE SET weight = excluded.weight, "
+            "blood_pressure = excluded.blood_pressure, eating_habits = excluded.eating_habits, "
+            "shire_pennies = excluded.shire_pennies, hobbit_points = excluded.hobbit_points, "
+            "game_day = excluded.game_day",
+            (player.name, player.weight, player.blood_pressure, player.eating_habits,
+             player.shire_pennies, player.hobbit_points, _iso_day(player.game_day) if player.game_day else None))
+        player_id = self.player_id(conn, player.name)
+        for table in ('favors', 'achievements', 'bounty_claims', 'readings'):
+            conn.execute(f"DELETE FROM {table} WHERE player_id = ?", (player_id,))
+        conn.execute("DELETE FROM deeds WHERE player_id = ? AND day >= ?", (player_id, str(since) if since else ''))
+        conn.executemany("INSERT OR IGNORE INTO deeds VALUES (?, ?, ?)", (
+            (player_id, day, deed)
+            for day, deeds in player.daily_deeds_completed.to_dict().items() for deed in deeds))
+        conn.executemany("INSERT INTO favors VALUES (?, ?, ?)", (
+            (player_id, char_name, json.dumps(data)) for char_name, data in player.current_favors.items()))
+        conn.executemany("INSERT INTO achievements VALUES (?, ?, ?, ?)", (
+            (player_id, seq, name, day and day.isoformat()) for seq, (name, day) in enumerate(player.unlock_records())))
+        conn.executemany("INSERT INTO bounty_claims VALUES (?, ?, ?)", (
+            (player_id, week, bounty) for week, bounties in player.bounty_claims.items() for bounty in bounties))
+        health = player.health
+        readings = [(day, value, None, None) for day, value in zip(health.weight.days, health.weight.values)]
+        readings += [(day, None, sys, dia) for day, sys, dia in
+                     zip(health.systolic.days, health.systolic.values, health.diastolic.values)]
+        conn.executemany("INSERT INTO readings VALUES (?, ?, ?, ?, ?)", (
+            (player_id, datetime.date.fromordinal(day).isoformat(), weight, sys, dia)
+            for day, weight, sys, dia in sorted(readings, key=lambda r: r[0])))
+        return player_id
+
+    def apply_records(self, conn, player_id, records):
+        """Applies journal records (see Player.apply_record) as row-level changes."""
+        for record in records:
+            op = record[0]
+            if op == 'sp':
+                conn.execute("UPDATE players SET shire_pennies = shire_pennies + ? WHERE id = ?", (record[1], player_id))
+            elif op == 'hp':
+                conn.execute("UPDATE players SET hobbit_points = hobbit_points + ? WHERE id = ?", (record[1], player_id))
+            elif op == 'ach':
+                conn.execute(
+                    "INSERT OR IGNORE INTO achievements SELECT ?, COALESCE(MAX(seq) + 1, 0), ?, ? "
+                    "FROM achievements WHERE player_id = ?",
+                    (player_id, record[1], record[2] if len(record) > 2 else None, player_id))
+            elif op == 'deed':
+                conn.execute("INSERT OR IGNORE INTO deeds VALUES (?, ?, ?)", (player_id, _iso_day(record[1]), record[2]))
+            elif op == 'favor':
+                conn.execute("INSERT OR REPLACE INTO favors VALUES (?, ?, ?)", (player_id, record[1], json.dumps(record[2])))
+            elif op == 'unfavor':
+                conn.execute("DELETE FROM favors WHERE player_id = ? AND character = ?", (player_id, record[1]))
+            elif op == 'reading':
+                conn.execute("INSERT INTO readings VALUES (?, ?, ?, ?, ?)", (player_id, _iso_day(record[1]), *record[2:5]))
+            elif op == 'bounty':
+                conn.execute("INSERT OR IGNORE INTO bounty_claims VALUES (?, ?, ?)", (player_id, record[1], record[2]))
+            elif op == 'day':
+                conn.execute("UPDATE players SET game_day = ? WHERE id = ?", (_iso_day(record[1]), player_id))
+            # 'reset' records from older journals are skipped, as in Player.apply_record
+
+def _iso_day(value):
+    """A journal record's day as the ISO date the tables store."""
+    return datetime.date.fromordinal(journal_day(value)).isoformat()
+
+# --- Save Store ---
+class SQLiteSaveStore:
+    """Game save store (same interface as SaveJournal) that keeps one hobbit in a shared database."""
+    def __init__(self, database, player_name, since=None):
+        self.database = database
+        self.player_name = player_name
+        self.since = since # Only load deeds from this date on (None loads everything); older rows are kept on save
+        self.pending = [] # Records not yet written; shared with Player.journal
+        self.player_id = None
+
+    def load(self):
+        return self.database.load_player(self.player_name, self.since)
+
+    def save(self, player):
+        if not self.pending and self.player_id is not None:
+            return
+        with self.database.transaction() as conn:
+            player_id = self.database.player_id(conn, player.name)
+            if player_id is None: # First save of a new hobbit
+                self.player_id = self.database.write_player(conn, player, self.since)
+            else:
+                self.player_id = player_id
+                self.database.apply_records(conn, player_id, self.pending)
+        self.player_name = player.name
+        self.pending.clear()
+
+    def compact(self, player):
+        with self.database.transaction() as conn:
+            self.player_id = self.database.write_player(conn, player, self.since)
+        self.player_name = player.name
+        self.pending.clear()
+
+    def flush(self):
+        pass # Every save is committed before it returns
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy saves (snapshot + journal) into a SQLite database.")
+    parser.add_argument("save_files", nargs='+', help="Snapshot files; a matching .journal beside each is replayed too.")
+    parser.add_argument("--db", default=DEFAULT_DATABASE)
+    args = parser.parse_args()
+
+    db = SQLiteDatabase(args.db)
+    for save_file in args.save_files:
+        journal_file = save_file.rsplit('.', 1)[0] + '.journal'
+        imported = SaveJournal(save_file, journal_file).load()
+        if imported is None:
+            print(f"Skipping {save_file}: no save found.")
+            continue
+        SQLiteSaveStore(db, imported.name).compact(imported)
+        print(f"Imported {imported.name} from {save_file}.")
+    db.close()
@@ -0,0 +1,27 @@
+import shire_bench
+from shire_bench import build_player, compare, format_seconds, measure_memory, run_benchmarks
+
+def test_synthetic_player_has_the_requested_history():
+    player = build_player(100)
+    assert len(player.daily_deeds_completed.masks) == 100
+    assert len(player.current_favors) == 3
+
+def test_every_case_runs(monkeypatch):
+    monkeypatch.setattr(shire_bench, 'MIN_RUN_SECONDS', 0.001)
+    results = run_benchmarks(sizes=(10,))
+    assert set(results) == {name for name, _ in shire_bench.CASES}
+    assert all(by_size['10'] > 0 for by_size in results.values())
+
+def test_compare_flags_cases_slower_than_the_tolerance(capsys):
+    baseline = {"Case": {"10": 1.0, "100": 1.0}}
+    results = {"Case": {"10": 1.1, "100": 1.5}, "New case": {"10": 2.0}}
+    assert compare(results, baseline, tolerance=0.25) == [("Case", "100", 0.5)]
+    assert "new" in capsys.readouterr().out
+
+def test_memory_is_measured_per_profile():
+    assert 0 < measure_memory(sample=5, days=30) < 1 << 20
+
+def test_format_seconds_picks_a_unit():
+    assert format_seconds(2.5) == "2.50 s"
+    assert format_seconds(0.0025) == "2.50 ms"
+    assert format_seconds(2.5e-9) == "2 ns"
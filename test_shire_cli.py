@@ -0,0 +1,84 @@
+import datetime
+import json
+import os
+
+import pytest
+
+import shire_cli
+from shire_quest import SaveJournal
+
+DAY = datetime.date(2025, 1, 6)
+
+@pytest.fixture
+def cli(tmp_path):
+    """Runs shire_cli.main on a save in tmp_path and returns its exit status."""
+    def run(*argv):
+        return shire_cli.main(["--save-file", str(tmp_path / 'save.dat'),
+                               "--journal-file", str(tmp_path / 'save.journal'), *argv])
+    return run
+
+def load(tmp_path):
+    return SaveJournal(str(tmp_path / 'save.dat'), str(tmp_path / 'save.journal')).load()
+
+def test_start_and_log_are_saved(cli, tmp_path):
+    assert cli("start", "Sam", "--weight", "180", "--date", DAY.isoformat()) == 0
+    assert cli("log", "water", "fruit", "--date", DAY.isoformat()) == 0
+    player = load(tmp_path)
+    assert player.name == "Sam"
+    assert player.daily_deeds_completed.deeds_on(DAY) == ["Water from the Well", "Fruit Orchard Harvest"]
+
+def pinned_game(day):
+    """Game, but with the real date pinned to `day`."""
+    class PinnedGame(shire_cli.Game):
+        def __init__(self, *args, clock=None, **kwargs):
+            super().__init__(*args, clock=clock, **kwargs)
+            if clock is None:
+                self.clock.day = day
+    return PinnedGame
+
+def test_the_day_advanced_to_is_kept_between_commands(cli, tmp_path, monkeypatch):
+    monkeypatch.setattr(shire_cli, 'Game', pinned_game(DAY))
+    cli("start", "Sam")
+    cli("advance")
+    cli("advance")
+    cli("log", "water")
+    player = load(tmp_path)
+    assert player.game_day == (DAY + datetime.timedelta(days=2)).toordinal()
+    assert player.daily_deeds_completed.has(DAY + datetime.timedelta(days=2), "Water from the Well")
+
+def test_advancing_completes_favors_met_on_the_day_that_ends(cli, tmp_path):
+    cli("start", "Sam", "--date", DAY.isoformat())
+    cli("accept-favor", "da provider", "smoothie", "--date", DAY.isoformat())
+    for offset in range(3):
+        day = (DAY + datetime.timedelta(days=offset)).isoformat()
+        cli("log", "fruit", "vegetable", "--date", day)
+        cli("advance", "--date", day)
+    assert load(tmp_path).has_achievement("Smoothie Bar Blueprint Unlocked")
+
+def test_status_does_not_migrate_an_old_json_save(cli, tmp_path, capsys):
+    cli("start", "Sam", "--date", DAY.isoformat())
+    data = load(tmp_path).to_dict()
+    for name in ('save.dat', 'save.journal'):
+        os.remove(tmp_path / name)
+    (tmp_path / 'save.json').write_text(json.dumps(data))
+    capsys.readouterr()
+    assert cli("status", "--json", "--date", DAY.isoformat()) == 0
+    assert json.loads(capsys.readouterr().out)['name'] == "Sam"
+    assert sorted(os.listdir(tmp_path)) == ['save.json']
+
+def test_quiet_commands_print_nothing(cli, capsys):
+    cli("start", "Sam", "--quiet", "--date", DAY.isoformat())
+    cli("log", "water", "--quiet", "--date", DAY.isoformat())
+    assert capsys.readouterr().out == ""
+
+def test_unknown_names_and_missing_saves_fail(cli, capsys):
+    assert cli("log", "water") == 1
+    assert "No save" in capsys.readouterr().err
+    cli("start", "Sam", "--quiet")
+    assert cli("log", "third breakfast") == 1
+    assert "Unknown deed" in capsys.readouterr().err
+
+def test_names_may_be_shortened_unless_ambiguous():
+    assert shire_cli.match_name("vEg", ["Vegetable Patch Platter", "Water from the Well"], "deed") == "Vegetable Patch Platter"
+    with pytest.raises(shire_cli.CommandError, match="Ambiguous"):
+        shire_cli.match_name("a", ["A Stroll", "An Orchard"], "deed")
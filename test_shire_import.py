@@ -0,0 +1,92 @@
+import datetime
+import json
+
+from shire_import import import_history
+from shire_quest import DAILY_DEED_POINTS, NULL_SINK, Game, SaveJournal
+
+DAY = datetime.date(2025, 1, 6)
+
+def make_game(tmp_path):
+    game = Game(save_file=str(tmp_path / 'save.dat'), journal_file=str(tmp_path / 'save.journal'),
+                load=False, events=NULL_SINK)
+    game.today = DAY
+    game.player.name = "Sam"
+    game.use_player(game.player)
+    game.save_game()
+    return game
+
+def write_csv(path, rows):
+    path.write_text("date,deed,weight,blood_pressure\n" + "".join(",".join(row) + "\n" for row in rows))
+    return str(path)
+
+def test_csv_import_merges_deeds_and_awards_their_sp(tmp_path):
+    game = make_game(tmp_path)
+    path = write_csv(tmp_path / 'export.csv', [
+        ("2025-01-01", "Water from the Well", "", ""),
+        ("2025-01-01", "water from the well", "", ""), # Same deed twice, any case
+        ("2025-01-02", "A Stroll to Bywater", "180.5", "130/85"),
+    ])
+    summary = import_history(game, path, today=DAY)
+    assert (summary['rows'], summary['deeds_added'], summary['days'], summary['skipped']) == (3, 2, 2, 0)
+    assert summary['sp_awarded'] == DAILY_DEED_POINTS["Water from the Well"] + DAILY_DEED_POINTS["A Stroll to Bywater"]
+    assert game.player.shire_pennies == summary['sp_awarded']
+    assert "First Stroll to Bywater" in summary['achievements']
+    assert game.player.weight == 180.5
+
+def test_import_is_saved_as_a_fresh_snapshot(tmp_path):
+    game = make_game(tmp_path)
+    import_history(game, write_csv(tmp_path / 'export.csv', [("2025-01-01", "Water from the Well", "", "")]))
+    loaded = SaveJournal(game.store.snapshot_file, game.store.journal_file).load()
+    assert loaded.to_dict() == game.player.to_dict()
+
+def test_jsonl_import_and_bad_rows(tmp_path):
+    game = make_game(tmp_path)
+    path = tmp_path / 'export.jsonl'
+    path.write_text("\n".join([
+        json.dumps({'date': '2025-01-01', 'deed': "Water from the Well"}),
+        "not json",
+        json.dumps({'date': '01/02/2025', 'deed': "Water from the Well"}),
+        json.dumps({'date': '2025-01-02', 'deed': "Third Breakfast"}),
+        json.dumps({'date': '2025-01-02', 'weight': 'heavy'}),
+        json.dumps({'date': '2025-01-02', 'bp': '130 over 85'}),
+    ]) + "\n")
+    summary = import_history(game, str(path), batch_size=2)
+    assert summary['deeds_added'] == 1
+    assert summary['skipped'] == 5
+    assert [message.split(':')[0] for message in summary['errors']] == [f"Line {n}" for n in range(2, 7)]
+
+def test_importing_the_same_export_twice_adds_nothing(tmp_path):
+    game = make_game(tmp_path)
+    path = write_csv(tmp_path / 'export.csv', [("2025-01-01", "Water from the Well", "180", "130/85")])
+    import_history(game, path)
+    again = import_history(game, path)
+    assert (again['deeds_added'], again['sp_awarded'], again['readings']) == (0, 0, 0)
+    assert len(game.player.health.weight) == 1
+
+def test_imported_streaks_complete_active_favors(tmp_path):
+    game = make_game(tmp_path)
+    game.accept_offer("Da Provider", "Smoothie Bar Blueprint", DAY - datetime.timedelta(days=2))
+    rows = [((DAY - datetime.timedelta(days=n)).isoformat(), deed, "", "")
+            for n in range(3) for deed in ("Fruit Orchard Harvest", "Vegetable Patch Platter")]
+    summary = import_history(game, write_csv(tmp_path / 'export.csv', rows), today=DAY)
+    assert summary['scenes'] == ["Da Provider"]
+    assert game.player.has_achievement("Smoothie Bar Blueprint Unlocked")
+
+def test_readings_repeated_on_each_row_are_taken_once_per_day(tmp_path):
+    game = make_game(tmp_path)
+    rows = [("2025-01-01", deed, "180", "130/85")
+            for deed in ("Water from the Well", "A Stroll to Bywater", "Fruit Orchard Harvest")]
+    rows.append(("2025-01-01", "", "181", "")) # A later reading the same day is a repeat too
+    summary = import_history(game, write_csv(tmp_path / 'export.csv', rows), batch_size=2)
+    assert summary['readings'] == 2 # One weight, one blood pressure
+    assert len(game.player.health.weight) == len(game.player.health.systolic) == 1
+    assert game.player.weight == 180.0
+
+def test_imported_weeks_claim_their_bounties(tmp_path):
+    game = make_game(tmp_path)
+    game.record_deeds(["Water from the Well"]) # A day already in the history isn't counted as imported
+    rows = [((DAY - datetime.timedelta(days=n)).isoformat(), "Water from the Well", "", "") for n in range(1, 15)]
+    summary = import_history(game, write_csv(tmp_path / 'export.csv', rows), today=DAY)
+    assert (summary['days'], summary['bounties']) == (14, 2) # Two whole weeks of water, Monday to Sunday
+    assert len(game.player.bounty_claims) == 2
+    assert game.player.has_achievement("The Clear Stream Challenge Completed")
@@ -0,0 +1,114 @@
+import datetime
+import random
+
+from shire_leaderboard import Leaderboard, RankedScores, current_streak
+from shire_quest import ManualClock, Player
+
+DAY = datetime.date(2025, 1, 6) # A Monday
+
+def player_on(leaderboard, name):
+    """A player whose events feed `leaderboard`."""
+    player = Player(name)
+    player.events = leaderboard.sink(player)
+    return player
+
+def log_days(player, offsets, deed_name="Water from the Well"):
+    for offset in offsets:
+        player.log_deed(DAY + datetime.timedelta(days=offset), deed_name)
+
+def test_ranked_scores_match_a_sort_after_random_updates():
+    rng = random.Random(7)
+    scores, expected = RankedScores(), {}
+    for _ in range(2000):
+        name = f"Hobbit{rng.randrange(200)}"
+        if rng.random() < 0.1:
+            scores.remove(name)
+            expected.pop(name, None)
+        else:
+            expected[name] = rng.randrange(50) # Plenty of ties
+            scores.set(name, expected[name])
+    ranked = sorted(expected.items(), key=lambda item: (-item[1], item[0]))
+    assert len(scores) == len(ranked)
+    assert [scores.at(index) for index in range(len(scores))] == ranked
+    assert all(scores.rank(name) == rank for rank, (name, _) in enumerate(ranked, 1))
+    assert scores.entries(10, 5) == [(rank, name, score) for rank, (name, score) in enumerate(ranked, 1)][10:15]
+
+def test_ranked_scores_edges():
+    scores = RankedScores()
+    assert scores.rank("Sam") is None
+    assert scores.entries(0, 3) == []
+    scores.set("Sam", 5)
+    assert scores.entries(0, 0) == scores.entries(1, 3) == []
+    scores.remove("Frodo") # Not on the board: nothing to do
+
+def test_boards_follow_sp_and_hp_events():
+    leaderboard = Leaderboard(ManualClock(DAY))
+    sam, frodo = player_on(leaderboard, "Sam"), player_on(leaderboard, "Frodo")
+    sam.add_sp(10)
+    frodo.add_sp(25)
+    sam.add_hp(5)
+    assert leaderboard.top('shire_pennies') == [(1, "Frodo", 25), (2, "Sam", 10)]
+    assert leaderboard.rank('hobbit_points', "Sam") == (1, 5)
+    assert leaderboard.around('shire_pennies', "Sam", radius=1) == [(1, "Frodo", 25), (2, "Sam", 10)]
+    assert leaderboard.rank('hobbit_points', "Frodo") is None
+
+def test_weekly_board_starts_empty_each_week():
+    clock = ManualClock(DAY)
+    leaderboard = Leaderboard(clock)
+    sam = player_on(leaderboard, "Sam")
+    sam.add_sp(10)
+    clock.advance(6) # Sunday, still the same ISO week
+    sam.add_sp(5)
+    assert leaderboard.rank('weekly_sp', "Sam") == (1, 15)
+    clock.advance()
+    assert leaderboard.size('weekly_sp') == 0
+    assert leaderboard.rank('shire_pennies', "Sam") == (1, 15) # Totals don't roll over
+
+def test_weekly_sp_counts_only_deeds_logged_this_week():
+    leaderboard = Leaderboard(ManualClock(DAY + datetime.timedelta(days=7)))
+    sam = player_on(leaderboard, "Sam")
+    log_days(sam, [6]) # Back-filling last Sunday, as record_deeds does: the deed, then its SP
+    sam.add_sp(5)
+    assert leaderboard.size('weekly_sp') == 0
+    log_days(sam, [7])
+    sam.add_sp(5)
+    assert leaderboard.rank('weekly_sp', "Sam") == (1, 5)
+    assert leaderboard.rank('shire_pennies', "Sam") == (1, 10)
+
+def test_streaks_grow_recount_and_drop_off():
+    clock = ManualClock(DAY + datetime.timedelta(days=3))
+    leaderboard = Leaderboard(clock)
+    sam = player_on(leaderboard, "Sam")
+    log_days(sam, [0, 1, 3])
+    assert leaderboard.rank('streak', "Sam") == (1, 1)
+    log_days(sam, [2]) # Back-filling joins the runs
+    assert leaderboard.rank('streak', "Sam") == (1, 4)
+    clock.advance() # A streak continued yesterday still counts
+    assert leaderboard.size('streak') == 1
+    clock.advance()
+    assert leaderboard.size('streak') == 0
+
+def test_track_and_forget():
+    leaderboard = Leaderboard(ManualClock(DAY + datetime.timedelta(days=2)))
+    sam = Player("Sam")
+    log_days(sam, range(3))
+    sam.shire_pennies = 40
+    leaderboard.track(sam)
+    assert current_streak(sam.daily_deeds_completed) == (3, (DAY + datetime.timedelta(days=2)).toordinal())
+    assert leaderboard.rank('streak', "Sam") == (1, 3)
+    assert leaderboard.rank('shire_pennies', "Sam") == (1, 40)
+    leaderboard.forget("Sam")
+    assert all(leaderboard.size(board) == 0 for board in leaderboard.boards)
+
+def test_save_and_load_round_trip(tmp_path):
+    clock = ManualClock(DAY)
+    leaderboard = Leaderboard(clock)
+    sam = player_on(leaderboard, "Sam")
+    sam.add_sp(10)
+    log_days(sam, [0])
+    path = str(tmp_path / 'leaderboard.json')
+    leaderboard.save(path)
+    loaded = Leaderboard.load(path, clock)
+    assert loaded.to_dict() == leaderboard.to_dict()
+    assert loaded.top('streak') == [(1, "Sam", 1)]
+    assert Leaderboard.load(str(tmp_path / 'missing.json'), clock).size('shire_pennies') == 0
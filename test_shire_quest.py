@@ -0,0 +1,787 @@
+import datetime
+import io
+import json
+import mmap
+import random
+from array import array
+
+import pytest
+
+import shire_quest
+from shire_quest import (
+    CONTENT, NULL_SINK, Achievement, AchievementCatalog, AchievementUnlocked, ActionLog, CallStats, ContentError,
+    DeedHistory, DeedLogged, Game, JsonlSink, ManualClock, MultiSink, Narration, Player, Profiler, QuestEvaluator,
+    QuestRule, Replay, SaveJournal, ShireCalendar, SPGained, StreakIndex, TerminalRenderer, TimeSeries, WeeklyTally,
+    compile_content, decode_snapshot, deed_mask, encode_snapshot, iso_week, load_content, parse_blood_pressure
+)
+
+DAY = datetime.date(2025, 1, 6)
+
+def make_game(tmp_path, **kwargs):
+    game = Game(save_file=str(tmp_path / 'save.dat'), journal_file=str(tmp_path / 'save.journal'),
+                load=False, events=NULL_SINK, **kwargs)
+    game.today = DAY
+    game.player.name = "Sam"
+    game.use_player(game.player)
+    return game
+
+def reload(game):
+    return SaveJournal(game.store.snapshot_file, game.store.journal_file).load()
+
+# --- Save Journal ---
+def test_journal_round_trip(tmp_path):
+    game = make_game(tmp_path)
+    game.save_game() # First save is a full snapshot
+    game.record_deeds(["Water from the Well", "Fruit Orchard Harvest"])
+    game.record_reading(180.5, "130/85")
+    game.player.add_hp(40)
+    game.save_game()
+    assert reload(game).to_dict() == game.player.to_dict()
+
+def test_journal_appends_between_snapshots(tmp_path):
+    game = make_game(tmp_path)
+    game.save_game()
+    snapshot = (tmp_path / 'save.dat').read_bytes()
+    game.record_deeds(["Water from the Well"])
+    game.save_game()
+    assert (tmp_path / 'save.dat').read_bytes() == snapshot
+    assert len((tmp_path / 'save.journal').read_text().splitlines()) > 1
+
+def test_journal_compacts_into_snapshot(tmp_path):
+    game = make_game(tmp_path)
+    game.store.compact_every = 3
+    game.save_game()
+    for offset in range(5):
+        game.record_deeds(["Water from the Well"], DAY + datetime.timedelta(days=offset))
+        game.save_game()
+    assert game.store.generation > 1
+    assert reload(game).to_dict() == game.player.to_dict()
+
+@pytest.mark.parametrize('day', [DAY + datetime.timedelta(days=1), '2025-01-07', DAY.toordinal() + 1])
+def test_journal_days_replay_whatever_form_they_were_given_in(tmp_path, day):
+    game = make_game(tmp_path)
+    game.save_game()
+    game.player.log_deed(day, "Water from the Well")
+    game.player.record_reading(day, 179.0)
+    game.save_game()
+    records = [json.loads(line) for line in (tmp_path / 'save.journal').read_text().splitlines()[1:]]
+    assert [r[1] for r in records if r[0] in ('deed', 'reading')] == [DAY.toordinal() + 1] * 2
+    loaded = reload(game)
+    assert loaded.daily_deeds_completed.deeds_on('2025-01-07') == ["Water from the Well"]
+    assert loaded.health.weight.latest() == (datetime.date(2025, 1, 7), 179.0)
+
+def test_journal_from_older_versions_still_replays(tmp_path):
+    game = make_game(tmp_path)
+    game.save_game()
+    with open(tmp_path / 'save.journal', 'a') as f:
+        f.write(json.dumps(['deed', '2025-01-06', "Water from the Well"]) + '\n')
+        f.write(json.dumps(['deed', str(DAY.toordinal() + 1), "Water from the Well"]) + '\n')
+        f.write(json.dumps(['reading', '2025-01-07', 181.0, None, None]) + '\n')
+    loaded = reload(game)
+    assert loaded.daily_deeds_completed.days_matching(deed_mask("Water from the Well")) == [DAY, DAY + datetime.timedelta(days=1)]
+    assert loaded.weight == 181.0
+
+def test_torn_journal_line_is_ignored(tmp_path):
+    game = make_game(tmp_path)
+    game.save_game()
+    game.record_deeds(["Water from the Well"])
+    game.save_game()
+    with open(tmp_path / 'save.journal', 'a') as f:
+        f.write('["sp", 1')
+    assert reload(game).to_dict() == game.player.to_dict()
+
+def test_stale_journal_generation_is_not_replayed(tmp_path):
+    game = make_game(tmp_path)
+    game.save_game()
+    game.player.add_sp(10)
+    game.save_game()
+    stale = (tmp_path / 'save.journal').read_text()
+    game.store.compact(game.player)
+    (tmp_path / 'save.journal').write_text(stale) # As if a crash came between snapshot and journal reset
+    assert reload(game).shire_pennies == 10
+
+def test_days_must_be_dates_strings_or_ordinals():
+    with pytest.raises(TypeError):
+        Player().log_deed(2025.5, "Water from the Well")
+
+# --- Deed History ---
+def test_history_marks_deeds_per_day():
+    history = DeedHistory()
+    assert history.add(DAY, "Water from the Well")
+    assert not history.add('2025-01-06', "Water from the Well")
+    history.add(DAY.toordinal() + 2, "Fruit Orchard Harvest")
+    assert history.has(DAY, "Water from the Well")
+    assert not history.has(DAY, "Fruit Orchard Harvest")
+    assert history.deeds_on(DAY + datetime.timedelta(days=1)) == []
+    assert len(history) == 2
+
+def test_history_back_fills_days_before_the_first():
+    history = DeedHistory()
+    history.add(DAY, "Water from the Well")
+    history.add(DAY - datetime.timedelta(days=3), "Water from the Well")
+    assert history.start == DAY.toordinal() - 3
+    assert history.days_matching(deed_mask("Water from the Well")) == [DAY - datetime.timedelta(days=3), DAY]
+
+def test_history_merge_mask_returns_new_bits():
+    history = DeedHistory()
+    water, fruit = deed_mask("Water from the Well"), deed_mask("Fruit Orchard Harvest")
+    assert history.merge_mask(DAY, water) == water
+    assert history.merge_mask(DAY, water | fruit) == fruit
+    assert history.mask(DAY) == water | fruit
+
+def test_history_days_matching_needs_every_deed_in_range():
+    history = DeedHistory()
+    both = deed_mask("Water from the Well", "Fruit Orchard Harvest")
+    for offset in range(5):
+        history.add(DAY + datetime.timedelta(days=offset), "Water from the Well")
+        if offset % 2 == 0:
+            history.add(DAY + datetime.timedelta(days=offset), "Fruit Orchard Harvest")
+    assert history.days_matching(both, DAY + datetime.timedelta(days=1), DAY + datetime.timedelta(days=4)) == \
+        [DAY + datetime.timedelta(days=2), DAY + datetime.timedelta(days=4)]
+
+def test_history_days_matching_outside_the_logged_days():
+    history = DeedHistory()
+    water = deed_mask("Water from the Well")
+    for offset in range(20, 40):
+        history.add(DAY + datetime.timedelta(days=offset), "Water from the Well")
+    assert history.days_matching(water, DAY, DAY + datetime.timedelta(days=14)) == []
+    assert history.days_matching(water, DAY + datetime.timedelta(days=50), DAY + datetime.timedelta(days=60)) == []
+
+def test_history_dict_round_trip():
+    history = DeedHistory()
+    history.add(DAY, "Water from the Well")
+    history.add(DAY + datetime.timedelta(days=10), "A Stroll to Bywater")
+    data = history.to_dict()
+    assert data == {'2025-01-06': {"Water from the Well": True}, '2025-01-16': {"A Stroll to Bywater": True}}
+    assert DeedHistory.from_dict(data).to_dict() == data
+
+# --- Streak Index ---
+def log_days(player, offsets, *deed_names):
+    for offset in offsets:
+        for deed_name in deed_names:
+            player.log_deed(DAY + datetime.timedelta(days=offset), deed_name)
+
+def test_streak_index_extends_runs_as_deeds_are_logged():
+    player = Player()
+    both = deed_mask("Fruit Orchard Harvest", "Vegetable Patch Platter")
+    assert player.streaks.run_length(both, DAY) == 0
+    log_days(player, range(3), "Fruit Orchard Harvest", "Vegetable Patch Platter")
+    assert player.streaks.run_length(both, DAY + datetime.timedelta(days=2)) == 3
+    assert player.streaks.run_length(both, DAY + datetime.timedelta(days=2), since=DAY + datetime.timedelta(days=1)) == 2
+    assert player.streaks.run_length(both, DAY + datetime.timedelta(days=3)) == 0
+    log_days(player, [4], "Fruit Orchard Harvest") # Half the pair doesn't count
+    assert player.streaks.latest_length(both) == 3
+
+def test_streak_index_joins_back_filled_days():
+    player = Player()
+    water = deed_mask("Water from the Well")
+    log_days(player, [0, 1, 3, 4], "Water from the Well")
+    assert player.streaks.run_length(water, DAY + datetime.timedelta(days=4)) == 2
+    log_days(player, [2], "Water from the Well")
+    assert player.streaks.run_length(water, DAY + datetime.timedelta(days=4)) == 5
+
+def test_streak_index_answers_for_earlier_days():
+    player = Player()
+    water = deed_mask("Water from the Well")
+    log_days(player, [0, 1, 2, 5], "Water from the Well")
+    assert player.streaks.run_length(water, DAY + datetime.timedelta(days=2)) == 3
+    assert player.streaks.run_length(water, DAY + datetime.timedelta(days=4)) == 0
+
+def test_streak_index_matches_a_scan_of_random_histories():
+    rng = random.Random(3)
+    deeds = ("Water from the Well", "Fruit Orchard Harvest")
+    masks = [deed_mask(deeds[0]), deed_mask(*deeds)]
+    for _ in range(20):
+        player = Player()
+        for mask in masks:
+            player.streaks.track(mask)
+        for offset in rng.sample(range(40), 30): # Out of order, so some days are back-filled
+            log_days(player, [offset], *[d for d in deeds if rng.random() < 0.8])
+        fresh = StreakIndex(player.daily_deeds_completed)
+        for mask in masks:
+            assert player.streaks.latest_length(mask) == fresh.latest_length(mask)
+
+# --- Game Events ---
+class ListSink:
+    def __init__(self):
+        self.events = []
+        self.flushes = 0
+
+    def emit(self, event):
+        self.events.append(event)
+
+    def flush(self):
+        self.flushes += 1
+
+def test_player_reports_changes_as_events():
+    player = Player()
+    player.events = sink = ListSink()
+    player.log_deed(DAY, "A Stroll to Bywater")
+    player.add_sp(5)
+    assert sink.events[0] == DeedLogged('2025-01-06', "A Stroll to Bywater")
+    assert AchievementUnlocked("First Stroll to Bywater") in sink.events
+    assert sink.events[-1] == SPGained(5, 5)
+
+def test_terminal_renderer_writes_once_per_flush_and_folds_gains():
+    stream = io.StringIO()
+    renderer = TerminalRenderer(stream)
+    renderer.emit(SPGained(5, 5))
+    renderer.emit(SPGained(10, 15))
+    renderer.emit(Narration("Onward!"))
+    assert stream.getvalue() == ""
+    renderer.flush()
+    assert stream.getvalue() == "💰 You gained 15 Shire Pennies! Total: 15 SP\nOnward!\n"
+    renderer.flush()
+    assert stream.getvalue().count("Onward!") == 1
+
+def test_jsonl_sink_appends_events_on_flush(tmp_path):
+    path = tmp_path / 'audit.jsonl'
+    listener = ListSink()
+    sink = MultiSink(JsonlSink(str(path)), listener)
+    sink.emit(SPGained(5, 5))
+    assert not path.exists()
+    sink.flush()
+    record = json.loads(path.read_text())
+    assert (record['event'], record['amount'], record['total']) == ('SPGained', 5, 5)
+    assert listener.events == [SPGained(5, 5)] and listener.flushes == 1
+
+def test_loading_a_game_reports_through_its_sink(tmp_path, capsys):
+    make_game(tmp_path).save_game()
+    sink = ListSink()
+    game = Game(save_file=str(tmp_path / 'save.dat'), journal_file=str(tmp_path / 'save.journal'), events=sink)
+    assert game.player.name == "Sam"
+    assert sink.events == [Narration("Game loaded!")] and sink.flushes == 1
+    assert capsys.readouterr().out == ""
+
+# --- Quest Rules ---
+FRUIT_AND_VEG = ("Fruit Orchard Harvest", "Vegetable Patch Platter")
+
+def rule(**fields):
+    return QuestRule(fields.pop('name', "Test"), "", 10, "Test Achievement", **fields)
+
+def completed(player, rules, today, since=None, streaks=True):
+    active = [(index, r, since) for index, r in enumerate(rules)]
+    return QuestEvaluator().evaluate(player.daily_deeds_completed, today, active,
+                                     player.streaks if streaks else None)
+
+def test_consecutive_rules_need_an_unbroken_run_up_to_today():
+    player = Player()
+    log_days(player, [0, 1, 2, 4], *FRUIT_AND_VEG)
+    three = rule(required_deeds=FRUIT_AND_VEG, days=3)
+    assert completed(player, [three], DAY + datetime.timedelta(days=2)) == [0]
+    assert completed(player, [three], DAY + datetime.timedelta(days=4)) == []
+    assert completed(player, [three], DAY + datetime.timedelta(days=2), since=DAY + datetime.timedelta(days=1)) == []
+
+def test_consecutive_rules_are_answered_by_the_streak_index():
+    player = Player()
+    log_days(player, range(400), *FRUIT_AND_VEG)
+    evaluator = QuestEvaluator()
+    long_run = rule(required_deeds=FRUIT_AND_VEG, days=365)
+    today = DAY + datetime.timedelta(days=399)
+    assert evaluator.evaluate(player.daily_deeds_completed, today, [(0, long_run, None)], player.streaks) == [0]
+    assert not evaluator.predicates # Nothing had to be walked
+
+def test_windowed_and_any_deed_rules():
+    player = Player()
+    log_days(player, [0, 2, 4], "Water from the Well")
+    log_days(player, [4], "A Stroll to Bywater")
+    three_in_five = rule(required_deeds=("Water from the Well",), days=3, window=5, consecutive=False)
+    either = rule(any_deeds=("A Stroll to Bywater", "Salt-Wise Supper"))
+    today = DAY + datetime.timedelta(days=4)
+    assert completed(player, [three_in_five, either], today) == [0, 1]
+    assert completed(player, [three_in_five, either], today, since=DAY + datetime.timedelta(days=1)) == [1]
+
+def test_streak_answers_match_the_day_walk():
+    rng = random.Random(5)
+    deeds = FRUIT_AND_VEG + ("Water from the Well",)
+    rules = [rule(required_deeds=FRUIT_AND_VEG, days=3), rule(required_deeds=deeds[2:], days=2),
+             rule(required_deeds=deeds[:1], days=4, window=6, consecutive=False),
+             rule(any_deeds=deeds[1:], days=2)]
+    for _ in range(30):
+        player = Player()
+        for offset in range(20):
+            log_days(player, [offset], *[d for d in deeds if rng.random() < 0.7])
+        today = DAY + datetime.timedelta(days=rng.randrange(25))
+        since = rng.choice([None, DAY + datetime.timedelta(days=rng.randrange(20))])
+        assert completed(player, rules, today, since) == completed(player, rules, today, since, streaks=False)
+
+# --- Weekly Bounties ---
+def test_bounties_are_claimed_as_deeds_are_logged(tmp_path):
+    game = make_game(tmp_path)
+    monday = DAY # 2025-01-06 starts an ISO week
+    for offset in range(7):
+        game.record_deeds(["Water from the Well"], monday + datetime.timedelta(days=offset))
+        claims = game.player.bounty_claims.get(iso_week(monday), ())
+        assert ("The Clear Stream Challenge" in claims) == (offset == 6)
+    assert game.player.hobbit_points == 50
+    assert game.player.has_achievement("The Clear Stream Challenge Completed")
+
+def test_bounties_are_claimed_once_per_week(tmp_path):
+    game = make_game(tmp_path)
+    for offset in range(14):
+        game.record_deeds(["Water from the Well"], DAY + datetime.timedelta(days=offset))
+    assert list(game.player.bounty_claims) == [iso_week(DAY), iso_week(DAY + datetime.timedelta(days=7))]
+    assert game.player.hobbit_points == 100
+
+def test_weekly_tally_matches_a_recount():
+    rng = random.Random(11)
+    player = Player()
+    history = player.daily_deeds_completed
+    tally = WeeklyTally(history)
+    water = deed_mask("Water from the Well")
+    for _ in range(200):
+        offset = rng.randrange(60)
+        if rng.random() < 0.6:
+            if history.add(DAY.toordinal() + offset, "Water from the Well"):
+                tally.record(DAY.toordinal() + offset, water)
+        else:
+            today = DAY + datetime.timedelta(days=offset)
+            expected = sum(history.has(today - datetime.timedelta(days=n), "Water from the Well") for n in range(7))
+            assert tally.count("Water from the Well", today) == expected
+
+# --- Health Log ---
+def daily_series(values, start=DAY):
+    series = TimeSeries()
+    series.extend((start + datetime.timedelta(days=n), value) for n, value in enumerate(values))
+    return series
+
+def test_series_means_and_trend_over_ranges():
+    series = daily_series([180 - n / 2 for n in range(100)]) # Losing half a pound a day
+    assert series.mean() == pytest.approx(180 - 99 / 4)
+    assert series.rolling_mean(DAY + datetime.timedelta(days=9), 3) == pytest.approx(176)
+    assert series.trend() == pytest.approx(-0.5) # Long enough to use the running totals
+    assert series.trend(DAY, DAY + datetime.timedelta(days=5)) == pytest.approx(-0.5) # Summed directly
+    assert series.mean(DAY - datetime.timedelta(days=10), DAY - datetime.timedelta(days=1)) is None
+    assert daily_series([180]).trend() is None
+
+def test_series_sorts_back_filled_readings():
+    series = daily_series([181, 182])
+    series.extend([(DAY - datetime.timedelta(days=1), 180)])
+    assert list(series.values) == [180, 181, 182]
+    assert series.has(DAY, 181) and not series.has(DAY, 180)
+    assert series.latest() == (DAY + datetime.timedelta(days=1), 182)
+
+def test_series_resamples_by_week_and_month():
+    series = daily_series(range(31), start=datetime.date(2025, 1, 1)) # A Wednesday
+    weeks = series.resample('week')
+    assert weeks[0] == (datetime.date(2024, 12, 30), 2.0, 5)
+    assert sum(count for _, _, count in weeks) == 31
+    assert series.resample('month') == [(datetime.date(2025, 1, 1), 15.0, 31)]
+    with pytest.raises(ValueError):
+        series.resample('fortnight')
+
+def test_series_columns_keep_floats_aligned_and_read_older_layouts():
+    series = daily_series([180.0, 179.5, 179.0]) # An odd count, so the day column is padded
+    data = io.BytesIO()
+    series.write_columns(data)
+    data = data.getvalue()
+    assert data.index(array('d', series.values).tobytes()) % 8 == 0
+    assert TimeSeries.map_columns(data)[0].to_dict() == series.to_dict()
+    days = array('i', series.days) + array('i', [0]) # The unpadded 12-byte header of 'SHTS' columns
+    old = shire_quest.COLUMNS_HEADERS[b'SHTS'].pack(b'SHTS', series.origin, 3) + days.tobytes() + data[32:]
+    assert TimeSeries.map_columns(old)[0].to_dict() == series.to_dict()
+
+def test_large_health_logs_are_mapped_from_the_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(shire_quest, 'SNAPSHOT_MAP_BYTES', 1)
+    game = make_game(tmp_path)
+    for n in range(70):
+        game.record_reading(180 - n / 10, f"{130 - n % 5}/85", DAY + datetime.timedelta(days=n))
+    game.save_game()
+    log = game.player.health
+    player, _ = decode_snapshot(game.store.snapshot_file)
+    mapped = player.health
+    assert isinstance(mapped.weight.values.obj, mmap.mmap)
+    assert mapped.to_dict() == log.to_dict()
+    today = DAY + datetime.timedelta(days=69)
+    assert mapped.summary(today) == log.summary(today)
+    mapped.add(today + datetime.timedelta(days=1), 173) # Mapped columns are copied before changing
+    assert len(mapped.weight) == 71
+
+@pytest.mark.parametrize('text, expected', [("120/80", (120, 80)), ("135 / 90 mmHg", (135, 90))])
+def test_blood_pressure_parsing(text, expected):
+    assert parse_blood_pressure(text) == expected
+
+def test_blood_pressure_must_look_like_a_reading():
+    with pytest.raises(ValueError):
+        parse_blood_pressure("130 over 85")
+
+# --- Binary Snapshot ---
+def test_snapshot_decodes_old_days_and_readings_on_first_use(tmp_path):
+    game = make_game(tmp_path)
+    for n in range(200):
+        game.record_deeds(["Water from the Well"], DAY + datetime.timedelta(days=n))
+    game.record_reading(180.0, "130/85")
+    game.save_game()
+    player, generation = decode_snapshot(game.store.snapshot_file)
+    history = player.daily_deeds_completed
+    assert generation == game.store.generation
+    assert len(history.masks) == shire_quest.SNAPSHOT_RECENT_DAYS
+    assert history.archive is not None and player._health_loader is not None
+    assert history.has(DAY, "Water from the Well") # Reaching back reads the archive in
+    assert history.archive is None
+    assert player.to_dict() == game.player.to_dict()
+
+def test_streaks_that_ended_in_the_archive_leave_it_unread(tmp_path):
+    game = make_game(tmp_path)
+    game.accept_offer("Da Provider", "Smoothie Bar Blueprint")
+    log_days(game.player, range(2), *FRUIT_AND_VEG) # One day short of the favor
+    log_days(game.player, range(2, 200), "Water from the Well")
+    game.save_game()
+    player, _ = decode_snapshot(game.store.snapshot_file)
+    loaded = Game(load=False, events=NULL_SINK, clock=ManualClock(DAY + datetime.timedelta(days=199)))
+    loaded.use_player(player)
+    history, mask = player.daily_deeds_completed, deed_mask(*FRUIT_AND_VEG)
+    assert loaded.check_character_scenes() == [] # The startup scene check
+    log_days(player, [200], *FRUIT_AND_VEG)
+    assert player.streaks.latest_length(mask) == 1
+    assert history.archive is not None
+    assert player.streaks.run_length(mask, DAY + datetime.timedelta(days=1)) == 2 # Asking about old days reads them
+    assert history.archive is None
+
+def test_deed_totals_come_from_the_snapshot_while_the_archive_is_unread(tmp_path):
+    game = make_game(tmp_path)
+    log_days(game.player, range(200), "Water from the Well")
+    game.save_game()
+    player, _ = decode_snapshot(game.store.snapshot_file)
+    loaded = Game(load=False, events=NULL_SINK, clock=ManualClock(DAY + datetime.timedelta(days=200)))
+    loaded.use_player(player)
+    loaded.record_deeds(["Water from the Well", "Salt-Wise Supper"]) # Both count toward deed milestones
+    assert player.totals.count("Water from the Well") == 201
+    assert player.daily_deeds_completed.archive is not None
+    log_days(player, [0], "Salt-Wise Supper") # Back-filling an archived day reads it in
+    assert player.totals.count("Salt-Wise Supper") == 2
+    assert player.totals.count("Water from the Well") == 201
+
+def test_snapshot_remaps_bits_saved_under_another_deed_order(tmp_path, monkeypatch):
+    player = Player("Sam")
+    player.daily_deeds_completed.merge_mask(DAY, 1) # Bit 0 in a save whose first two deeds were swapped
+    swapped = list(shire_quest.DEED_NAMES)
+    swapped[0], swapped[1] = swapped[1], swapped[0]
+    with monkeypatch.context() as patch:
+        patch.setattr(shire_quest, 'DEED_NAMES', swapped)
+        data = encode_snapshot(player, 1)
+    path = tmp_path / 'save.dat'
+    path.write_bytes(data)
+    loaded, _ = decode_snapshot(str(path))
+    assert loaded.daily_deeds_completed.deeds_on(DAY) == [swapped[0]]
+
+def test_snapshot_rewritten_under_a_lazy_reader_is_refused(tmp_path):
+    game = make_game(tmp_path)
+    for n in range(100):
+        game.record_deeds(["Water from the Well"], DAY + datetime.timedelta(days=n))
+    game.save_game()
+    player, _ = decode_snapshot(game.store.snapshot_file)
+    game.store.compact(game.player)
+    with pytest.raises(RuntimeError):
+        player.daily_deeds_completed.load_archive()
+
+def test_snapshot_from_a_newer_version_is_refused(tmp_path):
+    path = tmp_path / 'save.dat'
+    path.write_bytes(shire_quest.SNAPSHOT_HEADER.pack(shire_quest.SNAPSHOT_MAGIC, shire_quest.SNAPSHOT_VERSION + 1, 0, 1))
+    with pytest.raises(ValueError):
+        decode_snapshot(str(path))
+
+def test_json_save_is_migrated_on_first_load(tmp_path):
+    player = Player("Sam")
+    player.daily_deeds_completed.add(DAY, "Water from the Well")
+    player.add_sp(10)
+    legacy = tmp_path / 'save.json'
+    legacy.write_text(json.dumps(player.to_dict()))
+    store = SaveJournal(str(tmp_path / 'save.dat'), str(tmp_path / 'save.journal'), legacy_file=str(legacy))
+    assert store.load().to_dict() == player.to_dict()
+    assert shire_quest.is_binary_snapshot(str(tmp_path / 'save.dat'))
+    assert not legacy.exists() and (tmp_path / 'save.json.bak').exists()
+    assert SaveJournal(store.snapshot_file, store.journal_file).load().to_dict() == player.to_dict()
+
+# --- Shire Calendar ---
+@pytest.mark.parametrize('day, expected', [
+    (datetime.date(2024, 12, 22), "2 Yule, Sterday"),
+    (datetime.date(2024, 12, 23), "1 Afteryule, Sunday"),
+    (datetime.date(2024, 6, 21), "Mid-year's Day"),
+    (datetime.date(2024, 6, 22), "Overlithe"),
+    (datetime.date(2025, 6, 22), "Mid-year's Day"), # A day later in common years
+    (datetime.date(2025, 12, 21), "1 Yule, Highday"),
+])
+def test_shire_dates(day, expected):
+    assert ShireCalendar.get_shire_date(day) == expected
+
+def test_shire_day_names_are_the_same_every_year():
+    common, leap = ShireCalendar.year_labels(False), ShireCalendar.year_labels(True)
+    assert (len(common), len(leap)) == (365, 366)
+    assert [label for label in leap if label != "Overlithe"] == list(common)
+
+def test_shire_date_ranges_match_single_days():
+    start, end = datetime.date(2023, 11, 1), datetime.date(2025, 2, 1) # Across two new years and a leap year
+    days = [start + datetime.timedelta(days=n) for n in range((end - start).days + 1)]
+    assert ShireCalendar.get_shire_dates(start, end) == [ShireCalendar.get_shire_date(day) for day in days]
+    assert ShireCalendar.get_shire_dates(end, start) == []
+
+# --- Background Saves ---
+def recording_writes(store, monkeypatch):
+    ops = []
+    write = store._write
+    def record(op, payload):
+        ops.append(op)
+        write(op, payload)
+    monkeypatch.setattr(store, '_write', record)
+    return ops
+
+def test_background_saves_coalesce_into_one_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(shire_quest, 'SAVE_DEBOUNCE_SECONDS', 60) # Only flush() ends the wait
+    game = make_game(tmp_path, background_save=True)
+    ops = recording_writes(game.store, monkeypatch)
+    game.save_game()
+    for n in range(10):
+        game.record_deeds(["Water from the Well"], DAY + datetime.timedelta(days=n))
+        game.save_game()
+    game.store.flush()
+    assert ops == ['snapshot', 'append']
+    assert reload(game).to_dict() == game.player.to_dict()
+
+def test_background_snapshot_replaces_queued_appends(tmp_path, monkeypatch):
+    monkeypatch.setattr(shire_quest, 'SAVE_DEBOUNCE_SECONDS', 60)
+    game = make_game(tmp_path, background_save=True)
+    ops = recording_writes(game.store, monkeypatch)
+    game.save_game()
+    game.record_deeds(["Water from the Well"])
+    game.save_game()
+    game.store.compact(game.player)
+    game.store.flush()
+    assert ops == ['snapshot']
+    assert reload(game).to_dict() == game.player.to_dict()
+    assert not (tmp_path / 'save.dat.tmp').exists()
+
+def test_background_write_errors_surface_on_flush(tmp_path):
+    store = SaveJournal(str(tmp_path / 'missing' / 'save.dat'), str(tmp_path / 'save.journal'), background=True)
+    store.compact(Player("Sam"))
+    with pytest.raises(FileNotFoundError):
+        store.flush()
+    store.flush() # Reported once
+
+# --- Profiling ---
+def test_profiler_times_hot_paths_only_while_enabled(tmp_path):
+    save_game = Game.save_game
+    profiler = Profiler()
+    profiler.enable()
+    try:
+        assert Game.save_game is not save_game
+        game = make_game(tmp_path)
+        game.record_deeds(["Water from the Well"])
+        game.save_game()
+        reload(game)
+    finally:
+        profiler.disable()
+    assert Game.save_game is save_game and not profiler.enabled
+    report = profiler.report()
+    assert report["Game.save_game"]['calls'] == report["Game.record_deeds"]['calls'] == 1
+    assert report["SaveJournal.load"]['calls'] == 1
+    assert report["SaveJournal._write"]['bytes'] > 0
+    game.save_game()
+    assert profiler.report()["Game.save_game"]['calls'] == 1
+
+def test_call_stats_keep_a_bounded_sample():
+    stats = CallStats()
+    for n in range(shire_quest.PROFILE_SAMPLES * 3):
+        stats.add(n / 1000)
+    assert stats.calls == shire_quest.PROFILE_SAMPLES * 3
+    assert len(stats.samples) == shire_quest.PROFILE_SAMPLES
+    assert stats.percentile(0.5) < stats.percentile(0.99)
+
+def test_profiler_dumps_json_or_a_table(tmp_path):
+    profiler = Profiler()
+    profiler.record("Game.save_game", 0.002, 100)
+    profiler.dump(str(tmp_path / 'profile.json'))
+    assert json.loads((tmp_path / 'profile.json').read_text())["Game.save_game"]['bytes'] == 100
+    profiler.dump(str(tmp_path / 'profile.txt'))
+    assert "Game.save_game" in (tmp_path / 'profile.txt').read_text().splitlines()[1]
+    profiler.reset()
+    assert profiler.report() == {}
+
+# --- Day Advance and Replay ---
+def play_favor_days(game, days):
+    game.accept_offer("Da Provider", "Smoothie Bar Blueprint")
+    scenes = []
+    for _ in range(days):
+        game.record_deeds(list(FRUIT_AND_VEG))
+        scenes.append(game.advance_day())
+    return scenes
+
+def test_advancing_the_day_checks_scenes_for_the_day_that_ended(tmp_path):
+    game = make_game(tmp_path)
+    scenes = play_favor_days(game, 3)
+    assert scenes == [[], [], ["Da Provider"]]
+    assert game.player.has_achievement("Smoothie Bar Blueprint Unlocked")
+    assert game.today == DAY + datetime.timedelta(days=3)
+    assert game.player.daily_deeds_completed.deeds_on(game.today) == []
+
+def test_the_advanced_day_is_saved_and_resumed_on_load(tmp_path):
+    game = make_game(tmp_path)
+    game.save_game()
+    game.today = datetime.date.today() + datetime.timedelta(days=10) # Ahead of the real date
+    game.advance_day()
+    game.save_game()
+    assert reload(game).game_day == game.today.toordinal() # From the journal
+    game.store.compact(game.player)
+    assert reload(game).to_dict()['game_day'] == game.today.isoformat() # From the snapshot
+    def load_game(**kwargs):
+        loaded = Game(save_file=game.store.snapshot_file, journal_file=game.store.journal_file,
+                      load=False, events=NULL_SINK, **kwargs)
+        loaded.use_player(loaded.store.load())
+        return loaded.today
+    assert load_game() == game.today
+    assert load_game(clock=ManualClock(DAY)) == DAY # A clock of its own keeps its day
+
+def save_log(log, tmp_path):
+    path = str(tmp_path / 'actions.jsonl')
+    log.save(path)
+    return path
+
+def test_replay_rebuilds_any_day_of_a_recorded_game(tmp_path):
+    game = make_game(tmp_path)
+    log = game.record_actions()
+    play_favor_days(game, 3)
+    replay = Replay(ActionLog.load(save_log(log, tmp_path)), checkpoint_every=1)
+    assert replay.seek(game.today).player.to_dict() == game.player.to_dict()
+    early = replay.seek(DAY + datetime.timedelta(days=1)) # Back to a checkpoint
+    assert not early.player.has_achievement("Smoothie Bar Blueprint Unlocked")
+    assert early.player.daily_deeds_completed.has(DAY, "Fruit Orchard Harvest")
+
+def test_recorded_games_replay_back_filled_days(tmp_path):
+    game = make_game(tmp_path)
+    log = game.record_actions()
+    play_favor_days(game, 2)
+    game.record_deeds(["Water from the Well"], DAY) # Back-filled on the third game day
+    game.record_reading(180.0, "130/85", DAY + datetime.timedelta(days=1))
+    game.record_deeds(list(FRUIT_AND_VEG))
+    assert [ordinal for ordinal, _, _ in log.actions] == sorted(ordinal for ordinal, _, _ in log.actions)
+    replay = Replay(ActionLog.load(save_log(log, tmp_path)))
+    assert replay.seek(game.today).player.to_dict() == game.player.to_dict()
+    assert not replay.seek(DAY + datetime.timedelta(days=1)).player.daily_deeds_completed.has(DAY, "Water from the Well")
+
+# --- Lean Players ---
+def test_players_share_bounty_claim_tuples():
+    sam, frodo = Player("Sam"), Player("Frodo")
+    for player in (sam, frodo):
+        player.claim_bounty("2025-W02", "Well Walker")
+        player.claim_bounty("2025-W02", "Orchard Keeper")
+    assert sam.bounty_claims["2025-W02"] is frodo.bounty_claims["2025-W02"]
+    copy = Player.from_dict(json.loads(json.dumps(sam.to_dict())))
+    assert copy.bounty_claims["2025-W02"] is sam.bounty_claims["2025-W02"]
+    assert not hasattr(sam, '__dict__')
+
+def test_unlocks_keep_their_order_and_day():
+    player = Player("Sam")
+    assert player.add_achievement("Second Breakfast Champion", DAY)
+    assert player.add_achievement("First Stroll to Bywater")
+    assert not player.add_achievement("Second Breakfast Champion")
+    assert player.achievements == ("Second Breakfast Champion", "First Stroll to Bywater")
+    assert player.unlock_records()[0] == ("Second Breakfast Champion", DAY)
+    assert Player.from_dict(player.to_dict()).unlock_records() == player.unlock_records()
+
+def test_day_masks_widen_for_higher_deed_bits():
+    history = DeedHistory()
+    history.merge_mask(DAY, 1)
+    narrow = history.masks.itemsize
+    history.merge_mask(DAY + datetime.timedelta(days=1), 1 << 40)
+    assert history.masks.itemsize == 8 > narrow
+    assert list(history.masks) == [1, 1 << 40]
+
+# --- Achievement Catalog ---
+WATER = "Water from the Well"
+
+def water_catalog():
+    return AchievementCatalog([
+        Achievement("Three Buckets", "", streak=(WATER,), streak_days=3),
+        Achievement("Week at the Well", "", streak=(WATER,), streak_days=7),
+        Achievement("Five Days of Water", "", deeds=(WATER,), deed_days=5),
+    ])
+
+def log_water(player, catalog, offset):
+    ordinal = DAY.toordinal() + offset
+    player.daily_deeds_completed.merge_mask(ordinal, deed_mask(WATER))
+    grown = player.streaks.update(ordinal, deed_mask(WATER))
+    player.totals.record(deed_mask(WATER))
+    return catalog.deed_logged(player, WATER, grown)
+
+def test_catalog_checks_the_streak_thresholds_a_run_passes():
+    catalog, player = water_catalog(), Player("Sam")
+    unlocked = [log_water(player, catalog, offset) for offset in (0, 1, 2, 4, 5, 6)]
+    assert unlocked == [[], [], ["Three Buckets"], [], ["Five Days of Water"], []]
+    assert log_water(player, catalog, 3) == ["Week at the Well"] # Back-filled day joins both runs: 3 -> 7
+    assert catalog.indexed_deeds == {WATER}
+
+def test_catalog_checks_every_threshold_of_a_streak_seen_for_the_first_time():
+    catalog, player = water_catalog(), Player("Sam")
+    log_days(player, range(7), WATER) # Logged through the shared catalog; this one hasn't seen the run
+    player.set_unlocks(())
+    assert log_water(player, catalog, 7) == ["Three Buckets", "Week at the Well"]
+
+def test_deeds_no_achievement_depends_on_skip_the_catalog(monkeypatch):
+    calls = []
+    monkeypatch.setattr(shire_quest.ACHIEVEMENTS, 'deed_logged', lambda player, deed_name, grown: calls.append(deed_name))
+    player = Player("Sam")
+    unindexed = next(name for name in shire_quest.DAILY_DEED_POINTS if name not in shire_quest.ACHIEVEMENTS.indexed_deeds)
+    player.log_deed(DAY, unindexed)
+    player.log_deed(DAY, WATER)
+    assert calls == [WATER]
+
+# --- Content Packs ---
+def small_pack(**changes):
+    pack = {
+        'deeds': {"Hydration": {"Water": 10}, "Movement": {"Stroll": 15, "Hike": 30}},
+        'status_levels': {"Gaffer": 100, "Newcomer": 0},
+        'bounties': [{'name': "Wet Week", 'description': "Water on 5 days", 'hp_reward': 20,
+                      'achievement': "Well Visitor", 'targets': {"Water": 5}}],
+        'achievements': [{'name': "First Hike", 'description': "Go on a hike", 'deeds': ["Hike"]}]
+    }
+    pack.update(changes)
+    return pack
+
+def test_content_pack_compiles_into_flat_tables():
+    content = compile_content(small_pack(), 'digest')
+    assert content.deed_names == ("Water", "Stroll", "Hike")
+    assert content.deed_points == (10, 15, 30)
+    assert content.categories == (("Hydration", (0,)), ("Movement", (1, 2)))
+    assert content.status_names == ("Newcomer", "Gaffer") # Sorted by threshold
+    assert content.bounties == (("Wet Week", "Water on 5 days", 20, "Well Visitor", (("Water", 5),)),)
+
+@pytest.mark.parametrize('changes, message', [
+    ({'deeds': {"Hydration": {"Water": "ten"}}}, "whole number"),
+    ({'deeds': {"Hydration": {"Water": 10}, "More": {"Water": 5}}}, "defined twice"),
+    ({'status_levels': {}}, "no Shire Status levels"),
+    ({'colour': "green"}, "unknown fields"),
+    ({'bounties': [{'name': "B", 'description': "d", 'hp_reward': 1, 'achievement': "A",
+                    'targets': {"Nap": 2}}]}, "unknown deed, 'Nap'"),
+    ({'bounties': [{'name': "B", 'description': "d", 'hp_reward': 1, 'achievement': "A",
+                    'targets': {"Water": 9}}]}, "1 to 7 days"),
+    ({'achievements': [{'name': "A", 'description': "d", 'favors': ["Nope"]}]}, "unknown offer"),
+    ({'offers': {"REX": [{'name': "O", 'description': "d", 'hp_reward': 1, 'achievement': "A"}]}},
+     "required_deeds or any_deeds"),
+])
+def test_content_pack_errors_name_the_problem(changes, message):
+    with pytest.raises(ContentError, match=message):
+        compile_content(small_pack(**changes))
+
+def test_compiled_content_is_cached_by_the_pack_hash(tmp_path, monkeypatch):
+    path = tmp_path / 'pack.json'
+    path.write_text(json.dumps(small_pack()))
+    first = load_content(str(path))
+    assert len(list((tmp_path / '__pycache__').glob('pack.*.content'))) == 1
+    monkeypatch.setattr(shire_quest, 'compile_content', None) # A second load must not compile
+    assert load_content(str(path)) == first
+    path.write_text(json.dumps(small_pack(status_levels={"Newcomer": 0})))
+    monkeypatch.undo()
+    assert load_content(str(path)).status_names == ("Newcomer",) # A changed pack is compiled afresh
+
+def test_bad_json_packs_are_content_errors(tmp_path):
+    path = tmp_path / 'pack.json'
+    path.write_text("{not json")
+    with pytest.raises(ContentError, match="valid JSON"):
+        load_content(str(path))
+
+def test_status_levels_by_hit_points():
+    content = compile_content(small_pack())
+    assert [content.status(hp) for hp in (-1, 0, 99, 100, 500)] == ["Unknown", "Newcomer", "Newcomer", "Gaffer", "Gaffer"]
+    assert content.statuses_reached(-1, 100) == ("Newcomer", "Gaffer")
+    assert content.statuses_reached(0, 99) == ()
+    assert CONTENT.status(0) == CONTENT.status_names[0]
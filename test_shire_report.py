@@ -0,0 +1,110 @@
+import datetime
+import json
+import os
+import random
+
+from shire_quest import CONTENT, DAILY_DEED_POINTS, Player, iso_week
+from shire_report import ANY_DEED, PeriodCache, history_periods, main, player_report, summary_report
+
+DAY = datetime.date(2025, 1, 6)
+DEEDS = CONTENT.deed_names
+
+def random_player(name, days, seed):
+    """A player who did a random few deeds on most of `days` days from DAY."""
+    rng = random.Random(seed)
+    player = Player(name)
+    for offset in range(days):
+        if rng.random() < 0.8:
+            for deed_name in rng.sample(DEEDS, rng.randrange(1, 4)):
+                player.log_deed(DAY + datetime.timedelta(days=offset), deed_name)
+    return player
+
+def brute_force(player, first, last, key):
+    """{period label: SP} and the longest run of days with any deed, one day at a time."""
+    sp, longest, run = {}, 0, 0
+    for ordinal in range(first, last + 1):
+        deeds = player.daily_deeds_completed.deeds_on(ordinal)
+        label = key(datetime.date.fromordinal(ordinal))
+        sp[label] = sp.get(label, 0) + sum(DAILY_DEED_POINTS.get(deed_name, 0) for deed_name in deeds)
+        run = run + 1 if deeds else 0
+        longest = max(longest, run)
+    return sp, longest
+
+def test_periods_match_a_day_by_day_count():
+    player = random_player("Sam", 200, seed=3)
+    first, last = DAY.toordinal(), (DAY + datetime.timedelta(days=210)).toordinal()
+    weeks, months, total = history_periods(player.daily_deeds_completed, last, cache=PeriodCache())
+    week_sp, longest = brute_force(player, first, last, iso_week)
+    month_sp, _ = brute_force(player, first, last, lambda day: day.strftime('%Y-%m'))
+    assert {label: stats.sp for label, _, _, stats in weeks} == week_sp
+    assert {label: stats.sp for label, _, _, stats in months} == month_sp
+    assert total.sp == sum(week_sp.values())
+    assert total.days == last - first + 1
+    assert total.run_map()[ANY_DEED][2] == longest
+
+def test_repeated_reports_reuse_finished_periods_until_a_day_changes():
+    player = random_player("Sam", 60, seed=5)
+    cache = PeriodCache()
+    last = (DAY + datetime.timedelta(days=59)).toordinal()
+    history_periods(player.daily_deeds_completed, last, cache=cache)
+    cached = len(cache.entries)
+    assert cached
+    _, _, before = history_periods(player.daily_deeds_completed, last, cache=cache)
+    assert len(cache.entries) == cached # Nothing new to remember
+    back_filled = DAY + datetime.timedelta(days=3)
+    unused = next(deed_name for deed_name in DEEDS if not player.daily_deeds_completed.has(back_filled, deed_name))
+    player.log_deed(back_filled, unused)
+    _, _, after = history_periods(player.daily_deeds_completed, last, cache=cache)
+    assert after.sp == before.sp + DAILY_DEED_POINTS[unused]
+
+def test_cache_drops_the_least_recently_used_entry():
+    cache = PeriodCache(size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert list(cache.entries) == ['a', 'c']
+
+def test_player_report_lists_latest_periods_and_streaks():
+    player = Player("Sam")
+    for offset in range(10):
+        player.log_deed(DAY + datetime.timedelta(days=offset), "Water from the Well")
+    report = player_report(player, DAY + datetime.timedelta(days=20), weeks=2, months=1)
+    assert (report['from'], report['days'], report['active_days']) == (DAY.isoformat(), 21, 10)
+    assert report['sp'] == 10 * DAILY_DEED_POINTS["Water from the Well"]
+    assert [row['week'] for row in report['weeks']] == ['2025-W03', '2025-W04']
+    assert len(report['months']) == 1
+    assert report['streaks'][:2] == [{'deed': "Any deed", 'longest': 10, 'current': 0},
+                                     {'deed': "Water from the Well", 'longest': 10, 'current': 0}]
+
+def test_player_report_without_deeds():
+    report = player_report(Player("Frodo"), DAY)
+    assert (report['from'], report['days'], report['weeks']) == (None, 0, [])
+
+def test_player_report_runs_to_a_game_day_ahead_of_the_calendar():
+    ahead = datetime.date.today() + datetime.timedelta(days=10)
+    player = Player("Sam")
+    player.log_deed(ahead, "Water from the Well")
+    player.game_day = ahead.toordinal()
+    report = player_report(player)
+    assert (report['to'], report['sp']) == (ahead.isoformat(), DAILY_DEED_POINTS["Water from the Well"])
+
+def test_reporting_on_a_legacy_save_leaves_it_unmigrated(tmp_path, capsys):
+    player = Player("Sam")
+    player.log_deed(DAY, "Water from the Well")
+    (tmp_path / 'save.json').write_text(json.dumps(player.to_dict()))
+    assert main(["--save-file", str(tmp_path / 'save.dat'), "--journal-file", str(tmp_path / 'save.journal'),
+                 "--date", DAY.isoformat(), "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)['active_days'] == 1
+    assert sorted(os.listdir(tmp_path)) == ['save.json']
+
+def test_summary_adds_up_every_hobbit():
+    players = [random_player(name, 40, seed) for seed, name in enumerate(["Sam", "Frodo", "Pippin"])]
+    today = DAY + datetime.timedelta(days=45)
+    summary = summary_report(players + [Player("Merry")], today)
+    reports = [player_report(player, today) for player in players]
+    assert summary['hobbits'] == 4
+    assert summary['sp'] == sum(report['sp'] for report in reports)
+    assert sum(row['sp'] for row in summary['weeks']) == summary['sp']
+    longest = sorted(((report['streaks'][0]['longest'], report['name']) for report in reports), key=lambda s: (-s[0], s[1]))
+    assert [(s['days'], s['name']) for s in summary['longest_streaks']] == longest
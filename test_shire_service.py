@@ -0,0 +1,137 @@
+import asyncio
+import datetime
+
+import pytest
+
+import shire_service
+from shire_leaderboard import Leaderboard
+from shire_service import ShireClient, ShireService, start_server
+
+def run_requests(tmp_path, requests, **service_options):
+    """Starts a service on a free port, sends (method, path, body) requests in order and
+    returns their (status, payload) replies."""
+    async def main():
+        service = ShireService(str(tmp_path / 'players'), leaderboard=Leaderboard(), **service_options)
+        server = await start_server(service, port=0)
+        client = ShireClient(port=server.sockets[0].getsockname()[1])
+        try:
+            return [await client.request(*request) for request in requests]
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(main())
+
+def deeds_on(day, *deeds):
+    return ('POST', '/players/Sam/deeds', {'deeds': list(deeds), 'date': day.isoformat()})
+
+def test_player_lifecycle(tmp_path):
+    replies = run_requests(tmp_path, [
+        ('POST', '/players/Sam', {'weight': 180, 'blood_pressure': '130/85'}),
+        ('POST', '/players/Sam', {}),
+        deeds_on(datetime.date(2025, 1, 6), "Water from the Well"),
+        ('POST', '/players/Sam/favors', {'character': "Da Provider", 'offer': "Smoothie Bar Blueprint"}),
+        ('GET', '/players/Sam', None),
+        ('GET', '/players/Frodo', None),
+    ])
+    assert [status for status, _ in replies] == [200, 409, 200, 200, 200, 404]
+    assert replies[2][1]['result'] == ["Water from the Well"]
+    status = replies[4][1]
+    assert status['weight'] == 180.0
+    assert status['shire_pennies'] == replies[2][1]['shire_pennies'] > 0
+    assert "Da Provider" in status['current_favors']
+
+def test_bad_requests_are_refused(tmp_path):
+    replies = run_requests(tmp_path, [
+        ('POST', '/players/Sam', {}),
+        ('POST', '/players/Sam/deeds', {'deeds': "Water from the Well"}),
+        ('POST', '/players/Sam/deeds', {'deeds': ["Second Second Breakfast"]}),
+        ('POST', '/players/Sam/readings', {}),
+        ('POST', '/players/Sam/deeds', {'deeds': [], 'date': 'yesterday'}),
+        ('GET', '/players/Sam/deeds', None),
+        ('GET', '/players/Sam/report?weeks=lots', None),
+        ('POST', '/players/Sam/report', {}),
+        ('GET', '/players/no%20spaces', None),
+        ('GET', '/nowhere', None),
+    ])
+    assert [status for status, _ in replies] == [200, 400, 400, 400, 400, 405, 400, 405, 400, 404]
+    assert all('error' in payload for _, payload in replies[1:])
+
+def test_a_refused_start_leaves_no_hobbit_behind(tmp_path):
+    replies = run_requests(tmp_path, [
+        ('POST', '/players/Sam', {'blood_pressure': 'garbage'}),
+        ('GET', '/players/Sam', None),
+        ('GET', '/leaderboards/shire_pennies', None),
+        ('POST', '/players/Sam', {'blood_pressure': '130/85'}),
+    ])
+    assert [status for status, _ in replies] == [400, 404, 200, 200]
+    assert replies[2][1]['players'] == 0
+
+def test_players_survive_eviction_from_the_cache(tmp_path):
+    replies = run_requests(tmp_path, [
+        ('POST', '/players/Sam', {}),
+        deeds_on(datetime.date(2025, 1, 6), "Water from the Well"),
+        ('POST', '/players/Frodo', {}),
+        ('GET', '/players/Sam', None),
+    ], max_cached=1)
+    assert replies[3][1]['shire_pennies'] == replies[1][1]['shire_pennies']
+
+def test_report_counts_are_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(shire_service, 'MAX_REPORT_WEEKS', 2)
+    monkeypatch.setattr(shire_service, 'MAX_REPORT_MONTHS', 1)
+    start = datetime.date(2025, 1, 6)
+    replies = run_requests(tmp_path, [('POST', '/players/Sam', {})] + [
+        deeds_on(start + datetime.timedelta(days=offset), "Water from the Well") for offset in range(0, 70, 3)
+    ] + [('GET', '/players/Sam/report?weeks=50&months=50', None)])
+    status, report = replies[-1]
+    assert status == 200
+    assert len(report['weeks']) == 2
+    assert len(report['months']) == 1
+
+def test_leaderboards_follow_logged_deeds(tmp_path):
+    day = datetime.date(2025, 1, 6)
+    replies = run_requests(tmp_path, [
+        ('POST', '/players/Sam', {}),
+        ('POST', '/players/Frodo', {}),
+        deeds_on(day, "Water from the Well", "Fruit Orchard Harvest"),
+        ('GET', '/leaderboards/shire_pennies?top=5', None),
+        ('GET', '/leaderboards/shire_pennies/Frodo?around=1', None),
+        ('GET', '/leaderboards/gold', None),
+        ('POST', '/leaderboards/shire_pennies', {}),
+    ])
+    assert [status for status, _ in replies[3:]] == [200, 200, 404, 405]
+    assert [entry['name'] for entry in replies[3][1]['top']] == ['Sam', 'Frodo']
+    assert replies[4][1]['rank'] == 2
+
+@pytest.mark.parametrize('value, expected', [('5', 5), (-3, 0), ('100000', 7)])
+def test_counts_are_clamped(value, expected):
+    assert shire_service._parse_count(value, 'weeks', 7) == expected
+
+def test_advancing_completes_favors_met_on_the_day_that_ends(tmp_path):
+    deeds = ('POST', '/players/Sam/deeds', {'deeds': ["Fruit Orchard Harvest", "Vegetable Patch Platter"]})
+    advance = ('POST', '/players/Sam/advance', {})
+    replies = run_requests(tmp_path, [
+        ('POST', '/players/Sam', {}),
+        ('POST', '/players/Sam/favors', {'character': "Da Provider", 'offer': "Smoothie Bar Blueprint"}),
+    ] + [deeds, advance] * 3)
+    assert [payload['result'] for _, payload in replies[3::2]] == [[], [], ["Da Provider"]]
+
+def pinned_game(day):
+    """Game, but with the real date pinned to `day`."""
+    class PinnedGame(shire_service.Game):
+        def __init__(self, *args, clock=None, **kwargs):
+            super().__init__(*args, clock=clock, **kwargs)
+            if clock is None:
+                self.clock.day = day
+    return PinnedGame
+
+def test_the_advanced_day_outlasts_eviction_from_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(shire_service, 'Game', pinned_game(datetime.date(2025, 1, 6)))
+    advance = ('POST', '/players/Sam/advance', {})
+    replies = run_requests(tmp_path, [
+        ('POST', '/players/Sam', {}), advance, advance,
+        ('POST', '/players/Frodo', {}), # Evicts Sam
+        ('POST', '/players/Sam/deeds', {'deeds': ["Water from the Well"]}),
+        ('GET', '/players/Sam', None),
+    ], max_cached=1)
+    assert replies[-1][1]['today'] == '2025-01-08'
@@ -0,0 +1,29 @@
+import datetime
+
+from shire_quest import CONTENT
+from shire_sim import BehaviourPolicy, simulate, simulate_player
+
+START = datetime.date(2025, 1, 6)
+
+def test_simulation_is_repeatable_for_a_seed():
+    policy = BehaviourPolicy()
+    assert simulate_player(policy, 60, START, 7) == simulate_player(policy, 60, START, 7)
+
+def test_busier_hobbits_earn_more():
+    lazy = simulate_player(BehaviourPolicy(deed_probability=0.1), 60, START, 1)
+    keen = simulate_player(BehaviourPolicy(deed_probability=0.9), 60, START, 1)
+    assert keen[0] > lazy[0]
+
+def test_adherence_decays_to_its_floor():
+    policy = BehaviourPolicy(adherence_decay=0.5, adherence_floor=0.25)
+    assert policy.adherence(0) == 1.0
+    assert policy.adherence(100) == 0.25
+
+def test_report_covers_every_status_and_offer():
+    report = simulate(players=6, days=90, start_date=START, workers=1, batch_size=4)
+    assert report['players'] == 6
+    assert list(report['shire_status']) == list(CONTENT.status_names)
+    assert report['shire_status'][CONTENT.status_names[0]]['reached'] == 6
+    assert report['shire_pennies']['min'] <= report['shire_pennies']['p50'] <= report['shire_pennies']['max']
+    for info in report['favors'].values():
+        assert 0 <= info['completed'] <= info['accepted']
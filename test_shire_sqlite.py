@@ -0,0 +1,103 @@
+import datetime
+import threading
+
+import pytest
+
+from shire_quest import NULL_SINK, Game
+from shire_sqlite import SQLiteDatabase, SQLiteSaveStore
+
+DAY = datetime.date(2025, 1, 6)
+
+@pytest.fixture
+def database(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'shire.db'), pool_size=4)
+    yield db
+    db.close()
+
+def make_game(database, name="Sam", since=None):
+    game = Game(load=False, store=SQLiteSaveStore(database, name, since), events=NULL_SINK)
+    game.today = DAY
+    player = game.store.load()
+    if player is None:
+        game.player.name = name
+        player = game.player
+    game.use_player(player)
+    return game
+
+def log_days(game, days, *deeds):
+    for offset in range(days):
+        game.record_deeds(list(deeds), DAY + datetime.timedelta(days=offset))
+
+def test_round_trip_through_journal_records(database):
+    game = make_game(database)
+    game.save_game() # First save writes the whole player
+    log_days(game, 10, "Water from the Well", "Fruit Orchard Harvest")
+    game.record_reading(180.0, "130/85")
+    game.accept_offer("Da Provider", "Smoothie Bar Blueprint")
+    game.player.add_hp(30)
+    game.save_game() # Later saves apply the journal records as row changes
+    assert database.load_player("Sam").to_dict() == game.player.to_dict()
+
+def test_advanced_day_is_saved_with_the_player(database):
+    game = make_game(database)
+    game.save_game()
+    game.advance_day()
+    game.save_game() # As a journal record
+    assert database.load_player("Sam").game_day == (DAY + datetime.timedelta(days=1)).toordinal()
+    game.advance_day()
+    game.store.compact(game.player) # As the whole row
+    assert database.load_player("Sam").to_dict() == game.player.to_dict()
+
+def test_compact_writes_the_same_rows(database):
+    game = make_game(database)
+    game.save_game()
+    log_days(game, 10, "Water from the Well")
+    game.save_game()
+    incremental = database.load_player("Sam").to_dict()
+    game.store.compact(game.player)
+    assert database.load_player("Sam").to_dict() == incremental
+
+def test_compacting_a_partial_load_keeps_older_days(database):
+    game = make_game(database)
+    game.save_game()
+    log_days(game, 60, "Water from the Well")
+    game.save_game()
+    since = DAY + datetime.timedelta(days=55)
+    recent = make_game(database, since=since)
+    assert len(recent.player.daily_deeds_completed) == 5
+    recent.record_deeds(["A Stroll to Bywater"], DAY + datetime.timedelta(days=59))
+    recent.record_deeds(["A Stroll to Bywater"], DAY + datetime.timedelta(days=10)) # Back-filled before `since`
+    recent.store.compact(recent.player)
+    history = database.load_player("Sam").daily_deeds_completed
+    assert len(history) == 60
+    assert history.deeds_on(DAY + datetime.timedelta(days=10)) == ["Water from the Well", "A Stroll to Bywater"]
+    assert history.has(DAY + datetime.timedelta(days=59), "A Stroll to Bywater")
+
+def test_range_queries_read_only_the_days_asked_for(database):
+    game = make_game(database)
+    game.save_game()
+    log_days(game, 40, "Water from the Well")
+    game.save_game()
+    days = database.deeds_between("Sam", DAY + datetime.timedelta(days=5), DAY + datetime.timedelta(days=9))
+    assert sorted(days) == [(DAY + datetime.timedelta(days=n)).isoformat() for n in range(5, 10)]
+    assert len(database.recent_deeds("Sam", 7, DAY + datetime.timedelta(days=39))) == 7
+
+def test_pooled_connections_save_many_hobbits_at_once(database):
+    names = [f"Hobbit{i}" for i in range(8)]
+    errors = []
+    def play(name):
+        try:
+            game = make_game(database, name)
+            game.save_game()
+            log_days(game, 20, "Water from the Well")
+            game.save_game()
+        except Exception as exc:
+            errors.append(exc)
+    threads = [threading.Thread(target=play, args=(name,)) for name in names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert database.player_names() == sorted(names)
+    assert all(len(database.load_player(name).daily_deeds_completed) == 20 for name in names)